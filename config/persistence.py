@@ -15,7 +15,8 @@ def load_config():
         "last_folder": "",
         "last_template": "",
         "model": "large-v3",
-        "prof_gender": "Psicóloga"
+        "prof_gender": "Psicóloga",
+        "usar_servicio": True
     }
     if os.path.exists(CONFIG_FILE):
         try:
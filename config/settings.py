@@ -25,3 +25,97 @@ CLAVES_PSICO = [
 
 # ================= ENTORNO =================
 os.environ["PYANNOTE_AUDIO_PROGRESSBAR"] = "false"
+
+# ================= PIPELINE =================
+# "lotes": cada etapa procesa todos los audios antes de pasar a la siguiente.
+# "flujo": cada audio avanza solo por las etapas (el primer .docx llega antes).
+MODO_PIPELINE = "lotes"
+
+# Capacidad de las colas entre etapas en modo "flujo" (contrapresión de memoria)
+TAMANO_COLA_ETAPAS = 2
+
+# Modelos que permanecen cargados durante el modo "flujo".
+# Los que no figuren aquí se cargan y liberan por cada archivo (menos VRAM).
+MODELOS_RESIDENTES = ("whisper", "alineacion", "diarizacion")
+
+# ================= SONDEO DE CABECERAS =================
+# Antes de cargar modelos se leen solo las cabeceras de los audios (duración, códec)
+SONDEO_HILOS = 8                # Archivos sondeados en paralelo
+
+# ================= PLANIFICACIÓN DEL LOTE =================
+# Orden de los audios según su duración sondeada:
+# "sjf": más cortos primero (los primeros .docx llegan antes)
+# "lpt": más largos primero (equilibra los procesos del modo CPU)
+# "original": orden de la carpeta. "auto": LPT con varios procesos, SJF con uno.
+POLITICA_PLANIFICACION = "auto"
+
+# ================= HISTORIAL DE RENDIMIENTO (PROGRESO Y ETA) =================
+# El progreso y el tiempo restante se calculan con el RTF (segundos de proceso por
+# segundo de audio) medido en corridas anteriores de esta PC. Sin historial se parte de:
+RTF_INICIAL = {
+    "cuda": {"transcripcion": 0.05, "alineacion": 0.02, "diarizacion": 0.03, "exportacion": 0.002},
+    "cpu": {"transcripcion": 1.0, "alineacion": 0.15, "diarizacion": 0.35, "exportacion": 0.004},
+}
+CARGA_INICIAL_S = 20            # Carga de cada modelo sin historial
+HISTORIAL_VENTANA = 30          # Mediciones recientes que promedia la estimación
+ETA_INTERVALO_S = 2             # Cada cuánto se informa el progreso dentro de un audio largo
+
+# ================= CACHÉ DE AUDIO DECODIFICADO =================
+# Forma de onda 16 kHz float32 (.npy) compartida por todas las etapas
+CACHE_AUDIO_MAX_GB = 20
+
+# ================= LIBERACIÓN ADAPTATIVA DE MEMORIA =================
+# gc.collect()/empty_cache solo se ejecutan si el uso supera estas fracciones
+UMBRAL_LIBERACION_RAM = 0.80    # RAM del sistema en uso
+UMBRAL_LIBERACION_VRAM = 0.75   # VRAM reservada por PyTorch sobre el total de la GPU
+
+# ================= MODO CPU MULTIPROCESO =================
+# Sin CUDA el lote se reparte entre varios procesos (0 = automático)
+PROCESOS_CPU = 0
+HILOS_MIN_POR_PROCESO = 4      # Hilos de cómputo mínimos por proceso
+RAM_POR_PROCESO_GB = 6         # Memoria estimada de los tres modelos en float32
+
+# ================= LOTES DE TRANSCRIPCIÓN =================
+BATCH_SIZE = 0                  # 0 = automático según la memoria libre
+BATCH_MAX = 32                  # Tope del tamaño de lote automático
+BATCH_MB_POR_ELEMENTO_GPU = 700 # VRAM estimada por fragmento de 30 s (large-v3, float16)
+BATCH_MB_POR_ELEMENTO_CPU = 400 # RAM estimada por fragmento de 30 s (float32)
+BATCH_DURACION_CORTA_S = 600    # Audios más cortos se agrupan entre sí en un mismo lote
+BATCH_MAX_ARCHIVOS = 16         # Audios cortos por grupo (acota memoria y checkpoints)
+
+# ================= SERVICIO RESIDENTE (modelos precargados) =================
+SERVICIO_PUERTO = 50517
+SERVICIO_INACTIVIDAD_MIN = 30   # El servicio se cierra solo tras este tiempo sin trabajos
+SERVICIO_AVISO_ESPERA_S = 60    # Cada cuánto se informa a la GUI que espera tras un trabajo de la cola
+
+# ================= MODELOS RESIDENTES (GestorModelos) =================
+RESIDENCIA_PRESUPUESTO_MB = 0   # 0 = automático (85% de la VRAM o 60% de la RAM)
+# Tamaño aproximado (MB) de cada modelo cargado, si la medición al cargarlo no sirve
+RESIDENCIA_TAMANOS_MB = {
+    "large-v3": 3100, "large-v2": 3100, "medium": 1600, "small": 550, "base": 160, "tiny": 80,
+    "whisper": 3100, "alineacion": 1300, "diarizacion": 700,
+}
+
+# ================= COLA DE TRABAJOS PERSISTENTE (worker.py --cola) =================
+COLA_MAX_INTENTOS = 3           # Un trabajo interrumpido más veces queda en error (audio que tumba el proceso)
+COLA_ESPERA_S = 10              # Cada cuánto revisa la cola un consumidor sin trabajos
+COLA_PRIORIDAD_GUI = 10         # Los trabajos lanzados desde la ventana van antes que los encolados
+
+# ================= MODO VIGILANCIA (worker.py --vigilar) =================
+# Carpetas compartidas donde los grabadores sincronizan audios durante el día
+VIGILANCIA_ESTABLE_S = 30       # Un audio se procesa cuando su tamaño no cambió durante este tiempo
+VIGILANCIA_INTERVALO_S = 5      # Revisión periódica (y recorrido completo si no hay inotify)
+
+# ================= PAQUETES DE LÉXICO =================
+# Paquetes del usuario (*.json) que se suman a los integrados en utils/
+CARPETA_LEXICOS = "lexicos"
+LEXICO_RECARGA_S = 5            # Cada cuánto se revisa si algún paquete cambió
+
+# ================= EXPORTACIÓN DOCX =================
+# "docx": python-docx párrafo por párrafo. "flujo": document.xml escrito en flujo con lxml
+# (memoria acotada). "auto": flujo a partir de DOCX_FLUJO_MIN_SEGMENTOS turnos.
+MOTOR_DOCX = "auto"
+DOCX_FLUJO_MIN_SEGMENTOS = 400
+
+# Procesos de la etapa final (post-proceso + .docx) en modo "lotes": 0 = automático, 1 = en serie
+PROCESOS_EXPORTACION = 0
@@ -0,0 +1,94 @@
+# core/asignacion.py
+import numpy as np
+
+# Dos solapamientos que difieren menos que esto se consideran empate (sumas de
+# prefijos en float64 sobre horas de audio dejan errores del orden de 1e-10 s)
+TOLERANCIA_EMPATE = 1e-7
+
+def _turnos(diarizacion):
+    """(inicios, fines, etiquetas) desde el DataFrame de pyannote o la lista {start, end, speaker} del checkpoint."""
+    if isinstance(diarizacion, list):
+        inicios = [t["start"] for t in diarizacion]
+        fines = [t["end"] for t in diarizacion]
+        etiquetas = [t["speaker"] for t in diarizacion]
+    else:
+        inicios = list(diarizacion["start"])
+        fines = list(diarizacion["end"])
+        etiquetas = list(diarizacion["speaker"])
+    return np.asarray(inicios, dtype=np.float64), np.asarray(fines, dtype=np.float64), etiquetas
+
+class _Cobertura:
+    """
+    Turnos de UN orador como arreglos ordenados. Para un intervalo [a, b]:
+      - aciertos: turnos con intersección > 0 (S < b y E > a), en enteros exactos
+      - solapamiento: suma de intersecciones = C(b) - C(a), con
+        C(t) = Σ clip(t - S, 0, E - S) = (#S≤t)·t - ΣS≤t - ((#E≤t)·t - ΣE≤t)
+    Todo con searchsorted: O((palabras + turnos) · log turnos).
+    """
+    def __init__(self, inicios: np.ndarray, fines: np.ndarray):
+        self.inicios = np.sort(inicios)
+        self.fines = np.sort(fines)
+        self.suma_inicios = np.concatenate(([0.0], np.cumsum(self.inicios)))
+        self.suma_fines = np.concatenate(([0.0], np.cumsum(self.fines)))
+
+    def _acumulado(self, t: np.ndarray) -> np.ndarray:
+        n_ini = np.searchsorted(self.inicios, t, side="right")
+        n_fin = np.searchsorted(self.fines, t, side="right")
+        return (n_ini * t - self.suma_inicios[n_ini]) - (n_fin * t - self.suma_fines[n_fin])
+
+    def medir(self, a: np.ndarray, b: np.ndarray):
+        # Con a < b, todo turno con E ≤ a también cumple S < b: la resta cuenta los que cruzan
+        aciertos = np.searchsorted(self.inicios, b, side="left") - np.searchsorted(self.fines, a, side="right")
+        return (aciertos > 0) & (b > a), self._acumulado(b) - self._acumulado(a)
+
+def _elegir(coberturas: list, etiquetas: list, a: np.ndarray, b: np.ndarray) -> list:
+    """
+    Orador con más tiempo de intersección para cada intervalo, o None si ninguno
+    lo toca. Empates: gana la etiqueta menor (mismo orden que groupby en WhisperX).
+    """
+    solapes = np.full((len(a), len(coberturas)), -np.inf)
+    for k, cobertura in enumerate(coberturas):
+        toca, solape = cobertura.medir(a, b)
+        solapes[toca, k] = solape[toca]
+
+    maximo = solapes.max(axis=1)
+    elegido = np.argmax(solapes >= (maximo - TOLERANCIA_EMPATE)[:, None], axis=1)
+    return [etiquetas[k] if np.isfinite(m) else None for k, m in zip(elegido.tolist(), maximo.tolist())]
+
+def asignar_oradores(diarizacion, resultado: dict) -> dict:
+    """
+    Equivalente vectorizado de whisperx.assign_word_speakers(diarizacion, resultado):
+    agrega "speaker" a cada segmento y a cada palabra con marca de tiempo, según el
+    orador con mayor intersección acumulada. Modifica y devuelve `resultado`.
+    """
+    inicios, fines, etiquetas = _turnos(diarizacion)
+    segmentos = resultado["segments"]
+    if not etiquetas or not segmentos:
+        return resultado
+
+    oradores = sorted(set(etiquetas))
+    indice = {orador: k for k, orador in enumerate(oradores)}
+    codigos = np.fromiter((indice[e] for e in etiquetas), dtype=np.int64, count=len(etiquetas))
+    # Un turno de duración nula nunca tiene intersección positiva
+    validos = fines > inicios
+    coberturas = [_Cobertura(inicios[validos & (codigos == k)], fines[validos & (codigos == k)])
+                  for k in range(len(oradores))]
+
+    # Segmentos y palabras se resuelven juntos en una sola pasada vectorizada
+    destinos = []
+    a, b = [], []
+    for seg in segmentos:
+        destinos.append(seg)
+        a.append(seg["start"])
+        b.append(seg["end"])
+        for word in seg.get("words", ()):
+            if "start" in word:
+                destinos.append(word)
+                a.append(word["start"])
+                b.append(word["end"])
+
+    elegidos = _elegir(coberturas, oradores, np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64))
+    for destino, orador in zip(destinos, elegidos):
+        if orador is not None:
+            destino["speaker"] = orador
+    return resultado
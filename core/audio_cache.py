@@ -0,0 +1,100 @@
+# core/audio_cache.py
+import os
+import hashlib
+import threading
+import numpy as np
+
+from core import resources
+from config.settings import CACHE_AUDIO_MAX_GB
+
+SAMPLE_RATE = 16000
+
+class AudioCache:
+    """
+    Caché de audio decodificado: cada archivo pasa UNA sola vez por FFmpeg.
+    La forma de onda (16 kHz, float32, mono) se guarda como .npy y se abre
+    con memoria mapeada, de modo que transcripción, alineación y diarización
+    leen el mismo buffer sin volver a decodificar.
+    """
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        self.cache_dir = cache_dir or resources.cache_path("audio")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.max_bytes = max_bytes if max_bytes is not None else int(CACHE_AUDIO_MAX_GB * 1024 ** 3)
+        self._candados = {}
+        self._candado_global = threading.Lock()
+
+    def clave(self, audio_path: str) -> str:
+        """La clave combina ruta, tamaño y fecha de modificación del audio original."""
+        st = os.stat(audio_path)
+        firma = f"{os.path.abspath(audio_path).lower()}|{st.st_size}|{st.st_mtime_ns}"
+        return hashlib.sha1(firma.encode("utf-8")).hexdigest()
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.cache_dir, f"{clave}.npy")
+
+    def _candado(self, clave: str) -> threading.Lock:
+        with self._candado_global:
+            return self._candados.setdefault(clave, threading.Lock())
+
+    def obtener(self, audio_path: str) -> np.ndarray:
+        """Devuelve la forma de onda memory-mapped, decodificándola solo si no está en caché."""
+        clave = self.clave(audio_path)
+        destino = self._ruta(clave)
+
+        with self._candado(clave):
+            if os.path.exists(destino):
+                try:
+                    os.utime(destino, None)  # Marca de uso reciente para el desalojo LRU
+                    return np.load(destino, mmap_mode="r")
+                except Exception:
+                    self._eliminar(destino)
+
+            from core.models import importar_whisperx
+            audio = importar_whisperx().load_audio(audio_path)
+            temporal = destino + ".tmp"
+            with open(temporal, "wb") as f:
+                np.save(f, np.ascontiguousarray(audio, dtype=np.float32))
+            del audio
+            os.replace(temporal, destino)
+
+        self.desalojar(conservar=destino)
+        return np.load(destino, mmap_mode="r")
+
+    def duracion(self, audio_path: str, decodificar: bool = True):
+        """Duración en segundos a partir del buffer decodificado (None si no está en caché y no se pide decodificar)."""
+        if not decodificar:
+            destino = self._ruta(self.clave(audio_path))
+            if not os.path.exists(destino):
+                return None
+            return len(np.load(destino, mmap_mode="r")) / SAMPLE_RATE
+        return len(self.obtener(audio_path)) / SAMPLE_RATE
+
+    def desalojar(self, conservar: str = None):
+        """Elimina las entradas menos usadas hasta respetar el tope en disco."""
+        entradas = []
+        total = 0
+        try:
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".npy"):
+                    st = entry.stat()
+                    entradas.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+        except OSError:
+            return
+
+        entradas.sort()
+        for _, size, path in entradas:
+            if total <= self.max_bytes:
+                break
+            if path == conservar:
+                continue
+            if self._eliminar(path):
+                total -= size
+
+    def _eliminar(self, path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            # En Windows un .npy aún mapeado no puede borrarse; se reintenta luego
+            return False
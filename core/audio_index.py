@@ -0,0 +1,91 @@
+# core/audio_index.py
+import os
+import json
+import time
+import sqlite3
+import threading
+
+from core import resources
+from core.checkpoints import hash_audio
+
+class AudioIndex:
+    """
+    Índice local (SQLite en models_cache) de audios ya procesados.
+    - archivos: ruta + tamaño + mtime → huella, para no volver a leer audios sin cambios.
+    - procesados: huella → documento generado y checkpoint de etapas intermedias.
+    - sondeos: ruta + tamaño + mtime → cabeceras leídas (duración, códec, error).
+    Así un audio renombrado, copiado o duplicado se resuelve sin transcribir de nuevo.
+    """
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.path.join(resources.cache_path(), "indice_audios.sqlite")
+        self._candado = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        with self._candado, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS archivos ("
+                " ruta TEXT PRIMARY KEY, tamano INTEGER, mtime_ns INTEGER, huella TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS procesados ("
+                " huella TEXT PRIMARY KEY, docx TEXT, checkpoint TEXT, actualizado REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sondeos ("
+                " ruta TEXT PRIMARY KEY, tamano INTEGER, mtime_ns INTEGER, version INTEGER, info TEXT)"
+            )
+
+    @staticmethod
+    def _clave_ruta(audio_path: str) -> str:
+        return os.path.normcase(os.path.abspath(audio_path))
+
+    def huella(self, audio_path: str, st: os.stat_result = None) -> str:
+        """Huella de contenido; solo se recalcula si cambió el tamaño o la fecha del archivo."""
+        st = st or os.stat(audio_path)
+        ruta = self._clave_ruta(audio_path)
+        with self._candado:
+            fila = self._conn.execute(
+                "SELECT huella FROM archivos WHERE ruta = ? AND tamano = ? AND mtime_ns = ?",
+                (ruta, st.st_size, st.st_mtime_ns)
+            ).fetchone()
+        if fila:
+            return fila[0]
+
+        huella = hash_audio(audio_path)
+        with self._candado, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO archivos (ruta, tamano, mtime_ns, huella) VALUES (?, ?, ?, ?)",
+                (ruta, st.st_size, st.st_mtime_ns, huella)
+            )
+        return huella
+
+    def documento(self, huella: str):
+        """Ruta del .docx ya generado para este contenido (None si no existe o fue borrado)."""
+        with self._candado:
+            fila = self._conn.execute("SELECT docx FROM procesados WHERE huella = ?", (huella,)).fetchone()
+        if fila and fila[0] and os.path.exists(fila[0]):
+            return fila[0]
+        return None
+
+    def registrar(self, huella: str, docx_path: str, checkpoint_path: str = None):
+        with self._candado, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO procesados (huella, docx, checkpoint, actualizado) VALUES (?, ?, ?, ?)",
+                (huella, os.path.abspath(docx_path), checkpoint_path, time.time())
+            )
+
+    def sondeo(self, audio_path: str, st: os.stat_result, version: int):
+        """Cabeceras ya leídas de este archivo (None si cambió desde el último sondeo)."""
+        with self._candado:
+            fila = self._conn.execute(
+                "SELECT info FROM sondeos WHERE ruta = ? AND tamano = ? AND mtime_ns = ? AND version = ?",
+                (self._clave_ruta(audio_path), st.st_size, st.st_mtime_ns, version)
+            ).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def guardar_sondeo(self, audio_path: str, st: os.stat_result, version: int, info: dict):
+        with self._candado, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sondeos (ruta, tamano, mtime_ns, version, info) VALUES (?, ?, ?, ?, ?)",
+                (self._clave_ruta(audio_path), st.st_size, st.st_mtime_ns, version, json.dumps(info, ensure_ascii=False))
+            )
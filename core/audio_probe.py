@@ -0,0 +1,311 @@
+# core/audio_probe.py
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import SONDEO_HILOS
+
+# Cambiar si cambia la lectura de cabeceras: invalida los sondeos guardados en el índice
+VERSION_SONDEO = 2
+LECTURA_INICIAL = 64 * 1024
+
+class AudioInvalido(Exception):
+    """
+    El archivo seguro no contiene audio utilizable (vacío, sin 'moov', cabecera
+    ilegible). Lo que el sondeo solo no sabe interpretar NO es inválido: pasa
+    con un aviso y la duración estimada o desconocida (FFmpeg decide al decodificar).
+    """
+
+def _info(formato, codec=None, canales=None, frecuencia=None, duracion=None, aviso=None) -> dict:
+    return {
+        "formato": formato, "codec": codec, "canales": canales, "frecuencia": frecuencia,
+        "duracion": round(duracion, 3) if duracion else None, "error": None, "aviso": aviso
+    }
+
+# ================= WAV (RIFF / RF64) =================
+_CODECS_WAV = {1: "pcm", 2: "adpcm_ms", 3: "pcm_float", 6: "alaw", 7: "mulaw", 0x11: "adpcm_ima", 0x55: "mp3"}
+
+def _wav(f, tamano: int) -> dict:
+    cabecera = f.read(12)
+    if len(cabecera) < 12 or cabecera[8:12] != b"WAVE":
+        raise AudioInvalido("cabecera RIFF incompleta")
+    fmt = datos = muestras = tam_ds64 = aviso = None
+    pos = 12
+    while pos + 8 <= tamano and (fmt is None or datos is None):
+        f.seek(pos)
+        cid, largo = struct.unpack("<4sI", f.read(8))
+        if cid == b"ds64":
+            _, tam_ds64 = struct.unpack("<QQ", f.read(16))
+        elif cid == b"fmt ":
+            fmt = f.read(min(largo, 40))
+            if len(fmt) < 16:
+                raise AudioInvalido("bloque 'fmt' truncado")
+        elif cid == b"fact" and largo >= 4:
+            muestras = struct.unpack("<I", f.read(4))[0]
+        elif cid == b"data":
+            if largo == 0xFFFFFFFF and tam_ds64 is not None:
+                largo = tam_ds64
+            elif largo in (0, 0xFFFFFFFF):
+                # Grabadora que se apagó sin cerrar el archivo: FFmpeg lee las muestras hasta el final
+                largo = tamano - pos - 8
+                aviso = "la cabecera no indica el tamaño de los datos; duración estimada por el tamaño del archivo"
+            # Un .wav cortado a medio grabar sigue siendo legible hasta donde llega
+            datos = max(0, min(largo, tamano - pos - 8))
+            if fmt is not None:
+                break
+        pos += 8 + largo + (largo & 1)
+
+    if fmt is None:
+        raise AudioInvalido("falta el bloque 'fmt'")
+    if not datos:
+        raise AudioInvalido("no contiene muestras de audio (termina tras la cabecera)")
+
+    codigo, canales, frecuencia, bytes_s, bloque, bits = struct.unpack("<HHIIHH", fmt[:16])
+    if codigo == 0xFFFE and len(fmt) >= 26:
+        codigo = struct.unpack("<H", fmt[24:26])[0]  # WAVE_FORMAT_EXTENSIBLE: subformato
+    if not canales or not frecuencia:
+        raise AudioInvalido("bloque 'fmt' inválido")
+
+    codec = _CODECS_WAV.get(codigo, f"wav_0x{codigo:04x}")
+    if codec == "pcm":
+        codec = f"pcm_s{bits}le" if bits > 8 else "pcm_u8"
+    if muestras and codigo != 1:
+        duracion = muestras / frecuencia
+    else:
+        duracion = datos / (bytes_s or (bloque * frecuencia) or 1)
+    return _info("wav", codec, canales, frecuencia, duracion, aviso)
+
+# ================= FLAC =================
+def _flac(f, inicio: int) -> dict:
+    f.seek(inicio + 4)
+    bloque = f.read(4 + 34)
+    if len(bloque) < 38 or bloque[0] & 0x7F != 0:
+        raise AudioInvalido("falta STREAMINFO")
+    x = int.from_bytes(bloque[4 + 10:4 + 18], "big")
+    frecuencia = x >> 44
+    canales = ((x >> 41) & 0x7) + 1
+    total = x & ((1 << 36) - 1)
+    if not frecuencia:
+        raise AudioInvalido("STREAMINFO inválido")
+    return _info("flac", "flac", canales, frecuencia, total / frecuencia if total else None)
+
+# ================= MPEG (MP3) =================
+_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_FRECUENCIAS = {1: (44100, 48000, 32000), 2: (22050, 24000, 16000), 25: (11025, 12000, 8000)}
+
+def _trama_mpeg(b: bytes, i: int):
+    """(versión, capa, kbps, frecuencia, canales, largo, muestras) si en b[i:] hay una cabecera MPEG válida."""
+    if i + 4 > len(b) or b[i] != 0xFF or (b[i + 1] & 0xE0) != 0xE0:
+        return None
+    version = {0: 25, 2: 2, 3: 1}.get((b[i + 1] >> 3) & 3)
+    capa = {1: 3, 2: 2, 3: 1}.get((b[i + 1] >> 1) & 3)
+    indice_br, indice_sr = b[i + 2] >> 4, (b[i + 2] >> 2) & 3
+    if version is None or capa is None or indice_br in (0, 15) or indice_sr == 3:
+        return None
+    kbps = _BITRATES[(1 if version == 1 else 2, capa if version == 1 or capa == 1 else 2)][indice_br]
+    frecuencia = _FRECUENCIAS[version][indice_sr]
+    relleno = (b[i + 2] >> 1) & 1
+    canales = 1 if (b[i + 3] >> 6) == 3 else 2
+    if capa == 1:
+        return version, capa, kbps, frecuencia, canales, (12 * kbps * 1000 // frecuencia + relleno) * 4, 384
+    muestras = 576 if (capa == 3 and version != 1) else 1152
+    return version, capa, kbps, frecuencia, canales, muestras // 8 * kbps * 1000 // frecuencia + relleno, muestras
+
+def _mpeg(f, inicio: int, tamano: int) -> dict:
+    f.seek(inicio)
+    b = f.read(LECTURA_INICIAL)
+    i = -1
+    while True:
+        i = b.find(b"\xff", i + 1)
+        if i < 0:
+            break
+        trama = _trama_mpeg(b, i)
+        if trama is None:
+            continue
+        version, capa, kbps, frecuencia, canales, largo, muestras = trama
+        # Una sincronía suelta puede ser casualidad: la trama siguiente debe encajar
+        if i + largo + 4 <= len(b) and _trama_mpeg(b, i + largo) is None:
+            continue
+
+        # Cabecera Xing/Info (VBR) o VBRI con el total de tramas
+        lateral = (32 if canales == 2 else 17) if version == 1 else (17 if canales == 2 else 9)
+        tramas = None
+        xing = i + 4 + lateral
+        if b[xing:xing + 4] in (b"Xing", b"Info") and len(b) >= xing + 12:
+            if struct.unpack(">I", b[xing + 4:xing + 8])[0] & 1:
+                tramas = struct.unpack(">I", b[xing + 8:xing + 12])[0]
+        elif b[i + 36:i + 40] == b"VBRI" and len(b) >= i + 36 + 18:
+            tramas = struct.unpack(">I", b[i + 36 + 14:i + 36 + 18])[0]
+
+        if tramas:
+            duracion = tramas * muestras / frecuencia
+        else:
+            audio = tamano - inicio - i
+            f.seek(max(0, tamano - 128))
+            if f.read(3) == b"TAG":
+                audio -= 128
+            duracion = audio * 8 / (kbps * 1000)
+        return _info("mp3", f"mp{capa}", canales, frecuencia, duracion)
+
+    # Solo se revisan los primeros LECTURA_INICIAL bytes: no encontrar tramas ahí no prueba que falten
+    if inicio:
+        return _info("mp3", aviso="no se hallaron tramas MPEG al inicio tras la etiqueta ID3; duración desconocida")
+    return _info(None, aviso="formato no reconocido por el sondeo; duración desconocida")
+
+# ================= MP4 / M4A =================
+def _atomos(f, inicio: int, fin: int):
+    """Recorre los átomos entre inicio y fin leyendo solo sus cabeceras: (tipo, datos, fin_átomo)."""
+    pos = inicio
+    while pos + 8 <= fin:
+        f.seek(pos)
+        largo, tipo = struct.unpack(">I4s", f.read(8))
+        datos = pos + 8
+        if largo == 1:
+            largo = struct.unpack(">Q", f.read(8))[0]
+            datos += 8
+        elif largo == 0:
+            largo = fin - pos
+        if largo < datos - pos:
+            raise AudioInvalido(f"átomo '{tipo.decode('latin-1')}' dañado")
+        yield tipo, datos, min(pos + largo, fin)
+        pos += largo
+
+def _duracion_mvhd(f, datos: int):
+    """(escala, duración) de un mvhd/mdhd versión 0 o 1."""
+    f.seek(datos)
+    cabecera = f.read(32)
+    if cabecera[:1] == b"\x01":
+        escala, duracion = struct.unpack(">IQ", cabecera[20:32])
+    else:
+        escala, duracion = struct.unpack(">II", cabecera[12:20])
+    return escala, duracion
+
+def _pista_audio(f, datos: int, fin: int):
+    """Datos de una pista 'trak' si es de audio: (codec, canales, frecuencia, duración) o None."""
+    mdia = next(((d, e) for t, d, e in _atomos(f, datos, fin) if t == b"mdia"), None)
+    if mdia is None:
+        return None
+    es_audio, duracion, entrada = False, None, None
+    for tipo, d, e in _atomos(f, *mdia):
+        if tipo == b"hdlr":
+            f.seek(d + 8)
+            es_audio = f.read(4) == b"soun"
+        elif tipo == b"mdhd":
+            escala, unidades = _duracion_mvhd(f, d)
+            duracion = unidades / escala if escala else None
+        elif tipo == b"minf":
+            for t2, d2, e2 in _atomos(f, d, e):
+                if t2 != b"stbl":
+                    continue
+                for t3, d3, _ in _atomos(f, d2, e2):
+                    if t3 == b"stsd":
+                        f.seek(d3 + 8)
+                        entrada = f.read(36)
+    if not es_audio:
+        return None
+    if entrada is None or len(entrada) < 36:
+        return None, None, None, duracion
+    codec = entrada[4:8].decode("latin-1").strip().lower()
+    canales = struct.unpack(">H", entrada[24:26])[0]
+    frecuencia = struct.unpack(">I", entrada[32:36])[0] >> 16
+    return {"mp4a": "aac"}.get(codec, codec), canales, frecuencia, duracion
+
+def _mp4(f, tamano: int) -> dict:
+    moov = next(((d, e) for t, d, e in _atomos(f, 0, tamano) if t == b"moov"), None)
+    if moov is None:
+        raise AudioInvalido("falta el índice 'moov' (grabación incompleta)")
+
+    duracion_total = None
+    for tipo, d, e in _atomos(f, *moov):
+        if tipo == b"mvhd":
+            escala, unidades = _duracion_mvhd(f, d)
+            duracion_total = unidades / escala if escala else None
+        elif tipo == b"trak":
+            pista = _pista_audio(f, d, e)
+            if pista:
+                codec, canales, frecuencia, duracion = pista
+                aviso = None if codec else "pista de audio sin descripción (stsd)"
+                return _info("mp4", codec, canales, frecuencia, duracion or duracion_total, aviso)
+    return _info("mp4", duracion=duracion_total, aviso="no se identificó la pista de audio")
+
+# ================= DETECCIÓN =================
+# Contenedores que FFmpeg decodifica aunque aquí no se lea su duración
+_OTROS = ((b"OggS", "ogg"), (b"\x1aE\xdf\xa3", "matroska"), (b"#!AMR", "amr"), (b"FORM", "aiff"), (b".snd", "au"))
+
+def _saltar_id3(f) -> int:
+    f.seek(0)
+    cabecera = f.read(10)
+    if cabecera[:3] != b"ID3" or len(cabecera) < 10:
+        return 0
+    largo = 0
+    for byte in cabecera[6:10]:
+        largo = (largo << 7) | (byte & 0x7F)
+    return 10 + largo + (10 if cabecera[5] & 0x10 else 0)
+
+def _leer_cabeceras(ruta: str, tamano: int) -> dict:
+    with open(ruta, "rb") as f:
+        magia = f.read(12)
+        if magia[:4] in (b"RIFF", b"RF64"):
+            f.seek(0)
+            return _wav(f, tamano)
+        if magia[4:8] == b"ftyp" or magia[4:8] in (b"moov", b"mdat", b"free", b"wide"):
+            return _mp4(f, tamano)
+        for firma, formato in _OTROS:
+            if magia.startswith(firma):
+                return _info(formato)
+
+        inicio = _saltar_id3(f)
+        f.seek(inicio)
+        tras_id3 = f.read(4)
+        if tras_id3 == b"fLaC":
+            return _flac(f, inicio)
+        if len(tras_id3) >= 2 and tras_id3[0] == 0xFF and (tras_id3[1] & 0xF6) == 0xF0:
+            return _info("aac", "aac")  # AAC crudo (ADTS), habitual en .m4a de grabadoras
+        return _mpeg(f, inicio, tamano)
+
+def sondear(ruta: str, st: os.stat_result = None) -> dict:
+    """
+    Lee SOLO las cabeceras del contenedor (WAV, FLAC, MP3, MP4/M4A): formato, códec,
+    canales, frecuencia y duración. Nunca lanza: lo que descarta el archivo va en
+    "error" y lo que el sondeo no pudo interpretar (el archivo igual se procesa) en "aviso".
+    """
+    try:
+        st = st or os.stat(ruta)
+        if st.st_size == 0:
+            raise AudioInvalido("el archivo está vacío (0 bytes)")
+        return _leer_cabeceras(ruta, st.st_size)
+    except AudioInvalido as e:
+        return {**_info(None), "error": str(e)}
+    except (OSError, struct.error, ValueError, IndexError) as e:
+        return {**_info(None), "error": f"cabecera ilegible ({type(e).__name__}: {e})"}
+
+def sondear_varios(rutas: list, index=None, hilos: int = None) -> dict:
+    """
+    Sondea en paralelo (hilos: es lectura de disco, no cómputo) y devuelve {ruta: info}.
+    Con un AudioIndex, el resultado queda guardado por tamaño + mtime y no se vuelve
+    a leer mientras el archivo no cambie.
+    """
+    def uno(ruta):
+        try:
+            st = os.stat(ruta)
+        except OSError as e:
+            return ruta, {**_info(None), "error": str(e)}
+        if index is not None:
+            previo = index.sondeo(ruta, st, VERSION_SONDEO)
+            if previo is not None:
+                return ruta, previo
+        info = sondear(ruta, st)
+        if index is not None:
+            index.guardar_sondeo(ruta, st, VERSION_SONDEO, info)
+        return ruta, info
+
+    if not rutas:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(hilos or SONDEO_HILOS, len(rutas)))) as pool:
+        return dict(pool.map(uno, rutas))
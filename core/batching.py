@@ -0,0 +1,112 @@
+# core/batching.py
+import numpy as np
+
+from core import models
+from config.settings import (
+    BATCH_SIZE, BATCH_MAX, BATCH_MB_POR_ELEMENTO_GPU, BATCH_MB_POR_ELEMENTO_CPU
+)
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 30
+
+# Procesos que comparten la RAM de la PC (core.cpu_pool lo fija en cada hijo)
+PROCESOS_CPU_ACTIVOS = 1
+
+def batch_size_automatico() -> int:
+    """Tamaño de lote según la memoria libre (VRAM con CUDA, la parte de RAM de este proceso en CPU)."""
+    if BATCH_SIZE and BATCH_SIZE > 0:
+        return BATCH_SIZE
+
+    torch = models.importar_torch()
+    libre_mb = None
+    por_elemento = BATCH_MB_POR_ELEMENTO_CPU
+    if torch.cuda.is_available():
+        try:
+            libre, _ = torch.cuda.mem_get_info()
+            libre_mb = libre / 1024 ** 2
+            por_elemento = BATCH_MB_POR_ELEMENTO_GPU
+        except Exception:
+            libre_mb = None
+    elif psutil:
+        try:
+            libre_mb = psutil.virtual_memory().available / 1024 ** 2 / max(1, PROCESOS_CPU_ACTIVOS)
+        except Exception:
+            libre_mb = None
+
+    if libre_mb is None:
+        return 4
+    return int(max(1, min(BATCH_MAX, libre_mb // por_elemento)))
+
+def _api_vad(whisper_model):
+    """
+    Partes internas de WhisperX que usa el lote compartido: (preprocesar, merge_chunks)
+    según la versión (3.1 o 3.3+), o None si este modelo no las tiene.
+    """
+    vad = getattr(whisper_model, "vad_model", None)
+    if vad is None or not callable(whisper_model):
+        return None
+    if hasattr(vad, "preprocess_audio") and hasattr(vad, "merge_chunks"):
+        return vad.preprocess_audio, vad.merge_chunks
+    try:
+        from whisperx.vad import merge_chunks
+    except ImportError:
+        return None
+    torch = models.importar_torch()
+    return (lambda audio: torch.from_numpy(np.asarray(audio, dtype=np.float32)).unsqueeze(0)), merge_chunks
+
+def _segmentos_vad(whisper_model, api, audio, chunk_size: int = CHUNK_SIZE) -> list:
+    """Reproduce la segmentación VAD de FasterWhisperPipeline.transcribe."""
+    preprocesar, merge_chunks = api
+    params = getattr(whisper_model, "_vad_params", {}) or {}
+    segmentos = whisper_model.vad_model({"waveform": preprocesar(audio), "sample_rate": SAMPLE_RATE})
+    return merge_chunks(
+        segmentos, chunk_size,
+        onset=params.get("vad_onset", 0.500),
+        offset=params.get("vad_offset", 0.363)
+    )
+
+def transcribir_lote(whisper_model, audios: dict, batch_size: int = None, log=None) -> dict:
+    """
+    Transcribe varios audios cortos en lotes compartidos: los fragmentos VAD de
+    todos los archivos se empaquetan en la misma inferencia y cada texto se
+    devuelve a su archivo de origen. Resultado: {nombre: {"segments", "language"}}.
+    Si la API interna de WhisperX no es compatible (se comprueba antes de empezar),
+    se transcribe archivo por archivo; un error durante la inferencia se propaga.
+    """
+    batch_size = batch_size or batch_size_automatico()
+    api = _api_vad(whisper_model)
+    if api is None:
+        if log:
+            log("⚠ Esta versión de WhisperX no admite lotes compartidos: se transcribe archivo por archivo.")
+        return {
+            nombre: whisper_model.transcribe(audio, batch_size=batch_size, language="es")
+            for nombre, audio in audios.items()
+        }
+
+    origenes = []
+    for nombre, audio in audios.items():
+        for seg in _segmentos_vad(whisper_model, api, audio):
+            origenes.append((nombre, seg))
+
+    def fragmentos():
+        for nombre, seg in origenes:
+            f1 = int(seg["start"] * SAMPLE_RATE)
+            f2 = int(seg["end"] * SAMPLE_RATE)
+            yield {"inputs": np.asarray(audios[nombre][f1:f2], dtype=np.float32)}
+
+    resultados = {nombre: {"segments": [], "language": "es"} for nombre in audios}
+    for (nombre, seg), out in zip(origenes, whisper_model(fragmentos(), batch_size=batch_size, num_workers=0)):
+        texto = out["text"]
+        if isinstance(texto, list):
+            texto = texto[0]
+        resultados[nombre]["segments"].append({
+            "text": texto,
+            "start": round(seg["start"], 3),
+            "end": round(seg["end"], 3)
+        })
+    return resultados
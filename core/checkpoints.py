@@ -0,0 +1,123 @@
+# core/checkpoints.py
+import os
+import io
+import json
+import gzip
+import hashlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CARPETA_CHECKPOINTS = ".transcriptor"
+ETAPAS = ("transcription", "aligned", "diarization")
+# Segmentos con orador ya cruzados (assign_word_speakers): bastan para reexportar sin WhisperX
+ETAPA_ASIGNADO = "asignado"
+
+def hash_audio(audio_path: str, bloque: int = 1 << 20) -> str:
+    """Huella de contenido del audio (BLAKE2b en streaming, sin cargar el archivo en RAM)."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(audio_path, "rb") as f:
+        while True:
+            chunk = f.read(bloque)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+def _a_json(obj):
+    """Convierte tipos de NumPy/Pandas que WhisperX deja en sus resultados."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "item"):
+        return obj.item()
+    return str(obj)
+
+def _turnos_diarizacion(diarization) -> list:
+    """Reduce el DataFrame de pyannote a turnos {start, end, speaker}."""
+    if isinstance(diarization, list):
+        return diarization
+    return [
+        {"start": float(start), "end": float(end), "speaker": str(speaker)}
+        for start, end, speaker in zip(diarization["start"], diarization["end"], diarization["speaker"])
+    ]
+
+def _dataframe_diarizacion(turnos: list):
+    """Reconstruye el DataFrame que espera whisperx.assign_word_speakers."""
+    import pandas as pd
+    return pd.DataFrame(turnos, columns=["start", "end", "speaker"])
+
+class CheckpointStore:
+    """
+    Resultados intermedios por audio (segmentos, palabras alineadas y turnos de voz),
+    guardados junto a los audios en .transcriptor/<huella>.json.zst (o .json.gz si
+    zstandard no está instalado). Permite reanudar un lote sin repetir etapas.
+    """
+    def __init__(self, folder: str):
+        self.dir = os.path.join(folder, CARPETA_CHECKPOINTS)
+
+    def ruta(self, huella: str) -> str:
+        ext = ".json.zst" if zstandard else ".json.gz"
+        return os.path.join(self.dir, huella + ext)
+
+    def _rutas_posibles(self, huella: str) -> list:
+        base = os.path.join(self.dir, huella)
+        return [base + ".json.zst", base + ".json.gz"]
+
+    def existe(self, huella: str) -> bool:
+        return any(os.path.exists(ruta) for ruta in self._rutas_posibles(huella))
+
+    def cargar(self, huella: str) -> dict:
+        """Devuelve todas las etapas guardadas para la huella ({} si no hay checkpoint)."""
+        for ruta in self._rutas_posibles(huella):
+            if not os.path.exists(ruta):
+                continue
+            try:
+                with open(ruta, "rb") as f:
+                    crudo = f.read()
+                if ruta.endswith(".zst"):
+                    if not zstandard: continue
+                    crudo = zstandard.ZstdDecompressor().decompress(crudo)
+                else:
+                    crudo = gzip.decompress(crudo)
+                return json.loads(crudo.decode("utf-8"))
+            except Exception:
+                # Checkpoint corrupto (p. ej. corte de luz): se recalcula
+                continue
+        return {}
+
+    def restaurar(self, huella: str) -> dict:
+        """Todas las etapas guardadas, con la diarización ya convertida a DataFrame."""
+        contenido = self.cargar(huella)
+        if "diarization" in contenido:
+            contenido["diarization"] = _dataframe_diarizacion(contenido["diarization"])
+        return contenido
+
+    def leer(self, huella: str, etapa: str):
+        """Lee una etapa; la diarización se devuelve como DataFrame listo para usar."""
+        datos = self.cargar(huella).get(etapa)
+        if datos is not None and etapa == "diarization":
+            return _dataframe_diarizacion(datos)
+        return datos
+
+    def guardar(self, huella: str, etapa: str, datos):
+        """Añade (o reemplaza) una etapa con escritura atómica."""
+        os.makedirs(self.dir, exist_ok=True)
+        contenido = self.cargar(huella)
+        contenido[etapa] = _turnos_diarizacion(datos) if etapa == "diarization" else datos
+        crudo = json.dumps(contenido, ensure_ascii=False, default=_a_json).encode("utf-8")
+
+        if zstandard:
+            crudo = zstandard.ZstdCompressor(level=10).compress(crudo)
+        else:
+            buffer = io.BytesIO()
+            with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=6, mtime=0) as gz:
+                gz.write(crudo)
+            crudo = buffer.getvalue()
+
+        destino = self.ruta(huella)
+        temporal = destino + ".tmp"
+        with open(temporal, "wb") as f:
+            f.write(crudo)
+        os.replace(temporal, destino)
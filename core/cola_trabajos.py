@@ -0,0 +1,270 @@
+# core/cola_trabajos.py
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+from typing import Callable, Optional
+
+from core import resources
+from config.settings import COLA_MAX_INTENTOS, COLA_ESPERA_S
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PENDIENTE = "pendiente"
+EN_CURSO = "en_curso"
+HECHO = "hecho"
+ERROR = "error"
+CANCELADO = "cancelado"
+
+def _proceso_vivo(pid: int, desde: float = None) -> bool:
+    """¿Sigue vivo el proceso que tomó el trabajo? (un PID reciclado después del corte no cuenta)"""
+    if not pid:
+        return False
+    if psutil:
+        try:
+            return psutil.Process(pid).create_time() <= (desde or time.time()) + 1
+        except Exception:
+            return False
+    if pid == os.getpid():
+        return True
+    if sys.platform != "win32":
+        try:
+            os.kill(pid, 0)
+            return True
+        except PermissionError:
+            return True
+        except OSError:
+            return False
+    return False  # En Windows, os.kill(pid, 0) terminaría el proceso
+
+class ColaTrabajos:
+    """
+    Cola persistente (SQLite en models_cache) de trabajos de transcripción:
+    una carpeta completa o algunos audios de una carpeta, con sus opciones
+    (plantilla, modelo, profesional, modo, política), prioridad, estado,
+    intentos y marcas de tiempo. Sobrevive al cierre de la app: un trabajo que
+    quedó "en_curso" en un proceso que ya no existe vuelve a "pendiente" (y los
+    checkpoints evitan rehacer sus etapas), salvo que ya agotó COLA_MAX_INTENTOS.
+    """
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.path.join(resources.cache_path(), "cola_trabajos.sqlite")
+        self._candado = threading.Lock()
+        # isolation_level=None: las transacciones se abren a mano (BEGIN IMMEDIATE al tomar)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._candado:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS trabajos ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, carpeta TEXT NOT NULL, archivos TEXT,"
+                " opciones TEXT NOT NULL, prioridad INTEGER NOT NULL DEFAULT 0,"
+                " estado TEXT NOT NULL DEFAULT 'pendiente', intentos INTEGER NOT NULL DEFAULT 0,"
+                " pid INTEGER, error TEXT, creado REAL, iniciado REAL, terminado REAL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS trabajos_siguiente ON trabajos (estado, prioridad DESC, id)"
+            )
+
+    @staticmethod
+    def _trabajo(fila) -> dict:
+        if fila is None:
+            return None
+        trabajo = dict(fila)
+        trabajo["archivos"] = json.loads(trabajo["archivos"]) if trabajo["archivos"] else None
+        trabajo["opciones"] = json.loads(trabajo["opciones"])
+        return trabajo
+
+    def encolar(self, carpeta: str, archivos: Optional[list] = None, opciones: Optional[dict] = None,
+                prioridad: int = 0) -> int:
+        """
+        Agrega un trabajo y devuelve su id. Si ya hay uno pendiente para la misma
+        carpeta y opciones se funden (unión de audios, la mayor prioridad) en vez de duplicarlo.
+        """
+        carpeta = os.path.abspath(carpeta)
+        opciones_json = json.dumps(opciones or {}, sort_keys=True, ensure_ascii=False)
+        ahora = time.time()
+        with self._candado:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                fila = self._conn.execute(
+                    "SELECT id, archivos FROM trabajos WHERE carpeta = ? AND opciones = ? AND estado = ?"
+                    " ORDER BY id LIMIT 1", (carpeta, opciones_json, PENDIENTE)
+                ).fetchone()
+                if fila:
+                    previos = json.loads(fila["archivos"]) if fila["archivos"] else None
+                    if previos is None or archivos is None:
+                        union = None  # La carpeta completa cubre cualquier lista de audios
+                    else:
+                        union = previos + [f for f in archivos if f not in previos]
+                    self._conn.execute(
+                        "UPDATE trabajos SET archivos = ?, prioridad = MAX(prioridad, ?) WHERE id = ?",
+                        (json.dumps(union, ensure_ascii=False) if union is not None else None, prioridad, fila["id"])
+                    )
+                    id_trabajo = fila["id"]
+                else:
+                    cursor = self._conn.execute(
+                        "INSERT INTO trabajos (carpeta, archivos, opciones, prioridad, estado, creado)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        (carpeta, json.dumps(archivos, ensure_ascii=False) if archivos is not None else None,
+                         opciones_json, prioridad, PENDIENTE, ahora)
+                    )
+                    id_trabajo = cursor.lastrowid
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return id_trabajo
+
+    def tomar(self, id_trabajo: Optional[int] = None) -> Optional[dict]:
+        """
+        Reclama (de forma atómica entre procesos) el trabajo pendiente de mayor
+        prioridad, o el indicado, y lo pasa a "en_curso" con un intento más.
+        """
+        ahora = time.time()
+        with self._candado:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if id_trabajo is None:
+                    fila = self._conn.execute(
+                        "SELECT * FROM trabajos WHERE estado = ? ORDER BY prioridad DESC, id LIMIT 1", (PENDIENTE,)
+                    ).fetchone()
+                else:
+                    fila = self._conn.execute(
+                        "SELECT * FROM trabajos WHERE id = ? AND estado = ?", (id_trabajo, PENDIENTE)
+                    ).fetchone()
+                if fila:
+                    self._conn.execute(
+                        "UPDATE trabajos SET estado = ?, intentos = intentos + 1, pid = ?, iniciado = ?, error = NULL"
+                        " WHERE id = ?", (EN_CURSO, os.getpid(), ahora, fila["id"])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        trabajo = self._trabajo(fila)
+        if trabajo:
+            # La fila se leyó antes del UPDATE: se refleja el reclamo en el dict devuelto
+            trabajo.update(estado=EN_CURSO, intentos=trabajo["intentos"] + 1, pid=os.getpid(),
+                           iniciado=ahora, error=None)
+        return trabajo
+
+    def terminar(self, id_trabajo: int, error: Optional[str] = None):
+        with self._candado:
+            self._conn.execute(
+                "UPDATE trabajos SET estado = ?, error = ?, terminado = ?, pid = NULL WHERE id = ?",
+                (ERROR if error else HECHO, error, time.time(), id_trabajo)
+            )
+
+    def cancelar(self, id_trabajo: int) -> bool:
+        """Solo se cancelan trabajos que todavía no empezaron."""
+        with self._candado:
+            cursor = self._conn.execute(
+                "UPDATE trabajos SET estado = ?, terminado = ? WHERE id = ? AND estado = ?",
+                (CANCELADO, time.time(), id_trabajo, PENDIENTE)
+            )
+        return cursor.rowcount > 0
+
+    def recuperar(self) -> list:
+        """
+        Trabajos "en_curso" cuyo proceso ya no existe (app cerrada, corte de luz):
+        vuelven a la cola, o quedan en error si ya se interrumpieron COLA_MAX_INTENTOS
+        veces (un audio que tumba el proceso no debe bloquear la cola para siempre).
+        Devuelve [(id, nuevo_estado)].
+        """
+        with self._candado:
+            filas = self._conn.execute(
+                "SELECT id, pid, intentos, iniciado FROM trabajos WHERE estado = ?", (EN_CURSO,)
+            ).fetchall()
+        cambios = []
+        for fila in filas:
+            if _proceso_vivo(fila["pid"], fila["iniciado"]):
+                continue
+            if fila["intentos"] >= COLA_MAX_INTENTOS:
+                nuevo, error = ERROR, f"interrumpido {fila['intentos']} veces"
+            else:
+                nuevo, error = PENDIENTE, None
+            with self._candado:
+                cursor = self._conn.execute(
+                    "UPDATE trabajos SET estado = ?, error = ?, pid = NULL WHERE id = ? AND estado = ? AND pid IS ?",
+                    (nuevo, error, fila["id"], EN_CURSO, fila["pid"])
+                )
+            if cursor.rowcount:
+                cambios.append((fila["id"], nuevo))
+        return cambios
+
+    def listar(self, estados: Optional[tuple] = None) -> list:
+        consulta = "SELECT * FROM trabajos"
+        parametros = ()
+        if estados:
+            consulta += f" WHERE estado IN ({', '.join('?' * len(estados))})"
+            parametros = tuple(estados)
+        with self._candado:
+            filas = self._conn.execute(consulta + " ORDER BY id", parametros).fetchall()
+        return [self._trabajo(f) for f in filas]
+
+    def pendientes(self) -> int:
+        with self._candado:
+            return self._conn.execute("SELECT COUNT(*) FROM trabajos WHERE estado = ?", (PENDIENTE,)).fetchone()[0]
+
+def describir(trabajo: dict) -> str:
+    alcance = f"{len(trabajo['archivos'])} audio(s) de " if trabajo["archivos"] else ""
+    return f"#{trabajo['id']} {alcance}{trabajo['carpeta']} (prioridad {trabajo['prioridad']}, intento {trabajo['intentos']})"
+
+def ejecutar_trabajo(orchestrator, trabajo: dict, hf_token: str):
+    """
+    Corre un trabajo de la cola con el orquestador dado. Con GestorModelos va en
+    un solo proceso: un pool de hijos volvería a cargar todos los modelos.
+    """
+    opciones = trabajo["opciones"]
+    orchestrator.process_all(
+        folder=trabajo["carpeta"],
+        template=opciones.get("template", ""),
+        model_name=opciones.get("model", "large-v3"),
+        hf_token=hf_token,
+        prof_gender=opciones.get("gender", "Psicóloga"),
+        modo=opciones.get("modo"),
+        procesos=1 if orchestrator.gestor else opciones.get("procesos"),
+        politica=opciones.get("politica"),
+        archivos=trabajo["archivos"]
+    )
+
+def atender(cola: ColaTrabajos, orchestrator, hf_token: str, log: Callable,
+            detener: Optional[threading.Event] = None, al_terminar: Optional[Callable] = None,
+            hasta_vaciar: bool = False) -> int:
+    """
+    Consumidor: toma trabajos por prioridad y los procesa con un mismo orquestador,
+    de modo que las carpetas encoladas comparten los modelos ya cargados (el
+    orquestador debe tener GestorModelos). Sin trabajos, revisa la cola cada
+    COLA_ESPERA_S hasta que se active `detener` (o termina si hasta_vaciar).
+    Devuelve cuántos trabajos atendió.
+    """
+    detener = detener or threading.Event()
+    atendidos = 0
+    while not detener.is_set():
+        for id_trabajo, estado in cola.recuperar():
+            log(f"♻ Trabajo #{id_trabajo} interrumpido en una corrida anterior: "
+                f"{'vuelve a la cola' if estado == PENDIENTE else 'se marca con error'}.")
+
+        trabajo = cola.tomar()
+        if trabajo is None:
+            if hasta_vaciar or detener.wait(COLA_ESPERA_S):
+                break
+            continue
+
+        log(f"📥 Trabajo {describir(trabajo)}")
+        error = None
+        try:
+            ejecutar_trabajo(orchestrator, trabajo, hf_token)
+        except Exception as e:
+            error = str(e)
+            log(f"✖ Trabajo #{trabajo['id']} con error: {error}")
+        cola.terminar(trabajo["id"], error)
+        atendidos += 1
+        if al_terminar:
+            al_terminar(trabajo)
+    return atendidos
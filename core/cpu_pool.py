@@ -0,0 +1,160 @@
+# core/cpu_pool.py
+import os
+import json
+import queue
+import multiprocessing
+
+from config.settings import PROCESOS_CPU, HILOS_MIN_POR_PROCESO, RAM_POR_PROCESO_GB
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def procesos_recomendados(total_archivos: int, solicitados: int = None) -> int:
+    """
+    Cuántos procesos lanzar en una PC sin GPU: limitado por núcleos
+    (HILOS_MIN_POR_PROCESO cada uno), por la RAM disponible y por el número de audios.
+    """
+    if total_archivos < 2:
+        return 1
+    nucleos = os.cpu_count() or 1
+    pedido = solicitados if solicitados is not None else PROCESOS_CPU
+    if pedido and pedido > 0:
+        return max(1, min(pedido, total_archivos))
+
+    por_nucleos = max(1, nucleos // HILOS_MIN_POR_PROCESO)
+    por_ram = por_nucleos
+    if psutil:
+        try:
+            disponible = psutil.virtual_memory().available
+            por_ram = max(1, int(disponible // (RAM_POR_PROCESO_GB * 1024 ** 3)))
+        except Exception:
+            pass
+    return max(1, min(por_nucleos, por_ram, total_archivos))
+
+def _trabajador_cpu(idx, folder, archivos, duplicados, duraciones, template, model_name, hf_token,
+                    prof_gender, modo, hilos, procesos, cola):
+    """Proceso hijo: fija su presupuesto de hilos y ejecuta el pipeline sobre su parte del lote."""
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(hilos)
+    try:
+        from core import models, batching
+        torch = models.importar_torch()
+        torch.set_num_threads(hilos)
+        torch.set_num_interop_threads(1)
+        # Cada hijo dimensiona sus lotes con su parte de la RAM libre, no con toda
+        batching.PROCESOS_CPU_ACTIVOS = procesos
+
+        from core.orchestrator import TranscriptorOrchestrator
+        orchestrator = TranscriptorOrchestrator(queue_callback=lambda m: cola.put((idx, m)))
+        orchestrator.duplicados = duplicados
+        orchestrator.duraciones = duraciones
+        # Ya hay un proceso por núcleo: la exportación de cada hijo va en serie
+        orchestrator.procesos_exportacion = 1
+        if modo == "flujo":
+            orchestrator.process_stream(folder, archivos, template, model_name, hf_token, prof_gender)
+        else:
+            orchestrator.process_batch(folder, archivos, template, model_name, hf_token, prof_gender)
+    except Exception as e:
+        cola.put((idx, ('log', f"✖ Error crítico en el proceso: {str(e)}")))
+        cola.put((idx, ('fin', False)))
+        return
+    cola.put((idx, ('fin', True)))
+
+def ejecutar_pool_cpu(orchestrator, folder: str, partes: list, template: str, model_name: str,
+                      hf_token: str, prof_gender: str, modo: str):
+    """
+    Lanza un proceso por parte del lote (repartido por core.planificacion) y
+    funde sus eventos en el flujo único LOG:/PROG: del orquestador padre. El
+    progreso global pondera cada proceso por la cantidad de audios que recibió.
+    Si un proceso cae o algún audio queda sin documento, la corrida termina con
+    error (no con el cierre de éxito) indicando cuántos faltan.
+    """
+    procesos = len(partes)
+    nucleos = os.cpu_count() or 1
+    hilos = max(1, nucleos // procesos)
+    total = sum(len(parte) for parte in partes)
+
+    orchestrator._log(f"🖥 Modo CPU: {procesos} procesos × {hilos} hilos para {total} archivos.")
+
+    ctx = multiprocessing.get_context("spawn")
+    cola = ctx.Queue()
+    hijos = []
+    for idx, parte in enumerate(partes):
+        duplicados = {f: orchestrator.duplicados[f] for f in parte if f in orchestrator.duplicados}
+        duraciones = {f: orchestrator.duraciones[f] for f in parte if f in orchestrator.duraciones}
+        p = ctx.Process(
+            target=_trabajador_cpu,
+            args=(idx, folder, parte, duplicados, duraciones, template, model_name, hf_token,
+                  prof_gender, modo, hilos, procesos, cola),
+            daemon=True
+        )
+        p.start()
+        hijos.append(p)
+
+    progreso = [0.0] * procesos
+    # Último ETA de cada hijo: el lote termina cuando termina el más atrasado
+    etas = {}
+    activos = set(range(procesos))
+    caidos = set()
+    while activos:
+        try:
+            idx, mensaje = cola.get(timeout=1.0)
+        except queue.Empty:
+            # Un hijo que murió sin avisar (p. ej. falta de memoria) no debe colgar el lote
+            for caido in list(activos):
+                if not hijos[caido].is_alive():
+                    orchestrator._log(f"✖ [P{caido + 1}] El proceso terminó inesperadamente (código {hijos[caido].exitcode}).")
+                    activos.discard(caido)
+                    caidos.add(caido)
+            continue
+
+        if isinstance(mensaje, tuple):
+            comando, dato = mensaje
+            if comando == 'fin':
+                activos.discard(idx)
+                if not dato:
+                    caidos.add(idx)
+                progreso[idx] = 100.0
+                etas.pop(idx, None)
+            elif comando == 'log':
+                orchestrator._log(f"[P{idx + 1}] {dato}")
+            elif comando == 'metric' and orchestrator.queue:
+                orchestrator.queue(('metric', dato))
+            elif comando == 'eta' and orchestrator.queue:
+                etas[idx] = json.loads(dato)
+                global_eta = {
+                    "progreso": round(sum(p * len(partes[i]) for i, p in enumerate(progreso)) / total, 2),
+                    "restante_lote": max(e["restante_lote"] for e in etas.values()),
+                    "archivo": etas[idx]["archivo"],
+                    "restante_archivo": etas[idx]["restante_archivo"],
+                }
+                orchestrator.queue(('eta', json.dumps(global_eta, ensure_ascii=False)))
+                continue
+            # Los 'done' parciales se ignoran: el padre emite el único cierre
+        elif isinstance(mensaje, (int, float)):
+            progreso[idx] = float(mensaje)
+        else:
+            continue
+
+        global_pct = sum(p * len(partes[i]) for i, p in enumerate(progreso)) / total
+        orchestrator._update_progress(global_pct)
+
+    for p in hijos:
+        p.join(timeout=5)
+
+    # Los errores por archivo quedan dentro de cada hijo: se cuentan los documentos que faltan
+    faltantes = [f for parte in partes for f in parte
+                 if not os.path.exists(os.path.join(folder, orchestrator.docx_name(f)))]
+    if caidos:
+        orchestrator._log(f"⚠ Fallaron los procesos {', '.join(f'P{i + 1}' for i in sorted(caidos))}.")
+    if faltantes:
+        orchestrator._log(f"⚠ Proceso completado con errores: {total - len(faltantes)}/{total} documentos generados.")
+        raise RuntimeError(f"{len(faltantes)} de {total} audios quedaron sin documento"
+                           f"{': ' + ', '.join(faltantes[:5]) if faltantes else ''}"
+                           f"{'…' if len(faltantes) > 5 else ''}")
+
+    orchestrator._log(f"🎊 ¡Proceso completado! ({total} archivos en {procesos} procesos)")
+    if orchestrator.queue:
+        orchestrator.queue(('done', "✅ Transcripción completada exitosamente."))
@@ -0,0 +1,154 @@
+# core/metrics.py
+import os
+import sys
+import json
+import time
+import threading
+from datetime import datetime
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Medidores abiertos en este proceso: el tiempo de CPU y el pico de VRAM son de todo
+# el proceso, así que una etapa solapada con otra (modo flujo) no puede atribuírselos
+_ACTIVOS = {}
+_CANDADO_ACTIVOS = threading.Lock()
+
+class MedidorEtapa:
+    """
+    Mide una etapa de un archivo: tiempo real, tiempo de CPU, pico de RSS
+    (muestreado en segundo plano) y pico de VRAM. Al salir entrega un dict
+    listo para el canal METRIC: del worker.
+
+    Si otra etapa corrió a la vez en otro hilo ("solapada": true), cpu_segundos
+    es solo el del hilo de la etapa (sin los hilos de cómputo de torch) y el
+    pico de VRAM no se informa: el del proceso mezclaría ambas etapas.
+    """
+    INTERVALO_MUESTREO = 0.2
+
+    def __init__(self, etapa: str, archivo: str = None, duracion_audio=None, al_terminar=None):
+        self.etapa = etapa
+        self.archivo = archivo
+        # Número o callable: la duración suele conocerse recién después de decodificar
+        self.duracion_audio = duracion_audio
+        self.al_terminar = al_terminar
+        self.resultado = None
+        self._pico_rss = 0
+        self._activo = False
+        self.solapada = False
+        self._vram_propia = False
+
+    def _torch_cuda(self):
+        # Solo si torch ya fue importado por el pipeline: medir no debe cargarlo
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            return torch.cuda
+        return None
+
+    def _muestrear(self, proceso):
+        while self._activo:
+            try:
+                self._pico_rss = max(self._pico_rss, proceso.memory_info().rss)
+            except Exception:
+                return
+            time.sleep(self.INTERVALO_MUESTREO)
+
+    def __enter__(self):
+        cuda = self._torch_cuda()
+        self._hilo = threading.get_ident()
+        with _CANDADO_ACTIVOS:
+            otros = [m for m in _ACTIVOS.values() if m._hilo != self._hilo]
+            for medidor in otros:
+                medidor.solapada = True
+            self.solapada = bool(otros)
+            # El pico solo se reinicia si nadie más lo está midiendo
+            self._vram_propia = not _ACTIVOS
+            _ACTIVOS[id(self)] = self
+        if cuda and self._vram_propia:
+            cuda.reset_peak_memory_stats()
+        if psutil:
+            self._activo = True
+            threading.Thread(target=self._muestrear, args=(psutil.Process(),), daemon=True).start()
+        self._inicio = time.perf_counter()
+        self._cpu = time.process_time()
+        self._cpu_hilo = time.thread_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pared = time.perf_counter() - self._inicio
+        cpu_proceso = time.process_time() - self._cpu
+        cpu_hilo = time.thread_time() - self._cpu_hilo
+        with _CANDADO_ACTIVOS:
+            _ACTIVOS.pop(id(self), None)
+        cpu = cpu_hilo if self.solapada else cpu_proceso
+        self._activo = False
+        if psutil:
+            try:
+                self._pico_rss = max(self._pico_rss, psutil.Process().memory_info().rss)
+            except Exception:
+                pass
+
+        cuda = self._torch_cuda()
+        duracion = self.duracion_audio
+        if callable(duracion):
+            try:
+                duracion = duracion()
+            except Exception:
+                duracion = None
+
+        self.resultado = {
+            "etapa": self.etapa,
+            "archivo": self.archivo,
+            "ok": exc_type is None,
+            "segundos": round(pared, 3),
+            "cpu_segundos": round(cpu, 3),
+            "pico_rss_mb": round(self._pico_rss / 1024 ** 2, 1) if self._pico_rss else None,
+            "pico_vram_mb": (round(cuda.max_memory_allocated() / 1024 ** 2, 1)
+                             if cuda and self._vram_propia and not self.solapada else None),
+            "solapada": self.solapada,
+            "duracion_audio": round(duracion, 2) if duracion else None,
+            "rtf": round(pared / duracion, 4) if duracion else None,
+        }
+        if self.al_terminar:
+            self.al_terminar(self.resultado)
+        return False
+
+def resumir(metricas: list) -> dict:
+    """Totales por etapa y por archivo a partir de las líneas METRIC: de una corrida."""
+    por_etapa = {}
+    por_archivo = {}
+    for m in metricas:
+        etapa = por_etapa.setdefault(m["etapa"], {"segundos": 0.0, "cpu_segundos": 0.0, "audio_segundos": 0.0, "pico_rss_mb": 0.0, "pico_vram_mb": 0.0})
+        etapa["segundos"] += m.get("segundos") or 0.0
+        etapa["cpu_segundos"] += m.get("cpu_segundos") or 0.0
+        etapa["audio_segundos"] += m.get("duracion_audio") or 0.0
+        etapa["pico_rss_mb"] = max(etapa["pico_rss_mb"], m.get("pico_rss_mb") or 0.0)
+        etapa["pico_vram_mb"] = max(etapa["pico_vram_mb"], m.get("pico_vram_mb") or 0.0)
+        if m.get("archivo"):
+            archivo = por_archivo.setdefault(m["archivo"], {"segundos": 0.0, "duracion_audio": m.get("duracion_audio"), "etapas": {}})
+            archivo["segundos"] += m.get("segundos") or 0.0
+            archivo["etapas"][m["etapa"]] = m.get("segundos")
+
+    for etapa in por_etapa.values():
+        etapa["rtf"] = round(etapa["segundos"] / etapa["audio_segundos"], 4) if etapa["audio_segundos"] else None
+    return {"etapas": por_etapa, "archivos": por_archivo}
+
+def escribir_resumen(folder: str, metricas: list, inicio: float) -> str:
+    """Guarda resumen_transcripcion_<fecha>.json junto a los documentos generados."""
+    if not folder or not os.path.isdir(folder) or not metricas:
+        return ""
+    resumen = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "segundos_totales": round(time.time() - inicio, 1),
+        **resumir(metricas),
+        "metricas": metricas,
+    }
+    ruta = os.path.join(folder, f"resumen_transcripcion_{datetime.now():%Y%m%d_%H%M%S}.json")
+    try:
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(resumen, f, indent=2, ensure_ascii=False)
+    except OSError:
+        return ""
+    return ruta
@@ -0,0 +1,108 @@
+# core/model_manager.py
+import threading
+from collections import OrderedDict
+
+from core import models
+from config.settings import RESIDENCIA_PRESUPUESTO_MB, RESIDENCIA_TAMANOS_MB
+
+class GestorModelos:
+    """
+    Mantiene modelos cargados entre corridas (LRU con presupuesto de memoria).
+    Cada modelo se identifica por una clave, p. ej. ("whisper", "large-v3"),
+    y se mide al cargarlo; si el nuevo no cabe se descargan los menos usados.
+    """
+    def __init__(self, presupuesto_mb: int = None):
+        self._modelos = OrderedDict()  # clave -> (modelo, mb)
+        self._tamanos = {}             # Tamaño medido en cargas anteriores (anticipa el desalojo)
+        self._candado = threading.RLock()
+        self._en_cuda = None           # Fuente de medición, fija durante toda la vida del gestor
+        self.presupuesto_mb = presupuesto_mb or RESIDENCIA_PRESUPUESTO_MB or self._presupuesto_automatico()
+
+    @staticmethod
+    def _presupuesto_automatico() -> float:
+        torch = models.importar_torch()
+        if torch.cuda.is_available():
+            total = torch.cuda.get_device_properties(0).total_memory
+            return total * 0.85 / 1024 ** 2
+        if models.psutil:
+            return models.psutil.virtual_memory().total * 0.60 / 1024 ** 2
+        return 8 * 1024
+
+    def _uso_mb(self) -> float:
+        """
+        Memoria en uso medida siempre con la misma fuente: con CUDA, la ocupada en
+        el dispositivo según mem_get_info (incluye CTranslate2, que PyTorch no ve);
+        en CPU, el RSS del proceso.
+        """
+        if self._en_cuda is None:
+            self._en_cuda = models.dispositivo() == "cuda"
+        if self._en_cuda:
+            libre, total = models.importar_torch().cuda.mem_get_info()
+            return (total - libre) / 1024 ** 2
+        return models._medir_memoria()["rss"] / 1024 ** 2
+
+    @staticmethod
+    def _tamano_estimado(clave: tuple) -> float:
+        """Tamaño de tabla: whisper por nombre de modelo, el resto por etapa."""
+        nombre = clave[1] if clave[0] == "whisper" and len(clave) > 1 else clave[0]
+        return RESIDENCIA_TAMANOS_MB.get(nombre, RESIDENCIA_TAMANOS_MB.get(clave[0], 0.0))
+
+    def _medir_carga(self, clave: tuple, cargador):
+        try:
+            antes = self._uso_mb()
+        except Exception:
+            antes = None
+        modelo = cargador()
+        tamano = 0.0
+        if antes is not None:
+            try:
+                tamano = self._uso_mb() - antes
+            except Exception:
+                tamano = 0.0
+        # Sin medición útil (memoria reutilizada del asignador, otro proceso liberó VRAM) se usa la tabla
+        if tamano <= 0:
+            tamano = self._tamano_estimado(clave)
+        return modelo, tamano
+
+    def obtener(self, clave: tuple, cargador):
+        """Devuelve el modelo residente o lo carga (desalojando los menos usados si hace falta)."""
+        with self._candado:
+            if clave in self._modelos:
+                self._modelos.move_to_end(clave)
+                return self._modelos[clave][0]
+
+            self._desalojar(necesario_mb=self._tamanos.get(clave, self._tamano_estimado(clave)))
+            modelo, tamano = self._medir_carga(clave, cargador)
+            self._tamanos[clave] = tamano
+            self._modelos[clave] = (modelo, tamano)
+            self._desalojar(necesario_mb=0.0, conservar=clave)
+            return modelo
+
+    def _desalojar(self, necesario_mb: float, conservar: tuple = None):
+        """Descarga los modelos menos usados hasta que quepa lo necesario."""
+        liberado = False
+        while self._modelos and self.ocupado_mb() + necesario_mb > self.presupuesto_mb:
+            clave = next(iter(self._modelos))
+            if clave == conservar:
+                break
+            self._modelos.popitem(last=False)
+            liberado = True
+        if liberado:
+            models.liberar_gpu(forzar=True)
+
+    def ocupado_mb(self) -> float:
+        return sum(mb for _, mb in self._modelos.values())
+
+    def soltar(self, clave: tuple):
+        with self._candado:
+            if self._modelos.pop(clave, None) is not None:
+                models.liberar_gpu(forzar=True)
+
+    def vaciar(self):
+        with self._candado:
+            self._modelos.clear()
+            models.liberar_gpu(forzar=True)
+
+    def claves(self) -> list:
+        with self._candado:
+            return list(self._modelos.keys())
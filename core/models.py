@@ -1,9 +1,16 @@
 import os
 import sys
 import gc
-import torch
+import time
 import warnings
-import whisperx
+import importlib
+
+from config.settings import UMBRAL_LIBERACION_RAM, UMBRAL_LIBERACION_VRAM
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
 
 # Silenciar avisos innecesarios para un entorno profesional
 warnings.filterwarnings("ignore")
@@ -21,21 +28,99 @@ os.makedirs(MODELS_CACHE, exist_ok=True)
 os.environ["HF_HOME"] = MODELS_CACHE
 os.environ["HUGGINGFACE_HUB_CACHE"] = MODELS_CACHE
 
-def liberar_gpu():
-    """Limpia la memoria VRAM de forma agresiva y sincroniza el hardware."""
+# ================= IMPORTACIÓN DIFERIDA DE LA PILA ML =================
+# torch/whisperx tardan varios segundos en importarse: solo se cargan cuando
+# una etapa de modelos los necesita (texto, post-proceso y exportación no).
+TIEMPOS_IMPORTACION = {}
+
+def _importar(nombre: str):
+    modulo = sys.modules.get(nombre)
+    if modulo is None:
+        inicio = time.perf_counter()
+        modulo = importlib.import_module(nombre)
+        TIEMPOS_IMPORTACION[nombre] = time.perf_counter() - inicio
+    return modulo
+
+def importar_torch():
+    return _importar("torch")
+
+def importar_whisperx():
+    importar_torch()  # Por separado, para que cada subsistema reporte su propio tiempo
+    return _importar("whisperx")
+
+def torch_cargado():
+    """torch solo si ya fue importado (medir o liberar memoria no debe importarlo)."""
+    return sys.modules.get("torch")
+
+def dispositivo() -> str:
+    return "cuda" if importar_torch().cuda.is_available() else "cpu"
+
+# Instrumentación acumulada de liberar_gpu (tiempo invertido y memoria recuperada)
+ESTADISTICAS_LIBERACION = {"llamadas": 0, "colectas": 0, "segundos": 0.0, "ram_liberada": 0, "vram_liberada": 0}
+
+def _medir_memoria() -> dict:
+    """RSS del proceso, fracción de RAM del sistema en uso y VRAM reservada por PyTorch."""
+    medida = {"rss": 0, "ram_uso": 0.0, "vram": 0, "vram_uso": 0.0}
+    if psutil:
+        try:
+            medida["rss"] = psutil.Process().memory_info().rss
+            medida["ram_uso"] = psutil.virtual_memory().percent / 100.0
+        except Exception:
+            pass
+    torch = torch_cargado()
+    if torch is not None and torch.cuda.is_available():
+        medida["vram"] = torch.cuda.memory_reserved()
+        total = torch.cuda.get_device_properties(0).total_memory
+        medida["vram_uso"] = medida["vram"] / total if total else 0.0
+    return medida
+
+def liberar_gpu(forzar: bool = False) -> dict:
+    """
+    Liberación adaptativa de memoria (sin pausas fijas).
+    Solo recolecta cuando la RAM o la VRAM superan su umbral, o cuando se fuerza
+    (p. ej. justo después de descargar un modelo). Devuelve lo que se recuperó.
+    """
+    inicio = time.perf_counter()
+    antes = _medir_memoria()
+    presion = antes["ram_uso"] >= UMBRAL_LIBERACION_RAM or antes["vram_uso"] >= UMBRAL_LIBERACION_VRAM
+
+    ESTADISTICAS_LIBERACION["llamadas"] += 1
+    if not (forzar or presion):
+        return {"colecta": False, "segundos": 0.0, "ram_liberada": 0, "vram_liberada": 0}
+
     gc.collect()
-    if torch.cuda.is_available():
+    torch = torch_cargado()
+    if torch is not None and torch.cuda.is_available():
         torch.cuda.synchronize()
         torch.cuda.empty_cache()
         torch.cuda.ipc_collect()
-    import time
-    time.sleep(1.5)
+
+    despues = _medir_memoria()
+    resultado = {
+        "colecta": True,
+        "segundos": time.perf_counter() - inicio,
+        "ram_liberada": max(antes["rss"] - despues["rss"], 0),
+        "vram_liberada": max(antes["vram"] - despues["vram"], 0),
+    }
+    ESTADISTICAS_LIBERACION["colectas"] += 1
+    ESTADISTICAS_LIBERACION["segundos"] += resultado["segundos"]
+    ESTADISTICAS_LIBERACION["ram_liberada"] += resultado["ram_liberada"]
+    ESTADISTICAS_LIBERACION["vram_liberada"] += resultado["vram_liberada"]
+    return resultado
+
+def resumen_liberacion() -> str:
+    """Resumen legible de la instrumentación para el log del pipeline."""
+    e = ESTADISTICAS_LIBERACION
+    mb = 1024 ** 2
+    return (f"{e['colectas']}/{e['llamadas']} liberaciones ejecutadas en {e['segundos']:.2f} s "
+            f"(RAM recuperada: {e['ram_liberada'] / mb:.0f} MB, VRAM: {e['vram_liberada'] / mb:.0f} MB)")
 
 # ================= MODELOS =================
 def cargar_whisper(modelo_name: str):
     """Carga el modelo de WhisperX en GPU."""
     liberar_gpu()
-    device = "cuda" if torch.cuda.is_available() else "cpu"
+    torch, whisperx = importar_torch(), importar_whisperx()
+    device = dispositivo()
     compute_type = "float16" if device == "cuda" else "float32"
 
     return whisperx.load_model(
@@ -43,13 +128,17 @@ def cargar_whisper(modelo_name: str):
         device,
         compute_type=compute_type,
         language="es",
-        download_root=os.path.join(MODELS_CACHE, "whisper")
+        download_root=os.path.join(MODELS_CACHE, "whisper"),
+        # En CPU CTranslate2 usa el mismo presupuesto de hilos que PyTorch (ver core.cpu_pool)
+        threads=torch.get_num_threads() if device == "cpu" else 4
     )
 
 def cargar_diarizacion(hf_token: str):
     """Carga el motor de identificación de voces (Diarización)."""
     liberar_gpu()
-    device = "cuda" if torch.cuda.is_available() else "cpu"
+    torch = importar_torch()
+    importar_whisperx()
+    device = dispositivo()
     from whisperx.diarize import DiarizationPipeline
     cache_path = os.path.join(MODELS_CACHE, "pyannote")
     
@@ -73,7 +162,8 @@ def cargar_diarizacion(hf_token: str):
 def cargar_modelo_alineacion(idioma: str):
     """Carga el modelo de sincronización de palabras en GPU."""
     liberar_gpu()
-    device = "cuda" if torch.cuda.is_available() else "cpu"
+    whisperx = importar_whisperx()
+    device = dispositivo()
     model_dir = os.path.join(MODELS_CACHE, "align")
     
     return whisperx.load_align_model(
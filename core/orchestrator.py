@@ -1,13 +1,33 @@
 import os
 import gc
-import torch
-import whisperx
+import json
+import shutil
+import time
+import queue
+import threading
+from contextlib import contextmanager
 from typing import Callable, Optional
 
 from core import models
-from core.transcription import asignar_texto_v1
-from core.postprocess import identificar_psicologa, fusionar, refinar_turnos, suavizar_hablantes
-from exporters.docx_exporter import export_to_docx
+from core.audio_cache import AudioCache
+from core import batching
+from core.metrics import MedidorEtapa
+from core.asignacion import asignar_oradores
+from core.checkpoints import CheckpointStore, ETAPAS, ETAPA_ASIGNADO
+from core import reexport
+from core.audio_index import AudioIndex
+from core import audio_probe
+from core import planificacion
+from core import rendimiento
+from config.settings import (
+    MODO_PIPELINE, TAMANO_COLA_ETAPAS, MODELOS_RESIDENTES, BATCH_DURACION_CORTA_S, BATCH_MAX_ARCHIVOS,
+    PROCESOS_EXPORTACION, POLITICA_PLANIFICACION, ETA_INTERVALO_S
+)
+
+# Marcador de fin de flujo entre etapas (modo "flujo")
+_FIN_FLUJO = object()
+
+EXTENSIONES_AUDIO = (".wav", ".mp3", ".flac", ".m4a")
 
 class TranscriptorOrchestrator:
     """
@@ -15,8 +35,23 @@ class TranscriptorOrchestrator:
     diarización y exportación de múltiples audios.
     V1.0: Optimización por lotes y eficiencia de RAM.
     """
-    def __init__(self, queue_callback: Optional[Callable] = None):
+    def __init__(self, queue_callback: Optional[Callable] = None, gestor=None):
         self.queue = queue_callback
+        # GestorModelos opcional: con él los modelos quedan residentes entre corridas
+        self.gestor = gestor
+        self.audio_cache = AudioCache()
+        self.index = AudioIndex()
+        # Copias exactas dentro del mismo lote: {audio_original: [audios_duplicados]}
+        self.duplicados = {}
+        # Procesos de la etapa de exportación (None = PROCESOS_EXPORTACION)
+        self.procesos_exportacion = None
+        # Duración de cada audio según sus cabeceras (sondeo previo a cargar modelos)
+        self.duraciones = {}
+        # RTF medido en corridas anteriores: progreso ponderado y tiempo restante
+        self.historial = rendimiento.HistorialRendimiento()
+        self.pronostico = None
+        self.modelo = None
+        self._perfil = None
 
     def _log(self, msg: str):
         if self.queue:
@@ -26,39 +61,347 @@ class TranscriptorOrchestrator:
         if self.queue:
             self.queue(val)
 
+    def _metric(self, datos: dict):
+        """Canal estructurado METRIC: (una línea JSON por archivo y etapa)."""
+        if self.queue:
+            self.queue(('metric', json.dumps(datos, ensure_ascii=False)))
+        if datos.get("etapa") in rendimiento.ETAPAS_AUDIO or str(datos.get("etapa")).startswith("carga_"):
+            try:
+                if self._perfil is None:
+                    self._perfil = rendimiento.perfil_dispositivo(models.dispositivo())
+                self.historial.registrar(datos, self.modelo, self._perfil)
+            except Exception:
+                pass  # Sin historial la estimación usa los valores de partida
+
+    @contextmanager
+    def _pronosticar(self, trabajos: list, hasta_documento: bool = False):
+        """
+        Activa self.pronostico para los trabajos (etapa, audio) de esta corrida e
+        informa progreso + ETA al terminar cada trabajo y cada ETA_INTERVALO_S
+        (un audio de varias horas no deja la barra quieta).
+        """
+        if self._perfil is None:
+            self._perfil = rendimiento.perfil_dispositivo(models.dispositivo())
+        duraciones = planificacion.estimar_duraciones(sorted({f for _, f in trabajos}), self.duraciones)
+        self.pronostico = rendimiento.Pronostico(trabajos, duraciones, self.historial,
+                                                 self.modelo, self._perfil, hasta_documento)
+        if trabajos:
+            self._log(f"⏳ Tiempo estimado según el historial de esta PC: "
+                      f"{planificacion.formatear(self.pronostico.estimado_total())}")
+        fin = threading.Event()
+
+        def latido():
+            while not fin.wait(ETA_INTERVALO_S):
+                self._avance()
+
+        hilo = threading.Thread(target=latido, daemon=True)
+        hilo.start()
+        try:
+            yield self.pronostico
+        finally:
+            fin.set()
+            hilo.join()
+            self._avance()
+            self.pronostico = None
+
+    @contextmanager
+    def _en_curso(self, etapa: str, *filenames):
+        """Marca los trabajos (etapa, audio) como en curso y, al salir, como terminados."""
+        pronostico = self.pronostico
+        if pronostico:
+            for filename in filenames:
+                pronostico.iniciar(etapa, filename)
+            self._avance()
+        try:
+            yield
+        finally:
+            if pronostico:
+                for filename in filenames:
+                    pronostico.terminar(etapa, filename)
+                self._avance()
+
+    def _avance(self):
+        """Progreso ponderado por costo esperado y canal ETA: (JSON con segundos restantes)."""
+        pronostico = self.pronostico
+        if pronostico is None:
+            return
+        estado = pronostico.estado()
+        self._update_progress(estado["progreso"])
+        if self.queue:
+            self.queue(('eta', json.dumps(estado, ensure_ascii=False)))
+
+    def _medir(self, etapa: str, *audio_paths) -> MedidorEtapa:
+        if len(audio_paths) == 1:
+            archivo = os.path.basename(audio_paths[0])
+        else:
+            archivo = f"lote de {len(audio_paths)} audios" if audio_paths else None
+
+        def duracion():
+            total = 0.0
+            for path in audio_paths:
+                total += (self.audio_cache.duracion(path, decodificar=False)
+                          or self.duraciones.get(os.path.basename(path)) or 0.0)
+            return total or None
+
+        return MedidorEtapa(etapa, archivo, duracion if audio_paths else None, al_terminar=self._metric)
+
     def scan_folder(self, folder_path: str) -> list:
         """Busca audios compatibles en la carpeta."""
-        extensions = (".wav", ".mp3", ".flac", ".m4a")
         try:
-            return [f for f in os.listdir(folder_path) if f.lower().endswith(extensions)]
+            return [f for f in os.listdir(folder_path) if f.lower().endswith(EXTENSIONES_AUDIO)]
         except Exception as e:
             self._log(f"✖ Error al acceder a la carpeta: {str(e)}")
             return []
 
-    def get_unprocessed_files(self, folder_path: str, all_files: list) -> list:
-        """Filtra archivos que ya tienen su .docx generado en la misma carpeta."""
-        processed = set()
-        try:
-            for f in os.listdir(folder_path):
-                if f.lower().startswith('entrevista informativa_') and f.lower().endswith('.docx'):
-                    # Extraemos el nombre base del audio del nombre del docx
-                    name_part = f[23:-5] # Quita 'ENTREVISTA INFORMATIVA_' (23 chars) y '.docx' (5 chars)
-                    processed.add(name_part.lower().strip())
-        except: pass
+    def validar_audios(self, folder_path: str, to_process: list) -> list:
+        """
+        Sondeo previo: lee solo las cabeceras de cada audio (en paralelo, con caché
+        por tamaño + mtime en el índice) y descarta los dañados ANTES de cargar
+        cualquier modelo. Las duraciones conocidas ponderan la barra de progreso.
+        """
+        inicio = time.perf_counter()
+        rutas = {f: os.path.join(folder_path, f) for f in to_process}
+        sondeos = audio_probe.sondear_varios(list(rutas.values()), self.index)
+
+        validos = []
+        for f in to_process:
+            info = sondeos[rutas[f]]
+            if info["error"]:
+                self._log(f"✖ {f}: {info['error']}. Se omite (audio dañado o ilegible).")
+                for copia in self.duplicados.pop(f, []):
+                    self._log(f"✖ {copia}: misma grabación dañada que {f}. Se omite.")
+                continue
+            if info.get("aviso"):
+                self._log(f"⚠ {f}: {info['aviso']}. Se procesa igual.")
+            if info["duracion"]:
+                self.duraciones[f] = info["duracion"]
+            validos.append(f)
+
+        conocidas = [self.duraciones[f] for f in validos if f in self.duraciones]
+        if conocidas:
+            horas, resto = divmod(int(sum(conocidas)), 3600)
+            self._log(f"🔎 Sondeo: {len(validos)} audio(s) válidos, {horas} h {resto // 60:02d} min de audio "
+                      f"({len(conocidas)} con duración conocida, {time.perf_counter() - inicio:.2f} s)")
+        return validos
+
+    def planificar(self, to_process: list, procesos: int = 1, politica: Optional[str] = None) -> list:
+        """
+        Ordena el lote según la política (ver core.planificacion) y registra el
+        makespan esperado. Devuelve una parte por proceso (una sola sin pool CPU).
+        """
+        politica, partes, estimacion = planificacion.planificar(
+            to_process, self.duraciones, procesos, politica or POLITICA_PLANIFICACION)
+        faltan = sum(1 for f in to_process if not self.duraciones.get(f))
+        aviso = f" ({faltan} sin duración: se estima con la mediana)" if faltan else ""
+        self._log(f"🗂 Planificación: {planificacion.NOMBRES[politica]} en {len(partes)} proceso(s). "
+                  f"Makespan esperado: {planificacion.formatear(estimacion['makespan'])} de audio, "
+                  f"primer documento tras {planificacion.formatear(estimacion['primer_documento'])}, "
+                  f"media {planificacion.formatear(estimacion['finalizacion_media'])}{aviso}")
+        self._metric({"etapa": "planificacion", "archivo": None, "ok": True, "politica": politica,
+                      "procesos": len(partes),
+                      **{clave: round(valor, 1) for clave, valor in estimacion.items()}})
+        return partes
+
+    @staticmethod
+    def docx_name(filename: str) -> str:
+        return reexport.docx_name(filename)
 
+    def get_unprocessed_files(self, folder_path: str, all_files: list) -> list:
+        """
+        Filtra los audios que ya tienen documento. Un stat por archivo:
+        1. Si existe su 'ENTREVISTA INFORMATIVA_<nombre>.docx' se omite.
+        2. Si su contenido (huella) ya fue procesado con otro nombre, se copia ese documento.
+        3. Las copias exactas dentro del lote se transcriben una sola vez.
+        """
+        self.duplicados = {}
+        primeros = {}
         to_process = []
         for f in all_files:
-            base_name = os.path.splitext(f)[0].lower().strip()
-            if base_name not in processed:
-                to_process.append(f)
-        
+            audio_path = os.path.join(folder_path, f)
+            docx_path = os.path.join(folder_path, self.docx_name(f))
+            if os.path.exists(docx_path):
+                continue
+
+            try:
+                huella = self.index.huella(audio_path)
+            except OSError as e:
+                self._log(f"✖ No se pudo leer {f}: {str(e)}")
+                continue
+
+            previo = self.index.documento(huella)
+            if previo:
+                try:
+                    shutil.copyfile(previo, docx_path)
+                    self._log(f"♻ {f} es idéntico a un audio ya procesado: se reutiliza su documento.")
+                    continue
+                except OSError:
+                    pass
+
+            if huella in primeros:
+                self.duplicados.setdefault(primeros[huella], []).append(f)
+                self._log(f"♻ {f} es una copia exacta de {primeros[huella]}: se procesará una sola vez.")
+                continue
+
+            primeros[huella] = f
+            to_process.append(f)
+
         return to_process
 
-    def process_all(self, folder: str, template: str, model_name: str, hf_token: str, prof_gender: str):        
+    def _cargar_modelo(self, clave: tuple, cargador: Callable):
+        def cargar_medido():
+            if self.pronostico:
+                self.pronostico.iniciar(f"carga_{clave[0]}")
+            with self._medir(f"carga_{clave[0]}"):
+                modelo = cargador()
+            if self.pronostico:
+                self.pronostico.terminar(f"carga_{clave[0]}")
+                self._avance()
+            return modelo
+        if self.gestor:
+            return self.gestor.obtener(clave, cargar_medido)
+        return cargar_medido()
+
+    def _tras_descargar(self):
+        """Sin gestor, el modelo recién soltado se libera de inmediato."""
+        if not self.gestor:
+            models.liberar_gpu(forzar=True)
+
+    def _restaurar_checkpoint(self, store: CheckpointStore, res: dict):
+        """Calcula la huella del audio y recupera las etapas ya completadas en corridas previas."""
+        res["hash"] = self.index.huella(res["path"])
+        previo = store.restaurar(res["hash"])
+        for etapa, datos in previo.items():
+            res.setdefault(etapa, datos)
+        return [e for e in ETAPAS if e in previo]
+
+    @staticmethod
+    def _requiere(res: dict, etapa: str) -> bool:
+        """La transcripción sobra si ya existe la alineación (que la contiene)."""
+        if etapa == "transcription":
+            return "transcription" not in res and "aligned" not in res
+        return etapa not in res
+
+    # El audio se decodifica una sola vez (AudioCache) y las tres etapas leen el mismo buffer
+    def _transcribir(self, whisper_model, audio_path: str) -> dict:
+        with self._medir("transcripcion", audio_path):
+            audio = self.audio_cache.obtener(audio_path)
+            resultado = whisper_model.transcribe(audio, batch_size=batching.batch_size_automatico(), language="es")
+            del audio
+        return resultado
+
+    def _alinear(self, modelo_alineacion, audio_path: str, transcription: dict, device: str) -> dict:
+        align_model, align_metadata = modelo_alineacion
+        with self._medir("alineacion", audio_path):
+            audio = self.audio_cache.obtener(audio_path)
+            aligned = models.importar_whisperx().align(transcription["segments"], align_model, align_metadata, audio, device, return_char_alignments=False)
+            del audio
+        return aligned
+
+    def _diarizar(self, diar_pipeline, audio_path: str):
+        with self._medir("diarizacion", audio_path):
+            audio = self.audio_cache.obtener(audio_path)
+            return diar_pipeline(audio, min_speakers=2, max_speakers=2)
+
+    def _exportar(self, folder: str, filename: str, res: dict, template: str, prof_gender: str):
+        with self._medir("exportacion", res["path"]):
+            self._generar_documento(folder, filename, res, template, prof_gender)
+
+    def _asignar(self, store: CheckpointStore, res: dict) -> list:
+        """Segmentos con orador (equivalente a assign_word_speakers), guardados una vez en el checkpoint."""
+        asignados = res.get(ETAPA_ASIGNADO)
+        if asignados is None:
+            asignados = asignar_oradores(res["diarization"], res["aligned"])["segments"]
+            # Guardado para poder reexportar después sin WhisperX (worker.py --reexportar)
+            store.guardar(res["hash"], ETAPA_ASIGNADO, asignados)
+            res[ETAPA_ASIGNADO] = asignados
+        return asignados
+
+    def _generar_documento(self, folder: str, filename: str, res: dict, template: str, prof_gender: str):
+        store = CheckpointStore(folder)
+        asignados = self._asignar(store, res)
+
+        docx_path = os.path.join(folder, self.docx_name(filename))
+        reexport.generar_documento(asignados, docx_path, template, prof_gender)
+        self.index.registrar(res["hash"], docx_path, store.ruta(res["hash"]))
+
+        # Las copias exactas del mismo lote reciben el documento sin reprocesar
+        for duplicado in self.duplicados.get(filename, []):
+            shutil.copyfile(docx_path, os.path.join(folder, self.docx_name(duplicado)))
+
+    def _exportar_lote(self, folder: str, filenames: list, results_map: dict, template: str, prof_gender: str) -> int:
+        """
+        ETAPA 4 archivo por archivo: un error se registra y el lote sigue.
+        Con varios procesos, la asignación de oradores se hace aquí (queda en el
+        checkpoint) y el post-proceso + .docx en paralelo desde los checkpoints;
+        el log y el progreso salen siempre en el orden de la lista.
+        Devuelve cuántos documentos se generaron.
+        """
+        total = len(filenames)
+        n = reexport.procesos_exportacion(total, self.procesos_exportacion or PROCESOS_EXPORTACION)
+        exitosos = 0
+
+        if n == 1:
+            for filename in filenames:
+                self._log(f"📄 Exportando: {filename}")
+                try:
+                    with self._en_curso("exportacion", filename):
+                        self._exportar(folder, filename, results_map[filename], template, prof_gender)
+                    exitosos += 1
+                except Exception as e:
+                    self._log(f"✖ Error en {filename} (exportación: {str(e)})")
+            return exitosos
+
+        store = CheckpointStore(folder)
+        trabajos = []
+        for filename in filenames:
+            res = results_map[filename]
+            try:
+                with self._medir("asignacion", res["path"]):
+                    self._asignar(store, res)
+                trabajos.append((filename, res["hash"], self.duplicados.get(filename, [])))
+            except Exception as e:
+                self._log(f"✖ Error en {filename} (asignación: {str(e)})")
+                if self.pronostico:
+                    self.pronostico.omitir("exportacion", filename)
+
+        n = reexport.procesos_exportacion(len(trabajos), n)
+        self._log(f"📄 Exportando {len(trabajos)} documento(s) en {n} proceso(s)...")
+
+        def al_terminar(filename, ok, error, metrica):
+            nonlocal exitosos
+            res = results_map[filename]
+            if ok:
+                exitosos += 1
+                docx_path = os.path.join(folder, self.docx_name(filename))
+                self.index.registrar(res["hash"], docx_path, store.ruta(res["hash"]))
+                self._log(f"📄 Exportado: {filename}")
+            else:
+                self._log(f"✖ Error en {filename} (exportación: {error})")
+            if metrica:
+                self._metric(metrica)
+            if self.pronostico:
+                # Los documentos salen en paralelo: cada uno cuenta entero al llegar
+                self.pronostico.terminar("exportacion", filename)
+                self._avance()
+
+        reexport.exportar_en_paralelo(folder, trabajos, template, prof_gender, n, al_terminar, etapa="exportacion")
+        return exitosos
+
+    def process_all(self, folder: str, template: str, model_name: str, hf_token: str, prof_gender: str,
+                    modo: Optional[str] = None, procesos: Optional[int] = None, politica: Optional[str] = None,
+                    archivos: Optional[list] = None):
         """
         V1.0: Pipeline por Lotes (Batch Model Processing).
+        Con modo="flujo" cada audio recorre las etapas por su cuenta (ver process_stream).
+        Sin CUDA y sin GestorModelos, el lote se reparte entre varios procesos (ver core.cpu_pool).
+        El orden de los audios lo decide `politica` (ver core.planificacion).
+        `archivos` limita la corrida a esos nombres de la carpeta (modo vigilancia:
+        los que aún se están copiando no se tocan).
         """
         all_audios = self.scan_folder(folder)
+        if archivos is not None:
+            elegidos = set(archivos)
+            all_audios = [f for f in all_audios if f in elegidos]
         if not all_audios:
             self._log("✖ No se encontraron archivos de audio (.wav, .mp3, .m4a, .flac) en la carpeta.")
             if self.queue: self.queue(('done', "No se encontraron audios compatibles."))
@@ -77,94 +420,314 @@ class TranscriptorOrchestrator:
             if self.queue: self.queue(('done', "✅ Proceso finalizado (todo al día)."))
             return
 
+        # Un audio dañado se descarta aquí, antes de cargar large-v3, y no frena al resto
+        to_process = self.validar_audios(folder, to_process)
+        if not to_process:
+            self._log("✖ Ninguno de los audios pendientes se puede leer.")
+            if self.queue: self.queue(('done', "No hay audios válidos para procesar."))
+            return
+
+        modo = modo or MODO_PIPELINE
+        # Con modelos residentes (servicio, cola, vigilancia) se usa el GestorModelos del
+        # proceso: un pool de hijos volvería a cargar todos los modelos en cada corrida
+        if models.dispositivo() == "cpu" and not self.gestor:
+            from core import cpu_pool
+            n_procesos = cpu_pool.procesos_recomendados(len(to_process), procesos)
+            if n_procesos > 1:
+                partes = self.planificar(to_process, n_procesos, politica)
+                cpu_pool.ejecutar_pool_cpu(self, folder, partes, template, model_name,
+                                           hf_token, prof_gender, modo)
+                return
+
+        to_process = self.planificar(to_process, 1, politica)[0]
+
+        if modo == "flujo":
+            self.process_stream(folder, to_process, template, model_name, hf_token, prof_gender)
+        else:
+            self.process_batch(folder, to_process, template, model_name, hf_token, prof_gender)
+
+    def process_batch(self, folder: str, to_process: list, template: str, model_name: str,
+                      hf_token: str, prof_gender: str):
+        """Etapa por etapa: un solo modelo en memoria a la vez."""
         total_files = len(to_process)
+        self.modelo = model_name
         self._log(f"🚀 Iniciando Pipeline V1.0 para {total_files} archivos nuevos.")
-        device = "cuda" if torch.cuda.is_available() else "cpu"
+        device = models.dispositivo()
 
         # Diccionario para almacenar resultados intermedios
         results_map = {f: {"path": os.path.join(folder, f)} for f in to_process}
+        store = CheckpointStore(folder)
 
         try:
-            # --- ETAPA 1: TRANSCRIPCIÓN (WhisperX) ---
-            self._log(f"🧠 Cargando Motor de Transcripción ({model_name})...")
-            whisper_model = models.cargar_whisper(model_name)
-
-            for i, filename in enumerate(to_process, start=1):
-                self._log(f"🎙 [1/1] Transcribiendo: {filename}")
-                self._update_progress((i / total_files) * 30)
-                audio = whisperx.load_audio(results_map[filename]["path"])
-                results_map[filename]["transcription"] = whisper_model.transcribe(audio, batch_size=4, language="es")
-                del audio
-                models.liberar_gpu()
-
-            del whisper_model
-            models.liberar_gpu()
-
-            # --- ETAPA 2: ALINEACIÓN FONÉTICA (Wav2Vec2) ---
-            self._log("🧠 Cargando Motor de Alineación Fonética...")
-            align_model, align_metadata = models.cargar_modelo_alineacion("es")
-
-            for i, filename in enumerate(to_process, start=1):
-                self._log(f"📑 [{i}/{total_files}] Sincronizando palabras: {filename}")
-                self._update_progress(30 + (i / total_files) * 20)
-
-                audio = whisperx.load_audio(results_map[filename]["path"])
-                segments = results_map[filename]["transcription"]["segments"]
-                aligned = whisperx.align(segments, align_model, align_metadata, audio, device, return_char_alignments=False)
-                results_map[filename]["aligned"] = aligned
-                del audio
-                models.liberar_gpu()
-
-            del align_model
-            models.liberar_gpu()
-
-            # --- ETAPA 3: DIARIZACIÓN (Pyannote) ---
-            self._log("🧠 Cargando Motor de Diarización...")
-            diar_pipeline = models.cargar_diarizacion(hf_token)
-
-            for i, filename in enumerate(to_process, start=1):
-                self._log(f"👥 [{i}/{total_files}] Identificando voces: {filename}")
-                self._update_progress(50 + (i / total_files) * 25)
-
-                audio_path = results_map[filename]["path"]
-                results_map[filename]["diarization"] = diar_pipeline(audio_path, min_speakers=2, max_speakers=2)
-                models.liberar_gpu()
-
-            del diar_pipeline
-            models.liberar_gpu()
-
-            # --- ETAPA 4: ASIGNACIÓN Y EXPORTACIÓN ---
-            self._log("✍ Generando documentos finales...")
-            for i, filename in enumerate(to_process, start=1):
-                self._log(f"📄 Exportando: {filename}")
-                self._update_progress(75 + (i / total_files) * 25)
-
-                base_name = os.path.splitext(filename)[0]
-                res = results_map[filename]
-
-                result_assigned = whisperx.assign_word_speakers(res["diarization"], res["aligned"])
-                assigned = asignar_texto_v1(result_assigned["segments"])
-                prof_id = identificar_psicologa(assigned)
-
-                labeled = []
-                for s in assigned:
-                    speaker_label = prof_gender if s["speaker_raw"] == prof_id else "Víctima"
-                    labeled.append({
-                        "speaker": speaker_label, "text": s["text"],
-                        "start": s.get("start", 0), "end": s.get("end", 0)
-                    })
-
-                final_segments = fusionar(refinar_turnos(suavizar_hablantes(labeled, umbral_breve=1.0), prof_gender))
-
-                docx_filename = f"ENTREVISTA INFORMATIVA_{base_name}.docx"
-                docx_path = os.path.join(folder, docx_filename)
-                export_to_docx(final_segments, docx_path, template)
-
-            self._log(f"🎊 ¡Proceso completado exitosamente! ({total_files} archivos)")
+            # --- ETAPA 0: PUNTOS DE CONTROL (reanudación) ---
+            self._log("🔐 Verificando puntos de control de corridas anteriores...")
+            for filename in to_process:
+                recuperadas = self._restaurar_checkpoint(store, results_map[filename])
+                if recuperadas:
+                    self._log(f"♻ {filename}: se reutilizan {len(recuperadas)} etapa(s) ya procesadas.")
+
+            # Costo esperado de cada etapa pendiente según el historial (progreso y ETA)
+            trabajos = [(etapa, f) for etapa, clave in (("transcripcion", "transcription"), ("alineacion", "aligned"),
+                                                       ("diarizacion", "diarization"))
+                        for f in to_process if self._requiere(results_map[f], clave)]
+            trabajos += [("exportacion", f) for f in to_process]
+            with self._pronosticar(trabajos):
+                # --- ETAPA 1: TRANSCRIPCIÓN (WhisperX) ---
+                pendientes = [f for f in to_process if self._requiere(results_map[f], "transcription")]
+                if pendientes:
+                    self._log(f"🧠 Cargando Motor de Transcripción ({model_name})...")
+                    whisper_model = self._cargar_modelo(("whisper", model_name), lambda: models.cargar_whisper(model_name))
+
+                    # Los audios cortos comparten lotes de inferencia; los largos ya los llenan solos
+                    cortos = [f for f in pendientes
+                              if (self.duraciones.get(f) or self.audio_cache.duracion(results_map[f]["path"])) <= BATCH_DURACION_CORTA_S]
+                    largos = [f for f in pendientes if f not in cortos]
+                    hechos = 0
+
+                    for inicio in range(0, len(cortos), BATCH_MAX_ARCHIVOS):
+                        grupo = cortos[inicio:inicio + BATCH_MAX_ARCHIVOS]
+                        self._log(f"🎙 [{hechos + 1}-{hechos + len(grupo)}/{len(pendientes)}] Transcribiendo en lote {len(grupo)} audios cortos...")
+                        with self._en_curso("transcripcion", *grupo):
+                            with self._medir("transcripcion", *[results_map[f]["path"] for f in grupo]):
+                                audios = {f: self.audio_cache.obtener(results_map[f]["path"]) for f in grupo}
+                                resultados = batching.transcribir_lote(whisper_model, audios, log=self._log)
+                                del audios
+                            for filename in grupo:
+                                res = results_map[filename]
+                                res["transcription"] = resultados[filename]
+                                store.guardar(res["hash"], "transcription", res["transcription"])
+                        hechos += len(grupo)
+                        models.liberar_gpu()
+
+                    for filename in largos:
+                        hechos += 1
+                        self._log(f"🎙 [{hechos}/{len(pendientes)}] Transcribiendo: {filename}")
+                        res = results_map[filename]
+                        with self._en_curso("transcripcion", filename):
+                            res["transcription"] = self._transcribir(whisper_model, res["path"])
+                        store.guardar(res["hash"], "transcription", res["transcription"])
+                        models.liberar_gpu()
+
+                    del whisper_model
+                    self._tras_descargar()
+
+                # --- ETAPA 2: ALINEACIÓN FONÉTICA (Wav2Vec2) ---
+                pendientes = [f for f in to_process if self._requiere(results_map[f], "aligned")]
+                if pendientes:
+                    self._log("🧠 Cargando Motor de Alineación Fonética...")
+                    modelo_alineacion = self._cargar_modelo(("alineacion", "es"), lambda: models.cargar_modelo_alineacion("es"))
+
+                    for i, filename in enumerate(pendientes, start=1):
+                        self._log(f"📑 [{i}/{len(pendientes)}] Sincronizando palabras: {filename}")
+
+                        res = results_map[filename]
+                        with self._en_curso("alineacion", filename):
+                            res["aligned"] = self._alinear(modelo_alineacion, res["path"], res["transcription"], device)
+                        store.guardar(res["hash"], "aligned", res["aligned"])
+                        models.liberar_gpu()
+
+                    del modelo_alineacion
+                    self._tras_descargar()
+
+                # --- ETAPA 3: DIARIZACIÓN (Pyannote) ---
+                pendientes = [f for f in to_process if self._requiere(results_map[f], "diarization")]
+                if pendientes:
+                    self._log("🧠 Cargando Motor de Diarización...")
+                    diar_pipeline = self._cargar_modelo(("diarizacion",), lambda: models.cargar_diarizacion(hf_token))
+
+                    for i, filename in enumerate(pendientes, start=1):
+                        self._log(f"👥 [{i}/{len(pendientes)}] Identificando voces: {filename}")
+
+                        res = results_map[filename]
+                        with self._en_curso("diarizacion", filename):
+                            res["diarization"] = self._diarizar(diar_pipeline, res["path"])
+                        store.guardar(res["hash"], "diarization", res["diarization"])
+                        models.liberar_gpu()
+
+                    del diar_pipeline
+                    self._tras_descargar()
+
+                # --- ETAPA 4: ASIGNACIÓN Y EXPORTACIÓN ---
+                self._log("✍ Generando documentos finales...")
+                exitosos = self._exportar_lote(folder, to_process, results_map, template, prof_gender)
+
+            if exitosos == total_files:
+                self._log(f"🎊 ¡Proceso completado exitosamente! ({total_files} archivos)")
+            else:
+                self._log(f"🎊 ¡Proceso completado! ({exitosos}/{total_files} archivos)")
+            self._log(f"🧹 Memoria: {models.resumen_liberacion()}")
 
         except Exception as e:
             self._log(f"✖ Error crítico en el Pipeline: {str(e)}")
-            models.liberar_gpu()
+            models.liberar_gpu(forzar=True)
+
+        if self.queue:
+            self.queue(('done', f"✅ Transcripción completada exitosamente."))
 
+    # ================= MODO FLUJO (Pipeline por archivo) =================
+    def process_stream(self, folder: str, to_process: list, template: str, model_name: str,
+                       hf_token: str, prof_gender: str, residentes: Optional[tuple] = None,
+                       tamano_cola: Optional[int] = None):
+        """
+        Cada audio avanza solo por transcripción → alineación → diarización → exportación.
+        Las etapas corren en hilos unidos por colas acotadas: el primer .docx aparece
+        en cuanto termina su audio y los resultados se descartan tras exportar.
+        """
+        residentes = MODELOS_RESIDENTES if residentes is None else residentes
+        capacidad = tamano_cola or TAMANO_COLA_ETAPAS
+        total_files = len(to_process)
+        device = models.dispositivo()
+        self.modelo = model_name
+
+        self._log(f"🚀 Iniciando Pipeline en flujo para {total_files} archivos nuevos.")
+        self._log(f"🧠 Modelos residentes: {', '.join(residentes) if residentes else 'ninguno (carga por archivo)'}")
+
+        # Los checkpoints se leen al alimentar: todo trabajo empieza pendiente y
+        # las etapas ya resueltas se descuentan del pronóstico al pasar
+        trabajos = [(etapa, f) for etapa in rendimiento.ETAPAS_AUDIO for f in to_process]
+
+        def paso_transcribir(modelo, res):
+            res["transcription"] = self._transcribir(modelo, res["path"])
+
+        def paso_alinear(modelo, res):
+            res["aligned"] = self._alinear(modelo, res["path"], res.pop("transcription"), device)
+
+        def paso_diarizar(modelo, res):
+            res["diarization"] = self._diarizar(modelo, res["path"])
+
+        etapas = [
+            ("whisper", "transcription", "🎙 Transcribiendo",
+             lambda: self._cargar_modelo(("whisper", model_name), lambda: models.cargar_whisper(model_name)), paso_transcribir),
+            ("alineacion", "aligned", "📑 Sincronizando palabras",
+             lambda: self._cargar_modelo(("alineacion", "es"), lambda: models.cargar_modelo_alineacion("es")), paso_alinear),
+            ("diarizacion", "diarization", "👥 Identificando voces",
+             lambda: self._cargar_modelo(("diarizacion",), lambda: models.cargar_diarizacion(hf_token)), paso_diarizar),
+        ]
+        store = CheckpointStore(folder)
+
+        colas = [queue.Queue(maxsize=capacidad) for _ in range(len(etapas) + 1)]
+        # Si una etapa (o el alimentador, o la exportación) cae, las demás dejan de
+        # esperar: con colas acotadas, la etapa anterior quedaría bloqueada en put()
+        abortar = threading.Event()
+        fallas = []
+
+        def poner(cola, item) -> bool:
+            while not abortar.is_set():
+                try:
+                    cola.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def tomar(cola):
+            while not abortar.is_set():
+                try:
+                    return cola.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+            return _FIN_FLUJO
+
+        def ejecutar_etapa(nombre, clave, etiqueta, cargar, procesar, entrada, salida):
+            modelo = None
+            etapa = "transcripcion" if nombre == "whisper" else nombre
+            try:
+                while True:
+                    item = tomar(entrada)
+                    if item is _FIN_FLUJO:
+                        break
+                    if item.get("error") is None and self._requiere(item, clave):
+                        try:
+                            if modelo is None:
+                                self._log(f"🧠 Cargando modelo de etapa: {nombre}")
+                                modelo = cargar()
+                            self._log(f"{etiqueta}: {item['name']}")
+                            with self._en_curso(etapa, item["name"]):
+                                procesar(modelo, item)
+                            store.guardar(item["hash"], clave, item[clave])
+                        except Exception as e:
+                            item["error"] = f"{nombre}: {str(e)}"
+                        finally:
+                            if nombre not in residentes and modelo is not None:
+                                modelo = None
+                                self._tras_descargar()
+                    # Ya resuelta por checkpoint o con error en una etapa anterior (no-op si se procesó)
+                    self.pronostico.omitir(etapa, item["name"])
+                    if not poner(salida, item):
+                        break
+            except Exception as e:
+                fallas.append(f"{nombre}: {str(e)}")
+                abortar.set()
+            finally:
+                modelo = None
+                self._tras_descargar()
+                poner(salida, _FIN_FLUJO)
+
+        with self._pronosticar(trabajos, hasta_documento=True):
+            hilos = []
+            for idx, (nombre, clave, etiqueta, cargar, procesar) in enumerate(etapas):
+                hilo = threading.Thread(
+                    target=ejecutar_etapa,
+                    args=(nombre, clave, etiqueta, cargar, procesar, colas[idx], colas[idx + 1]),
+                    daemon=True
+                )
+                hilo.start()
+                hilos.append(hilo)
+
+            # El alimentador respeta la capacidad de la primera cola
+            def alimentar():
+                try:
+                    for filename in to_process:
+                        item = {"name": filename, "path": os.path.join(folder, filename), "error": None}
+                        try:
+                            recuperadas = self._restaurar_checkpoint(store, item)
+                            if recuperadas:
+                                self._log(f"♻ {filename}: se reutilizan {len(recuperadas)} etapa(s) ya procesadas.")
+                        except Exception as e:
+                            item["error"] = f"lectura: {str(e)}"
+                        if not poner(colas[0], item):
+                            break
+                except Exception as e:
+                    fallas.append(f"lectura: {str(e)}")
+                    abortar.set()
+                finally:
+                    poner(colas[0], _FIN_FLUJO)
+
+            alimentador = threading.Thread(target=alimentar, daemon=True)
+            alimentador.start()
+
+            # --- ETAPA FINAL: exportación en el hilo principal ---
+            exitosos = 0
+            try:
+                while True:
+                    item = tomar(colas[-1])
+                    if item is _FIN_FLUJO:
+                        break
+                    if item["error"] is None:
+                        try:
+                            self._log(f"📄 Exportando: {item['name']}")
+                            with self._en_curso("exportacion", item["name"]):
+                                self._exportar(folder, item["name"], item, template, prof_gender)
+                            exitosos += 1
+                        except Exception as e:
+                            item["error"] = f"exportación: {str(e)}"
+                    if item["error"] is not None:
+                        self._log(f"✖ Error en {item['name']} ({item['error']})")
+                    self.pronostico.omitir("exportacion", item["name"])
+                    item.clear()
+            except BaseException:
+                abortar.set()
+                raise
+            finally:
+                for hilo in [alimentador, *hilos]:
+                    hilo.join()
+
+        if fallas:
+            # Los checkpoints ya guardados permiten retomar en la próxima corrida
+            self._log(f"✖ Flujo interrumpido tras {exitosos}/{total_files} documentos.")
+            raise RuntimeError(f"Falló la etapa {fallas[0]}")
+
+        self._log(f"🎊 ¡Proceso completado! ({exitosos}/{total_files} archivos)")
+        self._log(f"🧹 Memoria: {models.resumen_liberacion()}")
         if self.queue:
             self.queue(('done', f"✅ Transcripción completada exitosamente."))
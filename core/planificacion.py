@@ -0,0 +1,102 @@
+# core/planificacion.py
+import heapq
+import statistics
+
+# Políticas de orden del lote. Cada una recibe (archivos, duraciones estimadas)
+# y devuelve los archivos en el orden en que deben procesarse. Para agregar una
+# política basta con registrarla en POLITICAS.
+def _original(archivos: list, duraciones: dict) -> list:
+    """Orden de os.listdir (comportamiento histórico)."""
+    return list(archivos)
+
+def _sjf(archivos: list, duraciones: dict) -> list:
+    """Shortest Job First: minimiza el tiempo medio hasta cada documento."""
+    return sorted(archivos, key=lambda f: duraciones[f])
+
+def _lpt(archivos: list, duraciones: dict) -> list:
+    """Longest Processing Time first: los largos primero equilibran varios procesos."""
+    return sorted(archivos, key=lambda f: -duraciones[f])
+
+POLITICAS = {
+    "original": _original,
+    "sjf": _sjf,
+    "lpt": _lpt,
+}
+
+NOMBRES = {
+    "original": "orden de la carpeta",
+    "sjf": "más cortos primero (SJF)",
+    "lpt": "más largos primero (LPT)",
+}
+
+def elegir_politica(solicitada: str, procesos: int) -> str:
+    """'auto': LPT si el lote se reparte entre varios procesos, SJF si va en uno solo."""
+    politica = (solicitada or "auto").lower()
+    if politica == "auto":
+        return "lpt" if procesos > 1 else "sjf"
+    if politica not in POLITICAS:
+        raise ValueError(f"Política de planificación desconocida: {solicitada} "
+                         f"(opciones: auto, {', '.join(POLITICAS)})")
+    return politica
+
+def estimar_duraciones(archivos: list, conocidas: dict) -> dict:
+    """Duración de cada audio; los que el sondeo no pudo medir toman la mediana de los medidos."""
+    medidas = [conocidas[f] for f in archivos if conocidas.get(f)]
+    relleno = statistics.median(medidas) if medidas else 1.0
+    return {f: conocidas.get(f) or relleno for f in archivos}
+
+def repartir(orden: list, duraciones: dict, procesos: int, politica: str) -> list:
+    """
+    Reparte el lote ya ordenado entre `procesos` partes fijas. 'original' conserva
+    el reparto alternado histórico; las demás asignan cada audio, en orden, al
+    proceso con menos carga acumulada (list scheduling; con LPT queda a ≤ 4/3 del óptimo).
+    """
+    if procesos <= 1:
+        return [list(orden)]
+    if politica == "original":
+        return [orden[i::procesos] for i in range(procesos)]
+
+    partes = [[] for _ in range(procesos)]
+    cargas = [(0.0, i) for i in range(procesos)]
+    for f in orden:
+        carga, i = heapq.heappop(cargas)
+        partes[i].append(f)
+        heapq.heappush(cargas, (carga + duraciones[f], i))
+    return partes
+
+def estimar(partes: list, duraciones: dict) -> dict:
+    """
+    Makespan esperado (la parte más cargada) y finalización media de cada
+    documento, en segundos de audio: cada proceso recorre su parte en orden.
+    """
+    finales = []
+    cargas = []
+    for parte in partes:
+        acumulado = 0.0
+        for f in parte:
+            acumulado += duraciones[f]
+            finales.append(acumulado)
+        cargas.append(acumulado)
+    return {
+        "makespan": max(cargas) if cargas else 0.0,
+        "finalizacion_media": sum(finales) / len(finales) if finales else 0.0,
+        "primer_documento": min(finales) if finales else 0.0,
+    }
+
+def planificar(archivos: list, conocidas: dict, procesos: int = 1, solicitada: str = None):
+    """
+    Ordena (y, con varios procesos, reparte) el lote según la política.
+    Devuelve (política, partes, estimación); con un solo proceso hay una sola parte.
+    """
+    politica = elegir_politica(solicitada, procesos)
+    duraciones = estimar_duraciones(archivos, conocidas)
+    orden = POLITICAS[politica](archivos, duraciones)
+    partes = [p for p in repartir(orden, duraciones, procesos, politica) if p]
+    return politica, partes, estimar(partes, duraciones)
+
+def formatear(segundos: float) -> str:
+    horas, resto = divmod(int(round(segundos)), 3600)
+    minutos, segundos = divmod(resto, 60)
+    if horas:
+        return f"{horas} h {minutos:02d} min"
+    return f"{minutos} min {segundos:02d} s"
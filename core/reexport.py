@@ -0,0 +1,186 @@
+# core/reexport.py
+import os
+import json
+import shutil
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from core.checkpoints import CheckpointStore, ETAPA_ASIGNADO
+from core.metrics import MedidorEtapa
+from core.asignacion import asignar_oradores
+from core.transcription import asignar_texto_v1
+from core.postprocess import identificar_psicologa, fusionar, refinar_turnos, suavizar_hablantes
+from exporters.docx_exporter import export_to_docx
+
+def docx_name(filename: str) -> str:
+    return f"ENTREVISTA INFORMATIVA_{os.path.splitext(filename)[0]}.docx"
+
+def construir_segmentos(asignados: list, prof_gender: str) -> list:
+    """Cadena de post-proceso: segmentos con orador (WhisperX) -> turnos finales del documento."""
+    assigned = asignar_texto_v1(asignados)
+    prof_id = identificar_psicologa(assigned)
+
+    labeled = []
+    for s in assigned:
+        speaker_label = prof_gender if s["speaker_raw"] == prof_id else "Víctima"
+        labeled.append({
+            "speaker": speaker_label, "text": s["text"],
+            "start": s.get("start", 0), "end": s.get("end", 0)
+        })
+
+    return fusionar(refinar_turnos(suavizar_hablantes(labeled, umbral_breve=1.0), prof_gender))
+
+def generar_documento(asignados: list, docx_path: str, template: str, prof_gender: str) -> str:
+    """Genera el .docx final a partir de los segmentos con orador asignado (sin ningún modelo)."""
+    export_to_docx(construir_segmentos(asignados, prof_gender), docx_path, template)
+    return docx_path
+
+def asignados_de_checkpoint(store: CheckpointStore, huella: str, contenido: dict = None):
+    """
+    Segmentos con orador guardados para la huella. Los checkpoints anteriores a
+    esta etapa solo traen alineación + diarización: se cruzan una vez (sin WhisperX
+    ni modelos) y el resultado queda guardado para la próxima vez.
+    """
+    contenido = contenido if contenido is not None else store.cargar(huella)
+    if ETAPA_ASIGNADO in contenido:
+        return contenido[ETAPA_ASIGNADO]
+    if "aligned" not in contenido or "diarization" not in contenido:
+        return None
+
+    asignados = asignar_oradores(contenido["diarization"], contenido["aligned"])["segments"]
+    try:
+        store.guardar(huella, ETAPA_ASIGNADO, asignados)
+    except OSError:
+        pass
+    return asignados
+
+def _duracion_en_cache(audio_path: str):
+    from core.audio_cache import AudioCache
+    return AudioCache().duracion(audio_path, decodificar=False)
+
+def _reexportar_uno(folder: str, filename: str, huella: str, copias: list, template: str, prof_gender: str,
+                    etapa: str = "reexportacion"):
+    """
+    Trabajo de un proceso hijo: lee su checkpoint, regenera el documento y lo copia
+    a los duplicados. Nunca lanza: devuelve (ok, error, métrica METRIC del archivo).
+    """
+    medidor = MedidorEtapa(etapa, filename, lambda: _duracion_en_cache(os.path.join(folder, filename)))
+    try:
+        with medidor:
+            store = CheckpointStore(folder)
+            asignados = asignados_de_checkpoint(store, huella)
+            if asignados is None:
+                raise LookupError("sin resultados guardados")
+
+            docx_path = generar_documento(asignados, os.path.join(folder, docx_name(filename)), template, prof_gender)
+            for copia in copias:
+                shutil.copyfile(docx_path, os.path.join(folder, docx_name(copia)))
+        return True, "", medidor.resultado
+    except Exception as e:
+        return False, str(e), medidor.resultado
+
+def procesos_exportacion(total: int, solicitados: int = None) -> int:
+    if total < 2:
+        return 1
+    pedido = solicitados if solicitados and solicitados > 0 else (os.cpu_count() or 1)
+    return max(1, min(pedido, total))
+
+def exportar_en_paralelo(folder: str, trabajos: list, template: str, prof_gender: str, procesos: int,
+                         al_terminar, etapa: str = "reexportacion"):
+    """
+    Genera los documentos de trabajos = [(audio, huella, copias)] desde sus checkpoints,
+    repartidos entre `procesos` procesos (spawn). al_terminar(audio, ok, error, métrica)
+    se llama en el MISMO orden de la lista, sin importar cuál termina antes, de modo
+    que el log y el progreso son deterministas. Un archivo que falla no detiene al resto.
+    """
+    if procesos <= 1:
+        for filename, huella, copias in trabajos:
+            al_terminar(filename, *_reexportar_uno(folder, filename, huella, copias, template, prof_gender, etapa))
+        return
+
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futuros = [
+            (filename, pool.submit(_reexportar_uno, folder, filename, huella, copias, template, prof_gender, etapa))
+            for filename, huella, copias in trabajos
+        ]
+        for filename, futuro in futuros:
+            try:
+                resultado = futuro.result()
+            except Exception as e:
+                # Proceso hijo caído (BrokenProcessPool) o error al enviar el trabajo
+                resultado = (False, str(e) or type(e).__name__, None)
+            al_terminar(filename, *resultado)
+
+def reexportar_carpeta(folder: str, template: str, prof_gender: str, procesos: int = None, queue_callback=None):
+    """
+    Regenera todos los .docx de la carpeta desde los checkpoints (.transcriptor),
+    sin transcribir: solo asignación de texto, post-proceso y exportación, en
+    paralelo entre procesos. Sirve tras cambiar la plantilla o las correcciones.
+    """
+    # Dentro de la función: core.orchestrator importa este módulo al cargarse
+    from core.orchestrator import EXTENSIONES_AUDIO
+
+    def log(mensaje):
+        if queue_callback:
+            queue_callback(('log', mensaje))
+
+    try:
+        audios = sorted(f for f in os.listdir(folder) if f.lower().endswith(EXTENSIONES_AUDIO))
+    except OSError as e:
+        log(f"✖ Error al acceder a la carpeta: {str(e)}")
+        if queue_callback: queue_callback(('done', "No se pudo leer la carpeta."))
+        return
+
+    from core.audio_index import AudioIndex
+    index = AudioIndex()
+    store = CheckpointStore(folder)
+
+    # Un trabajo por contenido: las copias exactas reciben el mismo documento
+    trabajos = {}
+    sin_checkpoint = []
+    for f in audios:
+        try:
+            huella = index.huella(os.path.join(folder, f))
+        except OSError as e:
+            log(f"✖ No se pudo leer {f}: {str(e)}")
+            continue
+        if huella in trabajos:
+            trabajos[huella][1].append(f)
+        elif store.existe(huella):
+            trabajos[huella] = (f, [])
+        else:
+            sin_checkpoint.append(f)
+
+    if sin_checkpoint:
+        log(f"⚠ {len(sin_checkpoint)} audio(s) sin resultados guardados: deben transcribirse primero.")
+    if not trabajos:
+        log("✖ No hay resultados guardados para reexportar en esta carpeta.")
+        if queue_callback: queue_callback(('done', "Nada que reexportar."))
+        return
+
+    total = len(trabajos)
+    n = procesos_exportacion(total, procesos)
+    log(f"📄 Reexportando {total} documento(s) desde resultados guardados ({n} proceso(s))...")
+
+    hechos = 0
+    fallidos = 0
+
+    def registrar(filename, ok, error, metrica):
+        nonlocal hechos, fallidos
+        hechos += 1
+        if ok:
+            log(f"📄 Reexportado: {filename} ({metrica['segundos']:.2f} s)")
+        else:
+            fallidos += 1
+            log(f"✖ {filename}: {error}")
+        if queue_callback:
+            if metrica:
+                queue_callback(('metric', json.dumps(metrica, ensure_ascii=False)))
+            queue_callback((hechos / total) * 100)
+
+    exportar_en_paralelo(folder, [(filename, huella, copias) for huella, (filename, copias) in trabajos.items()],
+                         template, prof_gender, n, registrar)
+
+    log(f"🎊 Reexportación terminada: {hechos - fallidos}/{total} documento(s).")
+    if queue_callback:
+        queue_callback(('done', "✅ Documentos regenerados." if not fallidos else f"⚠ Reexportación con {fallidos} error(es)."))
@@ -0,0 +1,198 @@
+# core/rendimiento.py
+import os
+import time
+import sqlite3
+import platform
+import threading
+import statistics
+
+from core import resources
+from config.settings import RTF_INICIAL, CARGA_INICIAL_S, HISTORIAL_VENTANA
+
+# Etapas con costo proporcional a la duración del audio (nombres de las líneas METRIC:)
+ETAPAS_AUDIO = ("transcripcion", "alineacion", "diarizacion", "exportacion")
+# Carga del modelo que precede a cada etapa (METRIC: carga_<clave del modelo>)
+CARGAS = {"transcripcion": "carga_whisper", "alineacion": "carga_alineacion", "diarizacion": "carga_diarizacion"}
+
+def maquina() -> str:
+    return platform.node() or "local"
+
+def perfil_dispositivo(dispositivo: str) -> str:
+    """'cuda' o 'cpu/<hilos>': un proceso del pool CPU con 4 hilos no rinde como uno con 16."""
+    if dispositivo == "cpu":
+        return f"cpu/{os.environ.get('OMP_NUM_THREADS') or os.cpu_count() or 1}"
+    return dispositivo
+
+class HistorialRendimiento:
+    """
+    Historial local (SQLite en models_cache) del rendimiento real de cada etapa:
+    segundos de proceso y de audio por etapa, modelo, dispositivo y PC. El RTF
+    estimado es el de las últimas HISTORIAL_VENTANA mediciones comparables, de
+    modo que la estimación mejora (y sigue a la máquina) con cada corrida.
+    """
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.path.join(resources.cache_path(), "historial_rendimiento.sqlite")
+        self._candado = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        with self._candado, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS mediciones ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, fecha REAL, etapa TEXT, modelo TEXT,"
+                " perfil TEXT, maquina TEXT, segundos REAL, audio_segundos REAL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS mediciones_clave ON mediciones (etapa, perfil, maquina, id)"
+            )
+
+    @staticmethod
+    def _modelo_de(etapa: str, modelo: str):
+        # Solo Whisper cambia con el modelo elegido; alineación y diarización son siempre las mismas
+        return modelo if etapa in ("transcripcion", "carga_whisper") else ""
+
+    def registrar(self, metrica: dict, modelo: str, perfil: str):
+        """Guarda una línea METRIC: de etapa con audio o de carga de modelo (las fallidas no)."""
+        etapa = metrica.get("etapa")
+        if not metrica.get("ok") or metrica.get("segundos") is None:
+            return
+        audio = metrica.get("duracion_audio")
+        if etapa in ETAPAS_AUDIO:
+            if not audio:
+                return
+        elif etapa not in CARGAS.values():
+            return
+        with self._candado, self._conn:
+            self._conn.execute(
+                "INSERT INTO mediciones (fecha, etapa, modelo, perfil, maquina, segundos, audio_segundos)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), etapa, self._modelo_de(etapa, modelo), perfil, maquina(),
+                 metrica["segundos"], audio if etapa in ETAPAS_AUDIO else None)
+            )
+
+    def _recientes(self, etapa: str, modelo: str, perfil: str) -> list:
+        """Mediciones más recientes: primero de esta PC, si no hay, de cualquiera con el mismo perfil."""
+        consulta = ("SELECT segundos, audio_segundos FROM mediciones"
+                    " WHERE etapa = ? AND modelo = ? AND perfil = ?{} ORDER BY id DESC LIMIT ?")
+        modelo = self._modelo_de(etapa, modelo)
+        with self._candado:
+            filas = self._conn.execute(consulta.format(" AND maquina = ?"),
+                                       (etapa, modelo, perfil, maquina(), HISTORIAL_VENTANA)).fetchall()
+            if not filas:
+                filas = self._conn.execute(consulta.format(""),
+                                           (etapa, modelo, perfil, HISTORIAL_VENTANA)).fetchall()
+        return filas
+
+    def rtf(self, etapa: str, modelo: str, perfil: str) -> float:
+        """Segundos de proceso por segundo de audio (ponderado por duración)."""
+        filas = self._recientes(etapa, modelo, perfil)
+        audio = sum(a for _, a in filas)
+        if audio > 0:
+            return sum(s for s, _ in filas) / audio
+        return RTF_INICIAL["cpu" if perfil.startswith("cpu") else "cuda"][etapa]
+
+    def carga(self, etapa: str, modelo: str, perfil: str) -> float:
+        """Segundos que tarda en cargarse el modelo de la etapa (mediana: un disco frío no arrastra la media)."""
+        filas = self._recientes(CARGAS[etapa], modelo, perfil)
+        return statistics.median(s for s, _ in filas) if filas else CARGA_INICIAL_S
+
+class Pronostico:
+    """
+    Progreso y tiempo restante de una corrida. Cada trabajo (etapa, audio) cuesta
+    RTF histórico × duración, y cada etapa suma una vez la carga de su modelo.
+    El restante se recalibra con el ritmo real de la corrida en curso (segundos
+    reales por segundo esperado), que pesa más a medida que avanza.
+
+    hasta_documento=True (modo flujo): el restante del archivo incluye sus etapas
+    siguientes. En modo por lotes solo su etapa actual (las demás van después del lote).
+    """
+    def __init__(self, trabajos: list, duraciones: dict, historial: HistorialRendimiento,
+                 modelo: str, perfil: str, hasta_documento: bool = False):
+        self.hasta_documento = hasta_documento
+        self._candado = threading.Lock()
+        self._costo = {}
+        etapas = []
+        for etapa, archivo in trabajos:
+            self._costo[(etapa, archivo)] = historial.rtf(etapa, modelo, perfil) * duraciones[archivo]
+            if etapa not in etapas:
+                etapas.append(etapa)
+        for etapa in etapas:
+            if etapa in CARGAS:
+                self._costo[(CARGAS[etapa], None)] = historial.carga(etapa, modelo, perfil)
+
+        self._total = sum(self._costo.values())
+        self._hecho = 0.0
+        self._pendientes = set(self._costo)
+        self._en_curso = {}
+        self._ultimo = None
+        self._inicio = time.monotonic()
+        self._maximo = 0.0
+
+    def iniciar(self, etapa: str, archivo: str = None):
+        with self._candado:
+            clave = (etapa, archivo)
+            if clave not in self._pendientes:
+                return
+            if etapa in CARGAS:
+                # Modelo ya residente (servicio): su carga nunca ocurrirá
+                carga = (CARGAS[etapa], None)
+                if carga in self._pendientes and carga not in self._en_curso:
+                    self._descartar(carga)
+            self._en_curso[clave] = time.monotonic()
+            self._ultimo = clave
+
+    def terminar(self, etapa: str, archivo: str = None):
+        with self._candado:
+            clave = (etapa, archivo)
+            if clave in self._pendientes:
+                self._pendientes.discard(clave)
+                self._en_curso.pop(clave, None)
+                self._hecho += self._costo[clave]
+
+    def omitir(self, etapa: str, archivo: str = None):
+        """Trabajo que no se hará (checkpoint previo o error en una etapa anterior)."""
+        with self._candado:
+            if (etapa, archivo) in self._pendientes:
+                self._descartar((etapa, archivo))
+
+    def _descartar(self, clave):
+        self._pendientes.discard(clave)
+        self._en_curso.pop(clave, None)
+        self._total -= self._costo[clave]
+
+    def _parcial(self, clave, ahora: float) -> float:
+        # Un trabajo que se pasa de lo esperado queda al 95% hasta terminar
+        return min(ahora - self._en_curso[clave], 0.95 * self._costo[clave])
+
+    def estado(self) -> dict:
+        """{progreso (0-100), restante_lote, archivo, restante_archivo} con tiempos en segundos."""
+        with self._candado:
+            ahora = time.monotonic()
+            hecho = self._hecho + sum(self._parcial(c, ahora) for c in self._en_curso)
+            total = max(self._total, 1e-9)
+            fraccion = min(hecho / total, 1.0)
+            # Ritmo observado: vale más cuanto más trabajo esperado ya se completó
+            peso = min(1.0, fraccion / 0.25)
+            ritmo = (1 - peso) + peso * ((ahora - self._inicio) / hecho) if hecho > 0 else 1.0
+            restante_lote = max(total - hecho, 0.0) * ritmo
+
+            archivo = self._ultimo[1] if self._ultimo else None
+            restante_archivo = None
+            if archivo is not None:
+                claves = [c for c in self._pendientes if c[1] == archivo]
+                if not self.hasta_documento:
+                    claves = [c for c in claves if c == self._ultimo]
+                restante = sum(self._costo[c] - (self._parcial(c, ahora) if c in self._en_curso else 0.0)
+                               for c in claves)
+                restante_archivo = restante * ritmo if claves else None
+
+            self._maximo = max(self._maximo, fraccion * 100)
+            return {
+                "progreso": round(self._maximo, 2),
+                "restante_lote": round(restante_lote, 1),
+                "archivo": archivo if restante_archivo is not None else None,
+                "restante_archivo": round(restante_archivo, 1) if restante_archivo is not None else None,
+            }
+
+    def estimado_total(self) -> float:
+        with self._candado:
+            return self._total
@@ -32,6 +32,12 @@ def get_resource_path(relative_path):
     base = get_base_path()
     return os.path.normpath(os.path.join(base, relative_path))
 
+def cache_path(*subdirs):
+    """ Carpeta de caché local (models_cache) creada bajo demanda. """
+    path = get_resource_path(os.path.join("models_cache", *subdirs))
+    os.makedirs(path, exist_ok=True)
+    return path
+
 def image_path(filename):
     """ Helper para imágenes con priorización de alta calidad. """
     # Intentar primero en master
@@ -0,0 +1,245 @@
+# core/service.py
+import os
+import json
+import time
+import queue
+import threading
+from multiprocessing.connection import Listener, Client
+
+from core import resources
+from config.settings import (
+    SERVICIO_PUERTO, SERVICIO_INACTIVIDAD_MIN, SERVICIO_AVISO_ESPERA_S, COLA_ESPERA_S, COLA_PRIORIDAD_GUI
+)
+
+DIRECCION = ("127.0.0.1", SERVICIO_PUERTO)
+FIN_TRABAJO = "FIN:"
+
+def _clave_servicio(crear: bool = False) -> bytes:
+    """Clave compartida (models_cache/servicio.key) para que solo esta instalación use el servicio."""
+    ruta = os.path.join(resources.cache_path(), "servicio.key")
+    if crear and not os.path.exists(ruta):
+        with open(ruta, "wb") as f:
+            f.write(os.urandom(32))
+    with open(ruta, "rb") as f:
+        return f.read()
+
+# ================= CLIENTE (GUI) =================
+def conectar_servicio():
+    """Conexión al servicio residente, o None si no está corriendo."""
+    try:
+        return Client(DIRECCION, authkey=_clave_servicio())
+    except Exception:
+        return None
+
+def esperar_servicio(timeout: float = 20.0):
+    """Espera a que un servicio recién lanzado acepte conexiones."""
+    limite = time.time() + timeout
+    while time.time() < limite:
+        conexion = conectar_servicio()
+        if conexion:
+            return conexion
+        time.sleep(0.5)
+    return None
+
+# ================= SERVIDOR (worker.py --servicio) =================
+def ejecutar_servicio(log=print):
+    """
+    Servicio local de larga vida: mantiene los modelos cargados (GestorModelos)
+    y atiende trabajos de la GUI uno a uno. Cada trabajo responde con las mismas
+    líneas LOG:/PROG:/ETA:/ERROR:/DONE: del worker y termina con FIN:.
+    Cada trabajo de la GUI queda registrado en la cola persistente (si el servicio
+    se cierra a mitad, se retoma después) y, mientras la GUI no pide nada, el
+    servicio atiende los trabajos encolados con los mismos modelos cargados.
+    Se cierra solo tras SERVICIO_INACTIVIDAD_MIN minutos sin trabajos.
+    """
+    # Primero se abre el puerto: la GUI puede encolar su trabajo mientras se importan las librerías
+    listener = Listener(DIRECCION, authkey=_clave_servicio(crear=True))
+    entrantes = queue.Queue()
+    gui_esperando = threading.Event()
+    atendiendo_cola = threading.Event()
+    # Mientras está tomado, el hilo principal no empieza a usar una conexión que recibe avisos
+    candado_avisos = threading.Lock()
+    eta_cola = {}
+
+    def aviso_espera(delante: int) -> str:
+        en_curso = [t for t in cola.listar((EN_CURSO,)) if t["pid"] == os.getpid()]
+        trabajo = f" {describir(en_curso[0])}" if en_curso else ""
+        restante = eta_cola.get("restante_lote")
+        estimado = f", le quedan unos {formatear(restante)}" if restante is not None else ""
+        otros = f"Antes van {delante} trabajo(s) de la ventana." if delante else "No hay otros trabajos de la ventana por delante."
+        return (f"LOG:⏳ El servicio está procesando el trabajo de la cola{trabajo}{estimado}. "
+                f"El suyo empieza en cuanto termine. {otros}")
+
+    def avisar_espera(conexion, delante: int):
+        """Informa a la GUI por qué su trabajo no empieza, hasta que el servicio lo toma."""
+        while True:
+            with candado_avisos:
+                if not atendiendo_cola.is_set():
+                    return
+                try:
+                    conexion.send(aviso_espera(delante))
+                except Exception:
+                    return
+            time.sleep(SERVICIO_AVISO_ESPERA_S)
+
+    def aceptar():
+        while True:
+            try:
+                conexion = listener.accept()
+            except Exception:
+                # Cliente con clave inválida o desconexión durante el saludo
+                continue
+            delante = entrantes.qsize()
+            entrantes.put(conexion)
+            if atendiendo_cola.is_set():
+                threading.Thread(target=avisar_espera, args=(conexion, delante), daemon=True).start()
+            # La cola cede el paso a la GUI al terminar su trabajo en curso
+            gui_esperando.set()
+
+    threading.Thread(target=aceptar, daemon=True).start()
+
+    from core.orchestrator import TranscriptorOrchestrator
+    from core.model_manager import GestorModelos
+    from core.cola_trabajos import ColaTrabajos, PENDIENTE, EN_CURSO, atender, describir, ejecutar_trabajo
+    from core.planificacion import formatear
+    from core import metrics
+    from config import persistence
+
+    gestor = GestorModelos()
+    cola = ColaTrabajos()
+    log(f"LOG:Servicio residente escuchando en {DIRECCION[0]}:{DIRECCION[1]} (PID: {os.getpid()})")
+
+    metricas_cola = []
+    orquestador_cola = None
+
+    def proxy_cola(message):
+        if isinstance(message, tuple):
+            command, data = message
+            if command == 'metric':
+                metricas_cola.append(json.loads(data))
+            elif command == 'eta':
+                eta_cola.update(json.loads(data))
+            else:
+                log(f"{command.upper()}:{data}")
+
+    def al_terminar(trabajo):
+        metrics.escribir_resumen(trabajo["carpeta"], metricas_cola, trabajo["iniciado"])
+        metricas_cola.clear()
+        eta_cola.clear()
+
+    def atender_cola() -> int:
+        """Trabajos encolados (worker.py --encolar o interrumpidos), hasta vaciar la cola o que llegue la GUI."""
+        nonlocal orquestador_cola
+        # Revisión barata en cada espera: el orquestador (y sus bases) solo se crea si hay trabajo
+        for id_trabajo, estado in cola.recuperar():
+            log(f"LOG:♻ Trabajo #{id_trabajo} interrumpido en una corrida anterior: "
+                f"{'vuelve a la cola' if estado == PENDIENTE else 'se marca con error'}.")
+        if not cola.pendientes():
+            return 0
+        hf_token = persistence.get_hf_token()
+        if not hf_token:
+            return 0
+        if orquestador_cola is None:
+            orquestador_cola = TranscriptorOrchestrator(queue_callback=proxy_cola, gestor=gestor)
+        orchestrator = orquestador_cola
+        eta_cola.clear()
+        atendiendo_cola.set()
+        try:
+            return atender(cola, orchestrator, hf_token, log=lambda msg: log(f"LOG:{msg}"),
+                           detener=gui_esperando, al_terminar=al_terminar, hasta_vaciar=True)
+        finally:
+            with candado_avisos:
+                atendiendo_cola.clear()
+
+    ultimo_trabajo = time.time()
+    while True:
+        gui_esperando.clear()
+        try:
+            conexion = entrantes.get(timeout=COLA_ESPERA_S)
+        except queue.Empty:
+            try:
+                atendidos = atender_cola()
+            except Exception as e:
+                # Un fallo de la cola (SQLite bloqueada, disco lleno) no tumba el servicio
+                log(f"LOG:✖ Error al atender la cola de trabajos: {str(e)}")
+                atendidos = 0
+            if atendidos:
+                ultimo_trabajo = time.time()
+            elif time.time() - ultimo_trabajo >= SERVICIO_INACTIVIDAD_MIN * 60:
+                log("LOG:Servicio cerrado por inactividad.")
+                break
+            continue
+
+        try:
+            trabajo = conexion.recv()
+        except Exception:
+            conexion.close()
+            continue
+
+        if trabajo.get("accion") == "detener":
+            conexion.send(FIN_TRABAJO)
+            conexion.close()
+            break
+
+        activo = {"cliente": True}
+        inicio = time.time()
+        metricas = []
+
+        def enviar(linea):
+            # Si la GUI se cerró, el trabajo sigue y los documentos igual se generan
+            if not activo["cliente"]:
+                return
+            try:
+                conexion.send(linea)
+            except Exception:
+                activo["cliente"] = False
+
+        def queue_proxy(message):
+            if isinstance(message, tuple):
+                command, data = message
+                if command == 'metric':
+                    metricas.append(json.loads(data))
+                enviar(f"{command.upper()}:{data}")
+            elif isinstance(message, (int, float)):
+                enviar(f"PROG:{message}")
+
+        try:
+            hf_token = persistence.get_hf_token()
+            if not hf_token:
+                enviar("ERROR: No se ha configurado el Token de Hugging Face.")
+            else:
+                # Registrado en la cola: si el servicio muere a mitad, el trabajo no se pierde
+                opciones = {
+                    "template": trabajo.get("template", ""),
+                    "model": trabajo.get("model", "large-v3"),
+                    "gender": trabajo.get("gender", "Psicóloga"),
+                    "modo": trabajo.get("modo"),
+                    "politica": trabajo.get("politica"),
+                }
+                id_trabajo = cola.encolar(trabajo["folder"], opciones=opciones, prioridad=COLA_PRIORIDAD_GUI)
+                en_cola = cola.tomar(id_trabajo) or {"id": None, "carpeta": trabajo["folder"],
+                                                     "archivos": None, "opciones": opciones}
+                orchestrator = TranscriptorOrchestrator(queue_callback=queue_proxy, gestor=gestor)
+                try:
+                    ejecutar_trabajo(orchestrator, en_cola, hf_token)
+                except Exception as e:
+                    if en_cola["id"] is not None:
+                        cola.terminar(en_cola["id"], str(e))
+                    raise
+                if en_cola["id"] is not None:
+                    cola.terminar(en_cola["id"])
+                resumen = metrics.escribir_resumen(trabajo["folder"], metricas, inicio)
+                if resumen:
+                    enviar(f"LOG:📊 Resumen de métricas: {os.path.basename(resumen)}")
+        except Exception as e:
+            enviar(f"ERROR:Error crítico: {str(e)}")
+        finally:
+            enviar(FIN_TRABAJO)
+            try:
+                conexion.close()
+            except Exception:
+                pass
+            ultimo_trabajo = time.time()
+
+    gestor.vaciar()
+    listener.close()
@@ -1,9 +1,6 @@
 # core/transcription.py
 
-import whisperx
 from typing import List, Dict
-import re
-import torch
 from core.postprocess import normalizar_texto
 
 # ================= ASIGNACIÓN QUIRÚRGICA V1.0 =================
@@ -0,0 +1,220 @@
+# core/vigilancia.py
+import os
+import sys
+import time
+import errno
+import struct
+import select
+import threading
+from typing import Callable, Optional
+
+from config.settings import VIGILANCIA_ESTABLE_S, VIGILANCIA_INTERVALO_S
+
+try:
+    import ctypes
+    import ctypes.util
+except ImportError:
+    ctypes = None
+
+# ================= INOTIFY (Linux, vía ctypes) =================
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_MASCARA = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+_EVENTO = struct.Struct("iIII")  # wd, mask, cookie, len (+ nombre de len bytes)
+
+class _Inotify:
+    """Descriptor inotify con un watch por carpeta (inotify no es recursivo por sí mismo)."""
+    def __init__(self):
+        if ctypes is None or not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify no disponible en esta plataforma")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self._carpetas = {}  # wd -> carpeta
+
+    def agregar(self, carpeta: str):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(carpeta), _MASCARA)
+        if wd < 0:
+            # ENOSPC: se agotó fs.inotify.max_user_watches (el llamador pasa a sondeo)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch: {carpeta}")
+        self._carpetas[wd] = carpeta
+
+    def leer(self, timeout: float) -> list:
+        """[(ruta, es_carpeta)] de los eventos pendientes; None en la ruta = desborde de la cola."""
+        listos, _, _ = select.select([self.fd], [], [], timeout)
+        if not listos:
+            return []
+        try:
+            datos = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        eventos = []
+        pos = 0
+        while pos + _EVENTO.size <= len(datos):
+            wd, mascara, _, largo = _EVENTO.unpack_from(datos, pos)
+            nombre = datos[pos + _EVENTO.size:pos + _EVENTO.size + largo].rstrip(b"\0")
+            pos += _EVENTO.size + largo
+            if mascara & IN_Q_OVERFLOW:
+                eventos.append((None, False))
+            elif mascara & IN_IGNORED:
+                self._carpetas.pop(wd, None)
+            elif wd in self._carpetas and nombre:
+                eventos.append((os.path.join(self._carpetas[wd], os.fsdecode(nombre)), bool(mascara & IN_ISDIR)))
+        return eventos
+
+    def cerrar(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+# ================= VIGILANCIA =================
+class Vigilante:
+    """
+    Vigila carpetas (recursivamente) y entrega los audios nuevos recién cuando
+    dejaron de crecer: tamaño y fecha sin cambios durante `estable_s`. Un
+    grabador sincronizando por red escribe el archivo por partes durante minutos,
+    así que un evento de cierre o de creación NO alcanza para darlo por completo.
+
+    Con inotify los eventos solo marcan candidatos (sin recorrer el árbol);
+    sin inotify (Windows, límite de watches agotado) se recorre el árbol cada
+    `intervalo_s` y se comparan tamaños.
+    """
+    def __init__(self, carpetas: list, extensiones: tuple, estable_s: float = None,
+                 intervalo_s: float = None, log: Optional[Callable] = None, usar_inotify: bool = True):
+        self.carpetas = [os.path.abspath(c) for c in carpetas]
+        self.extensiones = tuple(e.lower() for e in extensiones)
+        self.estable_s = VIGILANCIA_ESTABLE_S if estable_s is None else estable_s
+        self.intervalo_s = VIGILANCIA_INTERVALO_S if intervalo_s is None else intervalo_s
+        self._log = log or (lambda msg: None)
+        self._usar_inotify = usar_inotify
+        self._inotify = None
+        self._candidatos = {}  # ruta -> (tamaño, mtime_ns, momento del último cambio)
+        self._vistos = {}      # ruta -> (tamaño, mtime_ns) ya entregados
+
+    def _es_audio(self, ruta: str) -> bool:
+        nombre = os.path.basename(ruta)
+        return nombre.lower().endswith(self.extensiones) and not nombre.startswith(("~", "."))
+
+    def _recorrer(self, raiz: str, agregar_watches: bool = False):
+        """Marca como candidatos los audios nuevos o cambiados bajo `raiz`."""
+        for carpeta, subcarpetas, archivos in os.walk(raiz):
+            # Checkpoints y cachés propios (.transcriptor) no se vigilan
+            subcarpetas[:] = [d for d in subcarpetas if not d.startswith(".")]
+            if agregar_watches:
+                self._inotify.agregar(carpeta)
+            for nombre in archivos:
+                ruta = os.path.join(carpeta, nombre)
+                if self._es_audio(ruta):
+                    self._marcar(ruta)
+
+    def _marcar(self, ruta: str):
+        try:
+            st = os.stat(ruta)
+        except OSError:
+            self._candidatos.pop(ruta, None)
+            return
+        firma = (st.st_size, st.st_mtime_ns)
+        if self._vistos.get(ruta) == firma:
+            return
+        previo = self._candidatos.get(ruta)
+        if previo is None or previo[:2] != firma:
+            self._candidatos[ruta] = (*firma, time.monotonic())
+
+    def _estables(self) -> list:
+        """Candidatos sin cambios durante estable_s (y no vacíos): se entregan una sola vez."""
+        ahora = time.monotonic()
+        listos = []
+        for ruta in list(self._candidatos):
+            self._marcar(ruta)
+            if ruta not in self._candidatos:
+                continue  # Borrado o movido antes de completarse
+            tamano, mtime_ns, desde = self._candidatos[ruta]
+            if tamano > 0 and ahora - desde >= self.estable_s:
+                del self._candidatos[ruta]
+                self._vistos[ruta] = (tamano, mtime_ns)
+                listos.append(ruta)
+        return sorted(listos)
+
+    def _iniciar_inotify(self) -> bool:
+        if not self._usar_inotify:
+            return False
+        try:
+            self._inotify = _Inotify()
+            for raiz in self.carpetas:
+                self._recorrer(raiz, agregar_watches=True)
+            return True
+        except OSError as e:
+            if self._inotify:
+                self._inotify.cerrar()
+            self._inotify = None
+            self._log(f"⚠ inotify no disponible ({e.strerror or e}); se revisarán las carpetas cada {self.intervalo_s:g} s.")
+            return False
+
+    def _esperar_eventos(self, timeout: float):
+        for ruta, es_carpeta in self._inotify.leer(timeout):
+            if ruta is None:
+                # Cola del kernel desbordada: un recorrido completo recupera lo perdido
+                for raiz in self.carpetas:
+                    self._recorrer(raiz)
+            elif es_carpeta:
+                if not os.path.basename(ruta).startswith("."):
+                    # Los archivos copiados antes de que exista el watch se recogen recorriéndola
+                    self._recorrer(ruta, agregar_watches=True)
+            elif self._es_audio(ruta):
+                self._marcar(ruta)
+
+    def ejecutar(self, al_llegar: Callable, detener: Optional[threading.Event] = None):
+        """
+        Bucle de vigilancia: llama a al_llegar(rutas) con cada tanda de audios
+        estables (los que ya estaban al iniciar incluidos) hasta que se active `detener`.
+        """
+        detener = detener or threading.Event()
+        con_inotify = self._iniciar_inotify()
+        if not con_inotify:
+            for raiz in self.carpetas:
+                self._recorrer(raiz)
+        self._log(f"👁 Vigilando {len(self.carpetas)} carpeta(s) con {'inotify' if con_inotify else 'sondeo periódico'}: "
+                  f"{', '.join(self.carpetas)}")
+
+        try:
+            while not detener.is_set():
+                # Con candidatos pendientes se revisa seguido para no demorar su entrega
+                espera = min(self.intervalo_s, self.estable_s / 2) if self._candidatos else self.intervalo_s
+                if con_inotify:
+                    try:
+                        self._esperar_eventos(espera)
+                    except OSError as e:
+                        self._log(f"⚠ inotify falló ({e}); se pasa a sondeo periódico.")
+                        self._inotify.cerrar()
+                        self._inotify = None
+                        con_inotify = False
+                else:
+                    if detener.wait(espera):
+                        break
+                    for raiz in self.carpetas:
+                        self._recorrer(raiz)
+
+                listos = self._estables()
+                if listos:
+                    al_llegar(listos)
+        finally:
+            if self._inotify:
+                self._inotify.cerrar()
+                self._inotify = None
+
+def agrupar_por_carpeta(rutas: list) -> dict:
+    """{carpeta: [nombres]}: el pipeline procesa (y deja los .docx) carpeta por carpeta."""
+    grupos = {}
+    for ruta in rutas:
+        grupos.setdefault(os.path.dirname(ruta), []).append(os.path.basename(ruta))
+    return grupos
@@ -1,11 +1,20 @@
 # exporters/docx_exporter.py
+import os
 import re
+import copy
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
 from docx import Document
+from docx.text.paragraph import Paragraph
+from docx.parts.hdrftr import HeaderPart, FooterPart
 from docx.shared import Pt, Cm, Mm
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
 
+from config.settings import MOTOR_DOCX, DOCX_FLUJO_MIN_SEGMENTOS
+
 # --- MOTOR DE BÚSQUEDA PROFESIONAL (Basado en el motor de Wordy) ---
 class RunMatcher:
     """
@@ -22,6 +31,7 @@ class RunMatcher:
     def _build_map(self):
         """Construye el mapa de texto normalizando espacios de Word."""
         pos = 0
+        textos = []
         for run in self.paragraph.runs:
             text = run.text if run.text else ""
             # Sincronización con Wordy: manejo de \xa0
@@ -33,8 +43,9 @@ class RunMatcher:
                 "start": pos, 
                 "end": pos + length
             })
-            self.full_text += normalized_text
+            textos.append(normalized_text)
             pos += length
+        self.full_text = "".join(textos)
 
     def format_matches(self):
         """Busca coincidencias y aplica negrita + subrayado."""
@@ -140,108 +151,234 @@ def add_page_number(paragraph):
     paragraph.add_run('')._r.append(instrText)
     paragraph.add_run('')._r.append(fldChar2)
 
-def export_to_docx(segments, output_path, template_path=None):
+@lru_cache(maxsize=8)
+def _patron_negritas(keywords: tuple):
+    return _compile_super_regex(list(keywords))
+
+def tramos_negrita(texto: str, bold_pattern) -> list:
+    """
+    Trozos (texto, negrita) de un turno, calculados antes de crear los runs.
+    Misma regla que RunMatcher sobre un run único: las coincidencias se aplican
+    de atrás hacia adelante y solo la última queda en negrita+subrayado.
+    """
+    ultima = None
+    if bold_pattern is not None:
+        for ultima in bold_pattern.finditer(texto.replace('\xa0', ' ')):
+            pass
+    if ultima is None:
+        return [(texto, False)]
+
+    inicio, fin = ultima.span()
+    tramos = [(texto[inicio:fin], True)]
+    if inicio > 0:
+        tramos.insert(0, (texto[:inicio], False))
+    if fin < len(texto):
+        tramos.append((texto[fin:], False))
+    return tramos
+
+def _agregar_turno(par, texto: str, bold_pattern):
+    """Runs Arial 11 del turno con el orador ya en negrita+subrayado (sin dividir runs después)."""
+    for trozo, negrita in tramos_negrita(texto, bold_pattern):
+        run = par.add_run(trozo)
+        run.font.name = 'Arial'
+        run.font.size = Pt(11)
+        if negrita:
+            run.bold = True
+            run.underline = True
+
+# --- CACHÉ DE PLANTILLAS ---
+MARCADOR = "{{TRANSCRIPCION}}"
+MAX_PLANTILLAS = 4
+
+class PlantillaCacheada:
+    """
+    Plantilla .docx abierta UNA sola vez. Conserva el XML original del cuerpo,
+    encabezados y pies, y la ruta (índices de hijos) de cada párrafo con el
+    marcador. Cada exportación trabaja sobre una copia profunda de ese XML y
+    comparte imágenes, estilos y demás partes sin volver a descomprimir el archivo.
+    Las negritas de los párrafos fijos se aplican una vez por patrón y quedan
+    en la copia base: solo los párrafos que contienen un orador pasan por RunMatcher.
+    """
+    def __init__(self, template_path: str):
+        self.documento = Document(template_path)
+        # Recorrer encabezados/pies crea los que falten (como en cada exportación):
+        # se crean aquí una vez para que la copia por documento nunca toque el paquete
+        for section in self.documento.sections:
+            for parte in (section.header, section.footer):
+                parte.paragraphs
+        paquete = self.documento.part.package
+        self.originales = {
+            parte: parte._element for parte in paquete.iter_parts()
+            if parte is self.documento.part or isinstance(parte, (HeaderPart, FooterPart))
+        }
+        self.marcadores = self._ubicar_marcadores()
+        self._con_negritas = {}
+        self._candado = threading.Lock()
+
+    def _ubicar_marcadores(self) -> list:
+        """Mismo orden de búsqueda que la inserción: cuerpo y, si no está ahí, celdas de tablas."""
+        doc = self.documento
+        raiz = doc.element
+
+        def ruta(elemento):
+            indices = []
+            while elemento is not raiz:
+                padre = elemento.getparent()
+                indices.append(padre.index(elemento))
+                elemento = padre
+            return indices[::-1]
+
+        en_cuerpo = [ruta(p._p) for p in doc.paragraphs if MARCADOR in p.text]
+        if en_cuerpo:
+            return en_cuerpo
+
+        vistos = set()
+        rutas = []
+        for table in doc.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    # Una celda combinada aparece varias veces: su marcador solo se usa la primera
+                    encontrados = [p for p in cell.paragraphs if MARCADOR in p.text and p._p not in vistos]
+                    if encontrados:
+                        for p in encontrados:
+                            vistos.add(p._p)
+                            rutas.append(ruta(p._p))
+                        break
+        return rutas
+
+    def _parrafos_fijos(self, doc):
+        """Párrafos que el exportador resalta: cuerpo (sin tablas), encabezados y pies."""
+        yield from doc.paragraphs
+        for section in doc.sections:
+            yield from section.header.paragraphs
+            yield from section.footer.paragraphs
+
+    def _base(self, bold_pattern) -> dict:
+        """XML base de cada parte; con patrón, el de la plantilla con sus negritas ya aplicadas."""
+        if bold_pattern is None:
+            return self.originales
+        base = self._con_negritas.get(bold_pattern)
+        if base is None:
+            for parte, original in self.originales.items():
+                parte._element = copy.deepcopy(original)
+            try:
+                doc = self.documento.part.document
+                # Solo se construye RunMatcher donde el texto del párrafo tiene coincidencias
+                for p in self._parrafos_fijos(doc):
+                    if bold_pattern.search("".join(r.text for r in p.runs).replace('\xa0', ' ')):
+                        RunMatcher(p, bold_pattern).format_matches()
+                base = {parte: parte._element for parte in self.originales}
+            finally:
+                for parte, original in self.originales.items():
+                    parte._element = original
+            self._con_negritas[bold_pattern] = base
+        return base
+
+    @contextmanager
+    def copia(self, bold_pattern=None):
+        """Documento nuevo (copia del XML) y sus párrafos marcador, listos para insertar."""
+        with self._candado:
+            for parte, original in self._base(bold_pattern).items():
+                parte._element = copy.deepcopy(original)
+            try:
+                doc = self.documento.part.document
+                marcadores = []
+                for ruta in self.marcadores:
+                    elemento = doc.element
+                    for indice in ruta:
+                        elemento = elemento[indice]
+                    marcadores.append(Paragraph(elemento, doc.part))
+                yield doc, marcadores
+            finally:
+                for parte, original in self.originales.items():
+                    parte._element = original
+
+_PLANTILLAS = {}
+_PLANTILLAS_CANDADO = threading.Lock()
+
+def obtener_plantilla(template_path: str) -> PlantillaCacheada:
+    """Plantilla parseada en caché; se vuelve a leer si el archivo cambió en disco."""
+    ruta = os.path.abspath(template_path)
+    st = os.stat(ruta)
+    firma = (st.st_size, st.st_mtime_ns)
+    with _PLANTILLAS_CANDADO:
+        entrada = _PLANTILLAS.get(ruta)
+        if entrada is None or entrada[0] != firma:
+            if len(_PLANTILLAS) >= MAX_PLANTILLAS:
+                _PLANTILLAS.clear()
+            entrada = _PLANTILLAS[ruta] = (firma, PlantillaCacheada(ruta))
+        return entrada[1]
+
+def _insertar_segmentos(p, segments, bold_pattern=None):
+    """Reemplaza el párrafo marcador por los turnos de la transcripción."""
+    style = p.style
+    alignment = p.alignment
+
+    for i, segment in enumerate(segments):
+        text_content = f"{segment['speaker']}: {segment['text']}"
+        text_p = p.insert_paragraph_before("", style)
+        text_p.alignment = alignment
+        _agregar_turno(text_p, text_content, bold_pattern)
+
+        # V1.0: Restauramos el espacio SOLO entre oradores para legibilidad
+        if i < len(segments) - 1:
+            empty_p = p.insert_paragraph_before("", style)
+            run = empty_p.add_run(' ')
+            run.font.name = 'Arial'
+            run.font.size = Pt(11)
+
+    p._element.getparent().remove(p._element)
+
+def export_to_docx(segments, output_path, template_path=None, motor=None):
     """
     Genera un archivo DOCX con inteligencia lingüística enfocada.
     Resalta hablantes en párrafos, encabezados y pies de página, pero ignora TABLAS
     para proteger datos institucionales (como el nombre del Fiscal).
+    Las transcripciones largas se delegan al motor en flujo (exporters.docx_stream).
     """
-    keywords = ["Psicologo", "Psicologa", "Victima"]
-    bold_pattern = _compile_super_regex(keywords)
+    motor = motor or MOTOR_DOCX
+    if motor == "flujo" or (motor == "auto" and len(segments) >= DOCX_FLUJO_MIN_SEGMENTOS):
+        from exporters.docx_stream import exportar_en_flujo
+        return exportar_en_flujo(segments, output_path, template_path)
+
+    keywords = ("Psicologo", "Psicologa", "Victima")
+    bold_pattern = _patron_negritas(keywords)
 
     if template_path:
-        doc = Document(template_path)
-        
-        # --- 1. BUSCAR Y REEMPLAZAR MARCADOR (Cuerpo y Tablas) ---
-        def procesar_parrafos_para_insercion(paragraphs):
-            encontrado = False
-            for p in list(paragraphs):
-                if "{{TRANSCRIPCION}}" in p.text:
-                    style = p.style
-                    alignment = p.alignment
-                    
-                    for i, segment in enumerate(segments):
-                        text_content = f"{segment['speaker']}: {segment['text']}"
-                        text_p = p.insert_paragraph_before(text_content, style)
-                        text_p.alignment = alignment
-
-                        for run in text_p.runs:
-                            run.font.name = 'Arial'
-                            run.font.size = Pt(11)
-                        
-                        # V1.0: Restauramos el espacio SOLO entre oradores para legibilidad
-                        if i < len(segments) - 1:
-                            empty_p = p.insert_paragraph_before("", style)
-                            run = empty_p.add_run(' ')
-                            run.font.name = 'Arial'
-                            run.font.size = Pt(11)
-
-                    p._element.getparent().remove(p._element)
-                    encontrado = True
-            return encontrado
-
-        # Buscar en cuerpo
-        placeholder_found = procesar_parrafos_para_insercion(doc.paragraphs)
-        
-        # Buscar en tablas (Solo para el marcador, no aplicamos negritas aquí)
-        if not placeholder_found:
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        if procesar_parrafos_para_insercion(cell.paragraphs):
-                            placeholder_found = True
-                            break
-        
-        # --- 2. ESCANEO QUIRÚRGICO DE NEGRITAS (Solo Párrafos Libres) ---
-        # No procesamos tablas aquí para proteger nombres de fiscales y otros datos.
-        
-        for p in doc.paragraphs:
-            matcher = RunMatcher(p, bold_pattern)
-            matcher.format_matches()
+        # Párrafos fijos (cuerpo, encabezados y pies) ya resaltados en la copia base
+        with obtener_plantilla(template_path).copia(bold_pattern) as (doc, marcadores):
+            # --- 1. REEMPLAZAR MARCADOR (ubicado una sola vez al cachear la plantilla) ---
+            # No resaltamos dentro de TABLAS para proteger nombres de fiscales y otros datos.
+            body = doc.element.body
+            for p in marcadores:
+                _insertar_segmentos(p, segments, bold_pattern if p._p.getparent() is body else None)
 
-        for section in doc.sections:
-            for p in section.header.paragraphs:
-                matcher = RunMatcher(p, bold_pattern)
-                matcher.format_matches()
-                
-            for p in section.footer.paragraphs:
-                matcher = RunMatcher(p, bold_pattern)
-                matcher.format_matches()
-        
-        if not placeholder_found:
-            # Si no hay marcador, añadir al final
-            for s in segments:
-                p = doc.add_paragraph(f"{s['speaker']}: {s['text']}")
-                for run in p.runs:
-                    run.font.name = 'Arial'
-                    run.font.size = Pt(11)
-                matcher = RunMatcher(p, bold_pattern)
-                matcher.format_matches()
-
-    else:
-        doc = Document()
-        # ... (Configuración de página por defecto) ...
-        section = doc.sections[0]
-        section.page_height = Mm(330); section.page_width = Mm(216)
-        section.left_margin = Cm(2); section.right_margin = Cm(2)
-        section.top_margin = Cm(2); section.bottom_margin = Cm(2)
-        
-        p_footer = section.footer.paragraphs[0] if section.footer.paragraphs else section.footer.add_paragraph()
-        p_footer.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        add_page_number(p_footer)
+            if not marcadores:
+                # Si no hay marcador, añadir al final
+                for s in segments:
+                    _agregar_turno(doc.add_paragraph(), f"{s['speaker']}: {s['text']}", bold_pattern)
 
-        doc.add_heading('Transcripción', level=1)
-        doc.add_paragraph()
-        
-        for s in segments:
-            par = doc.add_paragraph()
-            run = par.add_run(f"{s['speaker']}: {s['text']}")
-            run.font.name = 'Arial'
-            run.font.size = Pt(11)
-            par.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-            
-            # Aplicar motor de resaltado
-            matcher = RunMatcher(par, bold_pattern)
-            matcher.format_matches()
+            doc.save(output_path)
+        return
+
+    doc = Document()
+    # ... (Configuración de página por defecto) ...
+    section = doc.sections[0]
+    section.page_height = Mm(330); section.page_width = Mm(216)
+    section.left_margin = Cm(2); section.right_margin = Cm(2)
+    section.top_margin = Cm(2); section.bottom_margin = Cm(2)
+
+    p_footer = section.footer.paragraphs[0] if section.footer.paragraphs else section.footer.add_paragraph()
+    p_footer.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    add_page_number(p_footer)
+
+    doc.add_heading('Transcripción', level=1)
+    doc.add_paragraph()
+
+    for s in segments:
+        par = doc.add_paragraph()
+        # Orador resaltado al crear los runs (motor de resaltado incorporado)
+        _agregar_turno(par, f"{s['speaker']}: {s['text']}", bold_pattern)
+        par.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
 
     doc.save(output_path)
@@ -0,0 +1,173 @@
+# exporters/docx_stream.py
+import copy
+import zipfile
+from lxml import etree
+from docx import Document
+from docx.shared import Pt, Cm, Mm
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
+from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from docx.opc.pkgwriter import _ContentTypesItem
+from docx.text.run import Run
+
+from exporters.docx_exporter import (
+    obtener_plantilla, tramos_negrita, _patron_negritas, add_page_number
+)
+
+# Motor en flujo: el cuerpo de la transcripción NUNCA se arma con objetos de
+# python-docx. La plantilla sale de la caché (párrafos fijos, encabezados y pies
+# ya resaltados), cada marcador se cambia por un comentario centinela y, al
+# guardar, document.xml se escribe trozo a trozo: el XML de la plantilla hasta
+# el centinela, los turnos uno por uno serializados con lxml
+# directo al .zip (memoria acotada a un párrafo) y luego el resto de la plantilla.
+CENTINELA = "TRANSCRIPTOR-FLUJO"
+
+def _propiedades_run(negrita: bool):
+    """rPr idéntico al que deja el motor python-docx (Arial 11, con o sin negrita+subrayado)."""
+    run = Run(OxmlElement("w:r"), None)
+    run.font.name = 'Arial'
+    run.font.size = Pt(11)
+    if negrita:
+        run.bold = True
+        run.underline = True
+    return run._r.rPr
+
+class _Formato:
+    """Propiedades de párrafo y de run que se clonan para cada turno."""
+    def __init__(self, ppr_texto, ppr_separador, separar: bool, negritas: bool = True):
+        self.ppr_texto = ppr_texto
+        self.ppr_separador = ppr_separador
+        self.separar = separar
+        self.negritas = negritas  # Los turnos dentro de tablas no pasan por RunMatcher
+        self.rpr_normal = _propiedades_run(False)
+        self.rpr_negrita = _propiedades_run(True)
+
+def _formato_desde(p, body) -> _Formato:
+    """
+    Obtiene pPr ejecutando las mismas llamadas que _insertar_segmentos sobre un
+    párrafo de prueba (estilo y alineación del marcador), y lo descarta.
+    """
+    style = p.style
+    alignment = p.alignment
+    texto = p.insert_paragraph_before("", style)
+    texto.alignment = alignment
+    separador = p.insert_paragraph_before("", style)
+    formato = _Formato(texto._p.pPr, separador._p.pPr, separar=True, negritas=p._p.getparent() is body)
+    for prueba in (texto, separador):
+        prueba._p.getparent().remove(prueba._p)
+    return formato
+
+def _centinela(elemento, indice: int):
+    """Cambia el párrafo por el comentario que marca dónde se escriben los turnos."""
+    elemento.addprevious(etree.Comment(f"{CENTINELA}-{indice}"))
+    elemento.getparent().remove(elemento)
+
+def _centinela_al_final(doc, indice: int):
+    """Centinela al final del cuerpo, antes de sectPr (donde add_paragraph insertaría)."""
+    body = doc.element.body
+    comentario = etree.Comment(f"{CENTINELA}-{indice}")
+    if body.sectPr is not None:
+        body.sectPr.addprevious(comentario)
+    else:
+        body.append(comentario)
+
+def _nuevo_run(texto: str, rpr):
+    r = OxmlElement("w:r")
+    r.append(copy.deepcopy(rpr))
+    r.text = texto  # w:t / w:tab / w:br exactamente como Run.text de python-docx
+    return r
+
+def _parrafo(segment: dict, formato: _Formato, bold_pattern):
+    texto = f"{segment['speaker']}: {segment['text']}"
+    p = OxmlElement("w:p")
+    if formato.ppr_texto is not None:
+        p.append(copy.deepcopy(formato.ppr_texto))
+
+    for trozo, negrita in tramos_negrita(texto, bold_pattern if formato.negritas else None):
+        p.append(_nuevo_run(trozo, formato.rpr_negrita if negrita else formato.rpr_normal))
+    return p
+
+def _separador(formato: _Formato):
+    p = OxmlElement("w:p")
+    if formato.ppr_separador is not None:
+        p.append(copy.deepcopy(formato.ppr_separador))
+    p.append(_nuevo_run(' ', formato.rpr_normal))
+    return p
+
+def _escribir_turnos(destino, segments, formato: _Formato, bold_pattern):
+    # Cada párrafo se serializa y se suelta al instante (etree.xmlfile exige una
+    # raíz única y aquí se escribe un fragmento en medio de <w:body>)
+    ultimo = len(segments) - 1
+    for i, segment in enumerate(segments):
+        destino.write(etree.tostring(_parrafo(segment, formato, bold_pattern), encoding="UTF-8"))
+        if formato.separar and i < ultimo:
+            destino.write(etree.tostring(_separador(formato), encoding="UTF-8"))
+
+def _guardar(doc, output_path: str, segments, formatos: list, bold_pattern):
+    """Equivalente a Document.save(), salvo que document.xml se escribe en flujo."""
+    paquete = doc.part.package
+    partes = list(paquete.iter_parts())
+    for parte in partes:
+        parte.before_marshal()
+
+    with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(CONTENT_TYPES_URI.membername, _ContentTypesItem.from_parts(partes).blob)
+        zf.writestr(PACKAGE_URI.rels_uri.membername, paquete.rels.xml)
+        for parte in partes:
+            if parte is doc.part:
+                trozos = parte.blob.split(f"<!--{CENTINELA}-".encode("utf-8"))
+                with zf.open(parte.partname.membername, "w") as destino:
+                    destino.write(trozos[0])
+                    for trozo in trozos[1:]:
+                        numero, resto = trozo.split(b"-->", 1)
+                        _escribir_turnos(destino, segments, formatos[int(numero)], bold_pattern)
+                        destino.write(resto)
+            else:
+                zf.writestr(parte.partname.membername, parte.blob)
+            if len(parte.rels):
+                zf.writestr(parte.partname.rels_uri.membername, parte.rels.xml)
+
+def exportar_en_flujo(segments, output_path, template_path=None):
+    """
+    Mismo documento que export_to_docx (marcador, negritas de oradores, tablas
+    intactas) pero sin construir la transcripción con python-docx: pensado para
+    entrevistas de varias horas (decenas de miles de párrafos).
+    """
+    keywords = ("Psicologo", "Psicologa", "Victima")
+    bold_pattern = _patron_negritas(keywords)
+
+    if template_path:
+        # Los párrafos fijos de la plantilla ya vienen resaltados en la copia base
+        with obtener_plantilla(template_path).copia(bold_pattern) as (doc, marcadores):
+            formatos = []
+            for p in marcadores:
+                formatos.append(_formato_desde(p, doc.element.body))
+                _centinela(p._p, len(formatos) - 1)
+
+            if not marcadores:
+                # Sin marcador: los turnos van al final, sin separadores (como add_paragraph)
+                formatos.append(_Formato(None, None, separar=False))
+                _centinela_al_final(doc, 0)
+
+            _guardar(doc, output_path, segments, formatos, bold_pattern)
+        return
+
+    doc = Document()
+    section = doc.sections[0]
+    section.page_height = Mm(330); section.page_width = Mm(216)
+    section.left_margin = Cm(2); section.right_margin = Cm(2)
+    section.top_margin = Cm(2); section.bottom_margin = Cm(2)
+
+    p_footer = section.footer.paragraphs[0] if section.footer.paragraphs else section.footer.add_paragraph()
+    p_footer.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    add_page_number(p_footer)
+
+    doc.add_heading('Transcripción', level=1)
+    doc.add_paragraph()
+
+    prueba = doc.add_paragraph()
+    prueba.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+    formato = _Formato(prueba._p.pPr, None, separar=False)
+    _centinela(prueba._p, 0)
+
+    _guardar(doc, output_path, segments, [formato], bold_pattern)
@@ -1,4 +1,5 @@
 ﻿import os
+import json
 import subprocess
 import sys
 import multiprocessing
@@ -12,6 +13,7 @@ from tkinterdnd2 import DND_FILES
 from core.image_manager import ImageManager
 from core import resources
 from core.i18n import _
+from core.planificacion import formatear
 from config import persistence
 from gui.widgets import create_image_button
 from gui.about_window import AboutWindow
@@ -23,6 +25,9 @@ ACCENT_COLOR = "#fcbf49"
 TEXT_COLOR = "white"
 FONT_FAMILY = "Segoe UI"
 
+# CREATE_NO_WINDOW: procesos en segundo plano sin consola (fuera de Windows, Popen rechaza el flag)
+SIN_CONSOLA = 0x08000000 if sys.platform == "win32" else 0
+
 # ===================== VENTANA PRINCIPAL =====================
 class TranscriptorGUI:
     def __init__(self, root):
@@ -58,6 +63,7 @@ class TranscriptorGUI:
 
         self.progress_queue = queue.Queue()
         self.proceso_hijo = None
+        self.conexion_servicio = None
 
         ancho, alto = 870, 670
         self.root.resizable(False, False)
@@ -100,6 +106,11 @@ class TranscriptorGUI:
                                 self.proceso_hijo.kill()
                     except:
                         pass
+
+                # Con el servicio residente solo se corta la conexión: el trabajo termina en segundo plano
+                if self.conexion_servicio:
+                    try: self.conexion_servicio.close()
+                    except: pass
                 
                 # Forzar el cierre de la ventana inmediatamente
                 self.root.quit()
@@ -177,13 +188,16 @@ class TranscriptorGUI:
                 if isinstance(message, tuple):
                     command, data = message
                     if command == 'log': self._log_message(data)
+                    elif command == 'eta': self._mostrar_eta(data)
                     elif command == 'error':
                         self.desbloquear_botones()
                         self.progreso['value'] = 0
+                        self.eta_var.set("")
                         StyledDialog(self.root, _("dialog.error.title"), str(data), dialog_type="error", image_manager=self.image_manager)
                     elif command == 'done':
                         self.desbloquear_botones()
                         self.progreso['value'] = 100
+                        self.eta_var.set("")
                         # Pasar la carpeta actual para que el diÃ¡logo pueda abrirla
                         StyledDialog(self.root, _("dialog.done.title"), str(data), 
                                      dialog_type="success", image_manager=self.image_manager,
@@ -193,6 +207,14 @@ class TranscriptorGUI:
         except queue.Empty: pass
         self.root.after(200, self.check_queue)
 
+    def _mostrar_eta(self, estado):
+        """Tiempo restante del lote y del archivo en curso (estimado con el historial de rendimiento)."""
+        if estado.get("restante_lote") is None: return
+        texto = _("label.eta_batch", tiempo=formatear(estado["restante_lote"]))
+        if estado.get("archivo") and estado.get("restante_archivo") is not None:
+            texto += "   ·   " + _("label.eta_file", archivo=estado["archivo"], tiempo=formatear(estado["restante_archivo"]))
+        self.eta_var.set(texto)
+
     def crear_widgets(self):
         title_photo = self.image_manager.load(self.title_path, size=(400, 65), add_relief_effect=True, add_shadow_effect=True)
         logo_photo = self.image_manager.load(self.logo_path, size=(115, 115), add_relief_effect=False, add_shadow_effect=False)
@@ -279,6 +301,9 @@ class TranscriptorGUI:
         self.progreso = ttk.Progressbar(self.root, orient="horizontal", length=830, mode="determinate", style='Custom.Horizontal.TProgressbar')
         self.progreso.pack(padx=20, pady=5)
 
+        self.eta_var = tk.StringVar(value="")
+        tk.Label(self.root, textvariable=self.eta_var, bg=BG_COLOR, fg="#A1D6E2", font=(FONT_FAMILY, 9, "italic")).pack(padx=20, anchor="w")
+
         self.log_text = scrolledtext.ScrolledText(self.root, state="disabled", height=22, font=("Consolas", 11), bg="#002b36", fg="#F8F8F2", insertbackground="black")
         self.log_text.pack(fill=tk.BOTH, expand=True, padx=20, pady=(10, 20))
 
@@ -287,6 +312,7 @@ class TranscriptorGUI:
         self.carpeta_var.set("")
         self.plantilla_var.set("")
         self.progreso['value'] = 0
+        self.eta_var.set("")
         
         # Limpiar el ÃƒÂ¡rea de logs
         self.log_text.configure(state="normal")
@@ -400,6 +426,7 @@ class TranscriptorGUI:
         self.bloquear_botones()
         self.guardar_config_actual()
         self.progreso['value'] = 0
+        self.eta_var.set("")
         self._log_message(_("log.starting"))
 
         # Determinar la ruta al ejecutable de Python y al script worker (Blindaje de Portabilidad)
@@ -407,7 +434,12 @@ class TranscriptorGUI:
         python_exe = os.environ.get("APP_PYTHON_EXE", os.path.join(BASE_DIR, "whisper_env", "Scripts", "pythonw.exe"))
         worker_script = os.path.join(BASE_DIR, "worker.py")
 
-        # Lanzar el proceso de trabajo
+        # 1. Servicio residente: los modelos ya están cargados de corridas anteriores
+        trabajo = {"folder": carpeta, "template": plantilla, "model": modelo, "gender": genero_profesional}
+        if self.config.get("usar_servicio", True) and self._iniciar_en_servicio(trabajo, python_exe, worker_script):
+            return
+
+        # 2. Respaldo: proceso de trabajo dedicado para esta carpeta
         try:
             # Pasamos los argumentos necesarios al worker.py
             cmd = [
@@ -433,7 +465,7 @@ class TranscriptorGUI:
                 bufsize=1,
                 universal_newlines=True,
                 env=env,
-                creationflags=0x08000000,
+                creationflags=SIN_CONSOLA,
                 close_fds=True
             )
             
@@ -441,16 +473,7 @@ class TranscriptorGUI:
             import threading
             def read_output():
                 for line in iter(self.proceso_hijo.stdout.readline, ""):
-                    line = line.strip()
-                    if line.startswith("PROG:"):
-                        try: self.progress_queue.put(float(line.split(":")[1]))
-                        except: pass
-                    elif line.startswith("LOG:"):
-                        self.progress_queue.put(('log', line.split(":", 1)[1].strip()))
-                    elif line.startswith("ERROR:"):
-                        self.progress_queue.put(('error', line.split(":", 1)[1].strip()))
-                    elif line.startswith("DONE:"):
-                        self.progress_queue.put(('done', line.split(":", 1)[1].strip()))
+                    self._procesar_linea(line)
                 
                 self.proceso_hijo.stdout.close()
                 return_code = self.proceso_hijo.wait()
@@ -463,6 +486,67 @@ class TranscriptorGUI:
             self.desbloquear_botones()
             StyledDialog(self.root, _("dialog.error.title"), f"Error al lanzar el proceso: {str(e)}", dialog_type="error", image_manager=self.image_manager)
 
+    def _procesar_linea(self, line):
+        """Traduce el protocolo del worker (PROG:/LOG:/ETA:/ERROR:/DONE:) a la cola de la interfaz."""
+        line = line.strip()
+        if line.startswith("PROG:"):
+            try: self.progress_queue.put(float(line.split(":")[1]))
+            except: pass
+        elif line.startswith("LOG:"):
+            self.progress_queue.put(('log', line.split(":", 1)[1].strip()))
+        elif line.startswith("ETA:"):
+            try: self.progress_queue.put(('eta', json.loads(line.split(":", 1)[1])))
+            except: pass
+        elif line.startswith("ERROR:"):
+            self.progress_queue.put(('error', line.split(":", 1)[1].strip()))
+        elif line.startswith("DONE:"):
+            self.progress_queue.put(('done', line.split(":", 1)[1].strip()))
+
+    def _iniciar_en_servicio(self, trabajo, python_exe, worker_script):
+        """
+        Envía el trabajo al servicio residente (worker.py --servicio), lanzándolo si no existe.
+        Devuelve False si no se pudo conectar, para usar el proceso dedicado de siempre.
+        """
+        from core import service
+        conexion = service.conectar_servicio()
+        if conexion is None:
+            try:
+                subprocess.Popen(
+                    [python_exe, "-u", worker_script, "--servicio"],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                    creationflags=SIN_CONSOLA, close_fds=True
+                )
+            except Exception:
+                return False
+            conexion = service.esperar_servicio()
+            if conexion is None:
+                return False
+
+        try:
+            conexion.send(trabajo)
+        except Exception:
+            return False
+        self.conexion_servicio = conexion
+
+        import threading
+        def read_service():
+            try:
+                while True:
+                    line = conexion.recv()
+                    if line == service.FIN_TRABAJO:
+                        break
+                    self._procesar_linea(line)
+            except (EOFError, OSError):
+                if self.transcribiendo:
+                    self.progress_queue.put(('error', "Se perdió la conexión con el servicio de transcripción."))
+            finally:
+                try: conexion.close()
+                except: pass
+                self.conexion_servicio = None
+
+        threading.Thread(target=read_service, daemon=True).start()
+        return True
+
 if __name__ == "__main__":
     multiprocessing.freeze_support()
     try:
@@ -0,0 +1,24 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import resources
+
+def _cache_en(raiz: str):
+    def cache_path(*subdirs):
+        path = os.path.join(raiz, "models_cache", *subdirs)
+        os.makedirs(path, exist_ok=True)
+        return path
+    return cache_path
+
+# Los módulos que compilan su caché al importarse (utils.text) tampoco escriben en models_cache
+resources.cache_path = _cache_en(tempfile.mkdtemp(prefix="transcriptor_tests_"))
+
+@pytest.fixture(autouse=True)
+def cache_temporal(tmp_path, monkeypatch):
+    """Las bases SQLite (índice, historial, cola) van a una carpeta temporal, no a models_cache."""
+    monkeypatch.setattr(resources, "cache_path", _cache_en(str(tmp_path)))
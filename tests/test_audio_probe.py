@@ -0,0 +1,48 @@
+import struct
+
+import pytest
+
+from core.audio_probe import sondear
+
+MUESTRAS = b"\x00\x01" * 16000  # 1 s de PCM 16 bits, mono, 16 kHz
+
+def wav(tamano_datos: int, muestras: bytes = MUESTRAS) -> bytes:
+    fmt = struct.pack("<HHIIHH", 1, 1, 16000, 32000, 2, 16)
+    cuerpo = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", tamano_datos) + muestras
+    return b"RIFF" + struct.pack("<I", len(cuerpo)) + cuerpo
+
+@pytest.fixture
+def escribir(tmp_path):
+    def escribir(nombre: str, contenido: bytes) -> str:
+        ruta = tmp_path / nombre
+        ruta.write_bytes(contenido)
+        return str(ruta)
+    return escribir
+
+def test_wav_completo(escribir):
+    info = sondear(escribir("a.wav", wav(len(MUESTRAS))))
+    assert info["error"] is None and info["aviso"] is None
+    assert info["duracion"] == pytest.approx(1.0)
+
+@pytest.mark.parametrize("tamano_datos", [0, 0xFFFFFFFF])
+def test_wav_sin_cerrar_se_procesa_con_duracion_estimada(escribir, tamano_datos):
+    # Grabadora que se apagó: el bloque 'data' dice 0 (o -1) pero las muestras están
+    info = sondear(escribir("cortado.wav", wav(tamano_datos)))
+    assert info["error"] is None
+    assert info["aviso"]
+    assert info["duracion"] == pytest.approx(1.0)
+
+def test_wav_solo_cabecera_se_descarta(escribir):
+    assert sondear(escribir("vacio.wav", wav(0, b"")))["error"]
+
+def test_archivo_vacio_se_descarta(escribir):
+    assert "vacío" in sondear(escribir("cero.mp3", b""))["error"]
+
+def test_m4a_sin_moov_se_descarta(escribir):
+    ftyp = struct.pack(">I4s", 16, b"ftyp") + b"M4A \x00\x00\x00\x00"
+    mdat = struct.pack(">I4s", 1008, b"mdat") + b"\x00" * 1000
+    assert "moov" in sondear(escribir("incompleto.m4a", ftyp + mdat))["error"]
+
+def test_formato_no_reconocido_pasa_sin_duracion(escribir):
+    info = sondear(escribir("raro.mp3", b"\x12\x34" * 5000))
+    assert info["error"] is None and info["duracion"] is None and info["aviso"]
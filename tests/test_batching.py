@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from core import batching
+
+AUDIOS = {"a.wav": np.zeros(16000 * 4, dtype=np.float32), "b.wav": np.zeros(16000 * 2, dtype=np.float32)}
+
+class VadFalso:
+    def preprocess_audio(self, audio):
+        return audio
+
+    def merge_chunks(self, segmentos, chunk_size, onset, offset):
+        return segmentos
+
+    def __call__(self, datos):
+        duracion = len(datos["waveform"]) / batching.SAMPLE_RATE
+        return [{"start": 0.0, "end": duracion}]
+
+class ModeloFalso:
+    """Imita FasterWhisperPipeline: VAD interno, inferencia por lotes y transcribe()."""
+    def __init__(self, falla=None):
+        self.vad_model = VadFalso()
+        self.falla = falla
+        self.por_archivo = 0
+
+    def __call__(self, fragmentos, batch_size, num_workers):
+        for fragmento in fragmentos:
+            if self.falla:
+                raise self.falla
+            yield {"text": f"{len(fragmento['inputs'])} muestras"}
+
+    def transcribe(self, audio, batch_size, language):
+        self.por_archivo += 1
+        return {"segments": [{"text": "x", "start": 0.0, "end": 1.0}], "language": language}
+
+def test_lote_compartido_devuelve_cada_texto_a_su_archivo():
+    resultados = batching.transcribir_lote(ModeloFalso(), AUDIOS, batch_size=2)
+    assert resultados["a.wav"]["segments"][0]["text"] == "64000 muestras"
+    assert resultados["b.wav"]["segments"][0]["end"] == 2.0
+
+def test_error_de_inferencia_se_propaga_sin_repetir_archivo_por_archivo():
+    modelo = ModeloFalso(falla=KeyError("text"))
+    with pytest.raises(KeyError):
+        batching.transcribir_lote(modelo, AUDIOS, batch_size=2)
+    assert modelo.por_archivo == 0
+
+def test_api_incompatible_transcribe_archivo_por_archivo_y_lo_informa():
+    modelo = ModeloFalso()
+    del modelo.vad_model
+    mensajes = []
+    resultados = batching.transcribir_lote(modelo, AUDIOS, batch_size=2, log=mensajes.append)
+    assert modelo.por_archivo == 2 and set(resultados) == set(AUDIOS)
+    assert mensajes and "archivo por archivo" in mensajes[0]
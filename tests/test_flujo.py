@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from core import models
+from core.orchestrator import TranscriptorOrchestrator
+
+ARCHIVOS = [f"a{i}.wav" for i in range(8)]
+
+@pytest.fixture
+def orquestador(monkeypatch):
+    """Orquestador sin modelos reales: cada etapa devuelve datos mínimos."""
+    monkeypatch.setattr(models, "dispositivo", lambda: "cpu")
+    orq = TranscriptorOrchestrator()
+    monkeypatch.setattr(orq, "_restaurar_checkpoint", lambda store, res: res.update(hash=res["name"]) or [])
+    monkeypatch.setattr(orq, "_cargar_modelo", lambda clave, cargador: object())
+    monkeypatch.setattr(orq, "_transcribir", lambda modelo, path: {"segments": []})
+    monkeypatch.setattr(orq, "_alinear", lambda modelo, path, transcripcion, device: {"segments": []})
+    monkeypatch.setattr(orq, "_diarizar", lambda modelo, path: [])
+    return orq
+
+def correr_flujo(orq, carpeta) -> dict:
+    """Corre process_stream en un hilo: si se cuelga, el test falla en vez de bloquearse."""
+    resultado = {}
+
+    def correr():
+        try:
+            orq.process_stream(carpeta, ARCHIVOS, "", "small", "token", "Psicóloga",
+                               residentes=(), tamano_cola=1)
+        except Exception as e:
+            resultado["error"] = e
+
+    hilo = threading.Thread(target=correr, daemon=True)
+    hilo.start()
+    hilo.join(30)
+    assert not hilo.is_alive(), "process_stream quedó bloqueado"
+    return resultado
+
+def test_flujo_exporta_todos_los_archivos(orquestador, tmp_path, monkeypatch):
+    exportados = []
+    monkeypatch.setattr(orquestador, "_exportar", lambda folder, filename, res, template, gender: exportados.append(filename))
+
+    assert correr_flujo(orquestador, str(tmp_path)) == {}
+    assert exportados == ARCHIVOS
+
+def test_flujo_no_se_bloquea_si_una_etapa_falla(orquestador, tmp_path, monkeypatch):
+    # Una falla fuera del try por archivo detiene la etapa de alineación
+    requiere = orquestador._requiere
+
+    def requiere_con_falla(res, etapa):
+        if etapa == "aligned":
+            raise RuntimeError("alineación rota")
+        return requiere(res, etapa)
+
+    monkeypatch.setattr(orquestador, "_requiere", requiere_con_falla)
+    monkeypatch.setattr(orquestador, "_exportar", lambda *args: None)
+
+    resultado = correr_flujo(orquestador, str(tmp_path))
+    assert "alineación rota" in str(resultado["error"])
+
+def test_flujo_no_se_bloquea_si_falla_la_exportacion(orquestador, tmp_path, monkeypatch):
+    # Un fallo del hilo principal también libera a las etapas bloqueadas en put()
+    def log_con_falla(msg):
+        if msg.startswith("✖"):
+            raise RuntimeError("GUI desconectada")
+
+    def exportar_con_falla(*args):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(orquestador, "_log", log_con_falla)
+    monkeypatch.setattr(orquestador, "_exportar", exportar_con_falla)
+
+    resultado = correr_flujo(orquestador, str(tmp_path))
+    assert "GUI desconectada" in str(resultado["error"])
@@ -0,0 +1,40 @@
+import pytest
+
+from utils.lexicon import es_lugar_seguro
+from utils.text import normalizar_texto, CARGADOR_LEXICO
+
+# Habla corriente que los paquetes de lugares no deben reescribir (mismo resultado que antes de los paquetes)
+@pytest.mark.parametrize("texto, esperado", [
+    ("vivo en el chaco", "Vivo en el chaco"),
+    ("la estacion policial integral", "La estacion policial integral"),
+    ("estábamos juntas en el puente", "Estábamos juntas en el puente"),
+    ("el terreno cercado", "El terreno cercado"),
+    ("se escondió en la cueva", "Se escondió en la cueva"),
+])
+def test_lugares_no_reescriben_habla_corriente(texto, esperado):
+    assert normalizar_texto(texto) == esperado
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("fue a la fiscalia de tarija", "Fue a la Fiscalía de Tarija"),
+    ("vive en villa montes", "Vive en Villa Montes"),
+    ("llegó de potosi", "Llegó de Potosí"),
+])
+def test_lugares_corrigen_mayusculas_y_tildes(texto, esperado):
+    assert normalizar_texto(texto) == esperado
+
+def test_palabras_comunes_fuera_del_mapa_de_palabras():
+    mapa = CARGADOR_LEXICO.obtener()["mapa"]
+    for palabra in ("juntas", "cercado", "puente", "cueva", "concepción", "concepcion", "trinidad"):
+        assert palabra not in mapa
+
+@pytest.mark.parametrize("escuchada, canonica, seguro", [
+    ("fiscalia", "Fiscalía", True),
+    ("oconnor", "O'Connor", True),
+    ("chaco", "Gran Chaco", False),
+    ("villamontes", "Villa Montes", False),
+    ("estacion policial integral", "EPI", False),
+    ("nacional san luis", "Colegio Nacional San Luis", False),
+    ("juntas", "Juntas", False),
+])
+def test_es_lugar_seguro(escuchada, canonica, seguro):
+    assert es_lugar_seguro(escuchada, canonica) is seguro
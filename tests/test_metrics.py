@@ -0,0 +1,48 @@
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core.metrics import MedidorEtapa
+
+@pytest.fixture
+def cuda_falsa(monkeypatch):
+    cuda = SimpleNamespace(is_available=lambda: True, reset_peak_memory_stats=lambda: None,
+                           max_memory_allocated=lambda: 512 * 1024 ** 2)
+    monkeypatch.setitem(sys.modules, "torch", SimpleNamespace(cuda=cuda))
+
+def ocupar_cpu(segundos: float):
+    fin = time.thread_time() + segundos
+    while time.thread_time() < fin:
+        pass
+
+def test_etapa_sola_informa_su_cpu_y_vram(cuda_falsa):
+    with MedidorEtapa("transcripcion", "a.wav") as medidor:
+        ocupar_cpu(0.05)
+    assert medidor.resultado["solapada"] is False
+    assert medidor.resultado["cpu_segundos"] >= 0.04
+    assert medidor.resultado["pico_vram_mb"] == 512.0
+
+def test_etapas_solapadas_no_se_atribuyen_cpu_ni_vram_ajenos(cuda_falsa):
+    resultados = {}
+    listos = threading.Barrier(2)
+
+    def etapa(nombre, segundos):
+        with MedidorEtapa(nombre, "a.wav") as medidor:
+            listos.wait()
+            ocupar_cpu(segundos)
+            listos.wait()
+        resultados[nombre] = medidor.resultado
+
+    hilos = [threading.Thread(target=etapa, args=("alineacion", 0.3)),
+             threading.Thread(target=etapa, args=("diarizacion", 0.02))]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert all(r["solapada"] and r["pico_vram_mb"] is None for r in resultados.values())
+    # La CPU de la alineación no se suma a la diarización
+    assert resultados["diarizacion"]["cpu_segundos"] < 0.2
@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core import models
+from core.model_manager import GestorModelos
+
+TOTAL = 24 * 1024 ** 3
+
+@pytest.fixture
+def gpu(monkeypatch):
+    """GPU simulada: mem_get_info ve todo lo asignado en el dispositivo (también CTranslate2)."""
+    estado = {"usado": 0}
+    cuda = SimpleNamespace(mem_get_info=lambda: (TOTAL - estado["usado"], TOTAL))
+    monkeypatch.setattr(models, "dispositivo", lambda: "cuda")
+    monkeypatch.setattr(models, "importar_torch", lambda: SimpleNamespace(cuda=cuda))
+    monkeypatch.setattr(models, "liberar_gpu", lambda forzar=False: {})
+
+    def cargador(mb):
+        def cargar():
+            estado["usado"] += mb * 1024 ** 2
+            return f"modelo de {mb} MB"
+        return cargar
+    return cargador
+
+def test_mide_el_tamano_en_el_dispositivo(gpu):
+    gestor = GestorModelos(presupuesto_mb=10000)
+    gestor.obtener(("whisper", "large-v3"), gpu(3000))
+    gestor.obtener(("alineacion", "es"), gpu(1200))
+    assert gestor._modelos[("whisper", "large-v3")][1] == pytest.approx(3000)
+    assert gestor._modelos[("alineacion", "es")][1] == pytest.approx(1200)
+
+def test_desaloja_el_menos_usado_si_no_cabe(gpu):
+    gestor = GestorModelos(presupuesto_mb=5000)
+    gestor.obtener(("whisper", "large-v3"), gpu(3000))
+    gestor.obtener(("diarizacion",), gpu(700))
+    gestor.obtener(("whisper", "medium"), gpu(1600))
+    assert gestor.claves() == [("diarizacion",), ("whisper", "medium")]
+
+def test_sin_medicion_util_usa_la_tabla(gpu):
+    gestor = GestorModelos(presupuesto_mb=10000)
+    gestor.obtener(("whisper", "small"), lambda: "modelo ya en caché del asignador")
+    assert gestor._modelos[("whisper", "small")][1] > 0
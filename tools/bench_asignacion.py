@@ -0,0 +1,138 @@
+"""
+Benchmark de la asignación de oradores palabra por palabra (sin modelos, 100% offline).
+
+Compara whisperx.assign_word_speakers (o, si WhisperX no está instalado, una
+copia fiel de su algoritmo con pandas) con core.asignacion.asignar_oradores
+sobre sesiones sintéticas con la forma de WhisperX + pyannote, y verifica que
+ambas asignen el mismo orador a cada segmento y a cada palabra.
+
+Uso:
+    python tools/bench_asignacion.py --duraciones 10 60 240 --salida bench_asignacion.json
+"""
+import os
+import sys
+import copy
+import json
+import time
+import random
+import argparse
+import platform
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BASE_DIR))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+import pandas as pd
+
+from core.asignacion import asignar_oradores
+from bench_postprocess import generar_segmentos
+
+def asignar_referencia(diarize_df, transcript_result: dict) -> dict:
+    """Mismo algoritmo que whisperx.diarize.assign_word_speakers (fill_nearest=False)."""
+    for seg in transcript_result["segments"]:
+        diarize_df["intersection"] = np.minimum(diarize_df["end"], seg["end"]) - np.maximum(diarize_df["start"], seg["start"])
+        dia_tmp = diarize_df[diarize_df["intersection"] > 0]
+        if len(dia_tmp) > 0:
+            seg["speaker"] = dia_tmp.groupby("speaker")["intersection"].sum().sort_values(ascending=False).index[0]
+        for word in seg.get("words", ()):
+            if "start" in word:
+                diarize_df["intersection"] = np.minimum(diarize_df["end"], word["end"]) - np.maximum(diarize_df["start"], word["start"])
+                dia_tmp = diarize_df[diarize_df["intersection"] > 0]
+                if len(dia_tmp) > 0:
+                    word["speaker"] = dia_tmp.groupby("speaker")["intersection"].sum().sort_values(ascending=False).index[0]
+    return transcript_result
+
+def _asignador_actual():
+    try:
+        import whisperx
+        return "whisperx.assign_word_speakers", whisperx.assign_word_speakers
+    except Exception:
+        return "referencia pandas (WhisperX no instalado)", asignar_referencia
+
+def sesion_sintetica(minutos: float, semilla: int):
+    """
+    Transcripción alineada SIN oradores y turnos de pyannote ruidosos: bordes
+    desplazados respecto de las palabras, solapamientos y turnos breves de un
+    tercer orador (risas, "ajá"), como en una entrevista real.
+    """
+    rnd = random.Random(semilla)
+    segmentos = generar_segmentos(minutos, 0.35, 0.3, semilla)
+    turnos = []
+    for seg in segmentos:
+        inicio = max(0.0, seg["start"] + rnd.uniform(-0.4, 0.4))
+        fin = max(inicio + 0.05, seg["end"] + rnd.uniform(-0.4, 0.4))
+        turnos.append({"start": round(inicio, 3), "end": round(fin, 3), "speaker": seg["speaker"]})
+        if rnd.random() < 0.1:
+            t = rnd.uniform(seg["start"], seg["end"])
+            turnos.append({"start": round(t, 3), "end": round(t + rnd.uniform(0.2, 1.2), 3), "speaker": "SPEAKER_02"})
+
+    for seg in segmentos:
+        seg.pop("speaker", None)
+        for w in seg["words"]:
+            w.pop("speaker", None)
+            if rnd.random() < 0.01:
+                del w["start"], w["end"]  # Palabras sin marca (números, símbolos)
+    return {"segments": segmentos}, turnos
+
+def _oradores(resultado: dict) -> list:
+    salida = []
+    for seg in resultado["segments"]:
+        salida.append(seg.get("speaker"))
+        salida.extend(w.get("speaker") for w in seg.get("words", ()))
+    return salida
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la asignación de oradores")
+    parser.add_argument("--duraciones", type=float, nargs="+", default=[10, 60, 240], help="Minutos de cada sesión sintética")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--salida", default="bench_asignacion.json")
+    args = parser.parse_args()
+
+    nombre_actual, asignar_actual = _asignador_actual()
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "referencia": nombre_actual,
+        "config": vars(args),
+        "resultados": []
+    }
+    print(f"Referencia: {nombre_actual}")
+
+    for minutos in args.duraciones:
+        transcripcion, turnos = sesion_sintetica(minutos, args.semilla)
+        palabras = sum(len(s["words"]) for s in transcripcion["segments"])
+
+        entrada = copy.deepcopy(transcripcion)
+        inicio = time.perf_counter()
+        esperado = asignar_actual(pd.DataFrame(turnos, columns=["start", "end", "speaker"]), entrada)
+        t_actual = time.perf_counter() - inicio
+
+        entrada = copy.deepcopy(transcripcion)
+        inicio = time.perf_counter()
+        obtenido = asignar_oradores(pd.DataFrame(turnos, columns=["start", "end", "speaker"]), entrada)
+        t_vectorizado = time.perf_counter() - inicio
+
+        diferencias = sum(1 for x, y in zip(_oradores(esperado), _oradores(obtenido)) if x != y)
+        informe["resultados"].append({
+            "minutos": minutos,
+            "segmentos": len(transcripcion["segments"]),
+            "palabras": palabras,
+            "turnos": len(turnos),
+            "actual_s": round(t_actual, 4),
+            "vectorizado_s": round(t_vectorizado, 4),
+            "aceleracion": round(t_actual / t_vectorizado, 1) if t_vectorizado else None,
+            "diferencias": diferencias
+        })
+        print(f"⏱ {minutos:>5.0f} min  {palabras:>6} palabras  {len(turnos):>5} turnos   "
+              f"actual {t_actual:>8.2f} s   vectorizado {t_vectorizado * 1000:>7.1f} ms   "
+              f"{'✅ idéntico' if not diferencias else f'❌ {diferencias} diferencias'}")
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    print(f"\n✅ Resultados guardados en {args.salida}")
+
+if __name__ == "__main__":
+    main()
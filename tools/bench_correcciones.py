@@ -0,0 +1,107 @@
+"""
+Benchmark de la tabla de correcciones fonéticas (sin modelos, 100% offline).
+
+Compara el bucle secuencial clásico (un re.sub por regla) con el escáner
+combinado de utils.text.CorrectorFonetico a medida que la tabla crece con
+reglas sintéticas, y verifica que ambos den exactamente el mismo texto.
+
+Uso:
+    python tools/bench_correcciones.py --reglas 0 500 2000 5000 --salida bench_correcciones.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BASE_DIR))
+sys.path.insert(0, BASE_DIR)
+
+from utils.text import CORRECCIONES_FONETICAS_RAW, CorrectorFonetico
+from bench_postprocess import generar_segmentos
+
+SILABAS = ["ma", "te", "ri", "so", "lu", "ca", "pe", "ni", "go", "ba", "du", "fi", "ve", "zo", "qui", "tra", "ble", "chu"]
+
+def _palabra(rnd: random.Random) -> str:
+    return "".join(rnd.choice(SILABAS) for _ in range(rnd.randint(2, 4)))
+
+def reglas_sinteticas(cantidad: int, semilla: int) -> dict:
+    """Malas escuchas inventadas con la misma forma que las reales (\\b, \\s+, clases, opcionales)."""
+    rnd = random.Random(semilla)
+    reglas = {}
+    while len(reglas) < cantidad:
+        a, b = _palabra(rnd), _palabra(rnd)
+        forma = rnd.random()
+        if forma < 0.4:
+            patron = rf"\b{a}\b"
+        elif forma < 0.8:
+            patron = rf"\b{a}\s+{b}\b"
+        else:
+            patron = rf"\b{a[:-1]}[{a[-1]}x]{b}s?\b"
+        reglas[patron] = rnd.choice(["", b, a.upper(), f"{a} {b}"])
+    return reglas
+
+def _secuencial(compiladas: list, texto: str) -> str:
+    for patron, reemplazo in compiladas:
+        texto = patron.sub(reemplazo, texto)
+    return texto
+
+def _cronometrar(funcion, textos: list):
+    inicio = time.perf_counter()
+    salida = [funcion(t) for t in textos]
+    return time.perf_counter() - inicio, salida
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la tabla de correcciones fonéticas")
+    parser.add_argument("--reglas", type=int, nargs="+", default=[0, 500, 2000, 5000], help="Reglas sintéticas añadidas a la tabla real")
+    parser.add_argument("--minutos", type=float, default=60, help="Minutos de transcripción simulada")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--salida", default="bench_correcciones.json")
+    args = parser.parse_args()
+
+    textos = [s["text"] for s in generar_segmentos(args.minutos, 0.35, 0.3, args.semilla)]
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "config": vars(args),
+        "segmentos": len(textos),
+        "resultados": []
+    }
+
+    import re
+    for extra in args.reglas:
+        tabla = dict(CORRECCIONES_FONETICAS_RAW)
+        tabla.update(reglas_sinteticas(extra, args.semilla))
+        compiladas = [(re.compile(p, re.IGNORECASE), r) for p, r in tabla.items()]
+
+        inicio = time.perf_counter()
+        corrector = CorrectorFonetico(compiladas)
+        construccion = time.perf_counter() - inicio
+
+        t_secuencial, esperado = _cronometrar(lambda t: _secuencial(compiladas, t), textos)
+        t_combinado, obtenido = _cronometrar(corrector.aplicar, textos)
+        identico = esperado == obtenido
+
+        informe["resultados"].append({
+            "reglas": len(compiladas),
+            "construccion_s": round(construccion, 4),
+            "secuencial_s": round(t_secuencial, 4),
+            "combinado_s": round(t_combinado, 4),
+            "segmentos_por_s": round(len(textos) / t_combinado, 1) if t_combinado else None,
+            "identico": identico
+        })
+        print(f"⏱ {len(compiladas):>6} reglas   secuencial {t_secuencial * 1000:>9.1f} ms   "
+              f"combinado {t_combinado * 1000:>8.1f} ms   (construcción {construccion * 1000:.0f} ms)   "
+              f"{'✅ idéntico' if identico else '❌ DIFIERE'}")
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    print(f"\n✅ Resultados guardados en {args.salida}")
+
+if __name__ == "__main__":
+    main()
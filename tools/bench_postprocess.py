@@ -0,0 +1,175 @@
+"""
+Benchmark de la cadena de post-proceso (sin modelos, 100% offline).
+
+Genera transcripciones sintéticas con la forma de WhisperX (10 min a 6 h),
+mide cada etapa (asignar_texto_v1, normalizar_texto, suavizar_hablantes,
+refinar_turnos, fusionar, export_to_docx) y guarda los resultados en JSON
+para comparar entre versiones.
+
+Uso:
+    python tools/bench_postprocess.py --duraciones 10 60 360 --salida bench_postprocess.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from core.transcription import asignar_texto_v1
+from core.postprocess import identificar_psicologa, suavizar_hablantes, refinar_turnos, fusionar
+from utils.text import normalizar_texto
+
+try:
+    from exporters.docx_exporter import export_to_docx
+except ImportError:
+    export_to_docx = None
+
+# --- Vocabulario sintético: frases comunes + léxico institucional + errores fonéticos ---
+VOCABULARIO = (
+    "bueno entonces ese día yo estaba en mi casa con mis hijos y él llegó tarde "
+    "me dijo que no tenía plata para la comida y empezó a gritar muy fuerte "
+    "después salí a la calle a buscar ayuda donde mi vecina que vive cerca"
+).split()
+LEXICO = [
+    "tarija", "ministerio público", "defensoría de la niñez", "avenida la paz", "calle colón",
+    "fiscal", "doctora", "juan xxiii", "villa abaroa", "mercado campesino", "condori", "salinas"
+]
+ERRORES = ["fel se ve", "es lim", "eslim", "set up", "okay", "hmm", "eh", "thank you", "ya ya"]
+APERTURAS = ["Buenos días, soy psicóloga del slim", "Hola, soy psicólogo de la defensoría"]
+
+def generar_segmentos(minutos: float, churn: float, preguntas: float, semilla: int) -> list:
+    """Segmentos diarizados (text/start/end/speaker/words) como los entrega WhisperX."""
+    rnd = random.Random(semilla)
+    segmentos = []
+    t = 0.0
+    hablante = "SPEAKER_00"
+    limite = minutos * 60
+    while t < limite:
+        if segmentos and rnd.random() < churn:
+            hablante = "SPEAKER_01" if hablante == "SPEAKER_00" else "SPEAKER_00"
+
+        palabras = rnd.choices(VOCABULARIO, k=rnd.randint(6, 28))
+        if rnd.random() < 0.25:
+            palabras.insert(rnd.randrange(len(palabras)), rnd.choice(LEXICO))
+        if rnd.random() < 0.15:
+            palabras.insert(rnd.randrange(len(palabras)), rnd.choice(ERRORES))
+        texto = " ".join(palabras)
+        if not segmentos:
+            texto = f"{APERTURAS[0]} {texto}"
+        texto += "?" if rnd.random() < preguntas else "."
+
+        duracion = len(texto.split()) * rnd.uniform(0.25, 0.45)
+        paso = duracion / max(len(texto.split()), 1)
+        words = [
+            {"word": w, "start": round(t + i * paso, 3), "end": round(t + (i + 1) * paso, 3), "speaker": hablante}
+            for i, w in enumerate(texto.split())
+        ]
+        segmentos.append({
+            "text": " " + texto, "start": round(t, 3), "end": round(t + duracion, 3),
+            "speaker": hablante, "words": words
+        })
+        t += duracion + rnd.uniform(0.1, 1.5)
+    return segmentos
+
+def _etiquetar(assigned: list, prof_gender: str) -> list:
+    prof_id = identificar_psicologa(assigned)
+    return [{
+        "speaker": prof_gender if s["speaker_raw"] == prof_id else "Víctima",
+        "text": s["text"], "start": s.get("start", 0), "end": s.get("end", 0)
+    } for s in assigned]
+
+def ejecutar_cadena(segmentos: list, plantilla: str, medir) -> dict:
+    """Corre la cadena completa midiendo cada etapa con la función 'medir'."""
+    prof_gender = "Psicóloga"
+    resultados = {}
+    resultados["normalizar_texto"], _ = medir(lambda: [normalizar_texto(s["text"]) for s in segmentos])
+    resultados["asignar_texto_v1"], assigned = medir(lambda: asignar_texto_v1(segmentos))
+    resultados["identificar_psicologa"], labeled = medir(lambda: _etiquetar(assigned, prof_gender))
+    resultados["suavizar_hablantes"], suaves = medir(lambda: suavizar_hablantes(labeled, umbral_breve=1.0))
+    resultados["refinar_turnos"], refinados = medir(lambda: refinar_turnos(suaves, prof_gender))
+    resultados["fusionar"], finales = medir(lambda: fusionar(refinados))
+
+    if export_to_docx:
+        with tempfile.TemporaryDirectory() as tmp:
+            destino = os.path.join(tmp, "bench.docx")
+            resultados["export_to_docx"], _ = medir(lambda: export_to_docx(finales, destino, plantilla or None))
+    return resultados
+
+def _medir_tiempo(funcion):
+    inicio = time.perf_counter()
+    cpu = time.process_time()
+    valor = funcion()
+    return {"segundos": time.perf_counter() - inicio, "cpu_segundos": time.process_time() - cpu}, valor
+
+def _medir_memoria(funcion):
+    tracemalloc.start()
+    valor = funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"pico_mb": pico / 1024 ** 2}, valor
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline del post-proceso de Transcriptor")
+    parser.add_argument("--duraciones", type=float, nargs="+", default=[10, 60, 360], help="Minutos de audio simulado")
+    parser.add_argument("--churn", type=float, default=0.35, help="Probabilidad de cambio de orador por segmento")
+    parser.add_argument("--preguntas", type=float, default=0.3, help="Fracción de segmentos que son preguntas")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Se reporta la mejor de N corridas")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--plantilla", default="", help="Plantilla .docx para la etapa de exportación")
+    parser.add_argument("--salida", default="bench_postprocess.json")
+    args = parser.parse_args()
+
+    if not export_to_docx:
+        print("⚠ python-docx no está instalado: se omite la etapa export_to_docx.")
+
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "config": vars(args),
+        "resultados": []
+    }
+
+    for minutos in args.duraciones:
+        segmentos = generar_segmentos(minutos, args.churn, args.preguntas, args.semilla)
+        n = len(segmentos)
+
+        # Tiempo: mejor de N repeticiones (sin tracemalloc, que distorsiona la medición)
+        mejores = {}
+        for _ in range(max(1, args.repeticiones)):
+            corrida = ejecutar_cadena(segmentos, args.plantilla, _medir_tiempo)
+            for etapa, medida in corrida.items():
+                if etapa not in mejores or medida["segundos"] < mejores[etapa]["segundos"]:
+                    mejores[etapa] = medida
+
+        # Memoria: una corrida aparte con tracemalloc
+        memoria = ejecutar_cadena(segmentos, args.plantilla, _medir_memoria)
+
+        etapas = {}
+        for etapa, medida in mejores.items():
+            etapas[etapa] = {
+                "segundos": round(medida["segundos"], 6),
+                "cpu_segundos": round(medida["cpu_segundos"], 6),
+                "segmentos_por_s": round(n / medida["segundos"], 1) if medida["segundos"] else None,
+                "pico_mb": round(memoria[etapa]["pico_mb"], 3)
+            }
+
+        informe["resultados"].append({"duracion_min": minutos, "segmentos": n, "etapas": etapas})
+        print(f"\n⏱ {minutos:g} min de audio ({n} segmentos)")
+        for etapa, m in etapas.items():
+            print(f"   {etapa:<22} {m['segundos'] * 1000:>10.1f} ms  {m['segmentos_por_s'] or 0:>12.0f} seg/s  {m['pico_mb']:>8.2f} MB")
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    print(f"\n✅ Resultados guardados en {args.salida}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# utils/lexicon.py
+import os
+import json
+import time
+import pickle
+import hashlib
+import threading
+import unicodedata
+
+from core import resources
+from config.settings import CARPETA_LEXICOS, LEXICO_RECARGA_S
+
+# Paquetes que vienen con la aplicación: (archivo, sección a la que aportan)
+CARPETA_INTEGRADOS = os.path.dirname(os.path.abspath(__file__))
+PAQUETES_INTEGRADOS = (
+    ("person_names.json", "nombres"),
+    ("tarija_streets.json", "calles"),
+    ("tarija_geo.json", "lugares"),
+    ("tarija_institutions.json", "lugares"),
+    ("bolivia_geo.json", "lugares"),
+)
+
+# Secciones de un paquete de usuario (lexicos/*.json):
+#   "nombres", "calles", "siglas", "titulos": listas de palabras/frases
+#   "entidades": lista o {"forma escuchada": "Forma Canónica"}
+#   "lugares": {"forma escuchada": "Forma"} solo para mayúsculas y tildes (las mismas palabras)
+#   "correcciones": {"patrón regex": "reemplazo"} (se aplican tras las integradas)
+SECCIONES = ("nombres", "calles", "entidades", "lugares", "siglas", "titulos", "correcciones")
+
+# Topónimos que también son palabras de uso corriente: en una declaración casi
+# siempre aparecen como palabra común ("estábamos juntas", "el terreno cercado")
+PALABRAS_COMUNES = frozenset({
+    "cercado", "juntas", "el puente", "la cueva", "concepcion", "salinas", "pajonal",
+    "trinidad", "la paz", "el alto", "entre rios", "cobija", "santa cruz",
+})
+
+def _palabras(texto: str) -> list:
+    """Palabras sin mayúsculas, tildes ni apóstrofos ("O'Connor" = "oconnor")."""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in texto if not unicodedata.combining(c)).replace("'", "").split()
+
+def es_lugar_seguro(escuchada: str, canonica: str) -> bool:
+    """
+    Un lugar solo corrige mayúsculas y tildes: nada de agregar, quitar o expandir
+    palabras ("chaco" → "Gran Chaco") ni tocar palabras comunes. En un texto
+    forense lo dicho no se reescribe.
+    """
+    palabras = _palabras(escuchada)
+    return bool(palabras) and palabras == _palabras(canonica) and " ".join(palabras) not in PALABRAS_COMUNES
+
+def carpeta_usuario() -> str:
+    return resources.get_resource_path(CARPETA_LEXICOS)
+
+def archivos_paquetes() -> list:
+    """Paquetes vigentes en orden de prioridad: integrados y luego los del usuario (alfabético)."""
+    archivos = []
+    for nombre, seccion in PAQUETES_INTEGRADOS:
+        ruta = os.path.join(CARPETA_INTEGRADOS, nombre)
+        if os.path.exists(ruta):
+            archivos.append((ruta, seccion))
+    carpeta = carpeta_usuario()
+    if os.path.isdir(carpeta):
+        for nombre in sorted(os.listdir(carpeta)):
+            if nombre.lower().endswith(".json"):
+                archivos.append((os.path.join(carpeta, nombre), None))
+    return archivos
+
+def _leer_paquete(ruta: str, seccion: str = None) -> dict:
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            datos = json.load(f)
+    except Exception:
+        return {}  # Un paquete dañado no debe impedir transcribir
+    if seccion:
+        return {seccion: datos}
+    return datos if isinstance(datos, dict) else {}
+
+def fusionar(base: dict, archivos: list) -> dict:
+    """
+    Une el léxico base (constantes de utils.text) con los paquetes.
+    En entidades y correcciones, lo que viene después reemplaza a lo anterior.
+    """
+    datos = {
+        "nombres": set(base.get("nombres", ())),
+        "calles": set(base.get("calles", ())),
+        "siglas": set(base.get("siglas", ())),
+        "titulos": set(base.get("titulos", ())),
+        "entidades": {e.lower(): e for e in base.get("entidades", ())},
+        "correcciones": dict(base.get("correcciones", {})),
+    }
+    for ruta, seccion in archivos:
+        paquete = _leer_paquete(ruta, seccion)
+        for clave in ("nombres", "calles", "siglas", "titulos"):
+            for item in paquete.get(clave, ()):
+                if isinstance(item, str) and item.strip():
+                    datos[clave].add(item.strip())
+
+        entidades = paquete.get("entidades", ())
+        if isinstance(entidades, dict):
+            pares = entidades.items()
+        else:
+            pares = ((e, e) for e in entidades)
+        for escuchada, canonica in pares:
+            if isinstance(escuchada, str) and isinstance(canonica, str) and escuchada.strip():
+                datos["entidades"][escuchada.strip().lower()] = canonica.strip()
+
+        lugares = paquete.get("lugares", {})
+        if isinstance(lugares, dict):
+            for escuchada, canonica in lugares.items():
+                if isinstance(escuchada, str) and isinstance(canonica, str) and es_lugar_seguro(escuchada, canonica):
+                    datos["entidades"][escuchada.strip().lower()] = canonica.strip()
+
+        correcciones = paquete.get("correcciones", {})
+        if isinstance(correcciones, dict):
+            datos["correcciones"].update(correcciones)
+
+    # La propia forma canónica también se reconoce (p. ej. "Fiscalía" con tilde)
+    for canonica in list(datos["entidades"].values()):
+        datos["entidades"].setdefault(canonica.lower(), canonica)
+    return datos
+
+class CargadorLexico:
+    """
+    Construye el léxico compilado una sola vez y lo guarda serializado en
+    models_cache/lexico, con nombre derivado del contenido de los paquetes:
+    mientras los archivos no cambien, arrancar solo cuesta leer un pickle.
+    obtener() revisa cada LEXICO_RECARGA_S segundos si algún paquete cambió
+    y, si es así, recarga en caliente (útil para el servicio residente).
+    """
+    def __init__(self, base: dict, construir, version: int = 1, cache_dir: str = None):
+        self.base = base
+        self.construir = construir
+        self.version = version
+        self.cache_dir = cache_dir
+        self._candado = threading.Lock()
+        self._estado = None
+        self._revision = 0.0
+        self._actual = None
+        self.al_recargar = None  # Callback opcional con el nuevo léxico
+
+    @staticmethod
+    def _estado_archivos(archivos: list) -> tuple:
+        estado = []
+        for ruta, _ in archivos:
+            try:
+                st = os.stat(ruta)
+                estado.append((ruta, st.st_size, st.st_mtime_ns))
+            except OSError:
+                pass
+        return tuple(estado)
+
+    def _firma(self, archivos: list) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"v{self.version}|".encode("utf-8"))
+        h.update(repr(sorted((k, sorted(v) if isinstance(v, (set, frozenset)) else v) for k, v in self.base.items())).encode("utf-8"))
+        for ruta, seccion in archivos:
+            h.update(f"|{os.path.basename(ruta)}|{seccion}|".encode("utf-8"))
+            try:
+                with open(ruta, "rb") as f:
+                    h.update(f.read())
+            except OSError:
+                pass
+        return h.hexdigest()
+
+    def _compilar(self, archivos: list):
+        firma = self._firma(archivos)
+        carpeta = self.cache_dir or resources.cache_path("lexico")
+        destino = os.path.join(carpeta, f"lexico_{firma}.pickle")
+
+        if os.path.exists(destino):
+            try:
+                with open(destino, "rb") as f:
+                    return pickle.load(f)
+            except Exception:
+                pass
+
+        compilado = self.construir(fusionar(self.base, archivos))
+        try:
+            temporal = destino + ".tmp"
+            with open(temporal, "wb") as f:
+                pickle.dump(compilado, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, destino)
+            # Las versiones anteriores del léxico ya no sirven
+            for nombre in os.listdir(carpeta):
+                if nombre.startswith("lexico_") and nombre.endswith(".pickle") and nombre != os.path.basename(destino):
+                    try:
+                        os.remove(os.path.join(carpeta, nombre))
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+        return compilado
+
+    def obtener(self):
+        """Léxico compilado vigente (recargado si algún paquete cambió desde la última revisión)."""
+        ahora = time.monotonic()
+        if self._actual is not None and ahora - self._revision < LEXICO_RECARGA_S:
+            return self._actual
+
+        with self._candado:
+            if self._actual is not None and ahora - self._revision < LEXICO_RECARGA_S:
+                return self._actual
+            archivos = archivos_paquetes()
+            estado = self._estado_archivos(archivos)
+            if self._actual is None or estado != self._estado:
+                self._actual = self._compilar(archivos)
+                self._estado = estado
+                if self.al_recargar:
+                    self.al_recargar(self._actual)
+            self._revision = time.monotonic()
+        return self._actual
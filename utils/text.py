@@ -1,6 +1,11 @@
 import re
-import json
-import os
+
+from utils.lexicon import CargadorLexico
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
 
 # ================= LÉXICO INSTITUCIONAL DE ÉLITE =================
 
@@ -27,58 +32,156 @@ ENTIDADES_PROPIAS_BASE = {
     "Senac", "Miraflores", "Velasco", "Villamontes", "Bermejo", "Yacuiba"
 }
 
-# --- 4. CARGAR NOMBRES Y APELLIDOS (Desde JSON) ---
+# --- 4. NOMBRES, CALLES Y LUGARES (Paquetes de léxico: utils/*.json + lexicos/*.json) ---
+# Se llenan al compilar el léxico (ver CARGADOR_LEXICO al final del módulo)
 NOMBRES_REFERENCIA = set()
-try:
-    names_path = os.path.join(os.path.dirname(__file__), "person_names.json")
-    if os.path.exists(names_path):
-        with open(names_path, "r", encoding="utf-8") as f:
-            nombres = json.load(f)
-            NOMBRES_REFERENCIA = {n.strip() for n in nombres if n.strip()}
-except Exception:
-    pass
-
-# --- 5. CARGAR CALLES DE TARIJA (Desde JSON) ---
 CALLES_TARIJA = set()
-STREET_PATTERN = None
 
-try:
-    json_path = os.path.join(os.path.dirname(__file__), "tarija_streets.json")
-    if os.path.exists(json_path):
-        with open(json_path, "r", encoding="utf-8") as f:
-            calles = json.load(f)
-            # Normalizamos calles: añadimos versiones cortas comunes
-            extra_calles = {"Avenida Víctor Paz", "Avenida Victor Paz", "Calle Colón", "Calle Colon"}
-            CALLES_TARIJA = set(calles).union(extra_calles)
-            
-            sorted_streets = sorted(list(CALLES_TARIJA), key=len, reverse=True)
-            pattern_str = "|".join(re.escape(s) for s in sorted_streets)
-            STREET_PATTERN = re.compile(rf"\b({pattern_str})\b", re.IGNORECASE)
-except Exception:
-    pass
-
-# --- 6. PATRÓN DE ENTIDADES MULTI-PALABRA ---
-sorted_entities = sorted(ENTIDADES_PROPIAS_BASE, key=len, reverse=True)
-entity_pattern_str = "|".join(re.escape(e) for e in sorted_entities)
-ENTITY_PATTERN = re.compile(rf"\b({entity_pattern_str})\b", re.IGNORECASE)
+# --- 5. CALLES EXTRA ---
+# Normalizamos calles: añadimos versiones cortas comunes
+EXTRA_CALLES = {"Avenida Víctor Paz", "Avenida Victor Paz", "Calle Colón", "Calle Colon"}
+
+# --- 6. MOTOR LÉXICO DE UNA SOLA PASADA (Calles + Entidades multi-palabra) ---
+# El texto se parte en unidades: palabras, espacios y signos. Toda frontera \b
+# cae entre dos unidades, así que una frase del léxico aparece en el texto si y
+# solo si su secuencia de unidades (en minúsculas) aparece tal cual.
+_UNIDADES = re.compile(r"\w+|\s+|[^\w\s]+")
+_ES_PALABRA = re.compile(r"\w").match
+_FIN = ""  # Clave del nodo terminal (ninguna unidad es vacía)
+
+class MotorLexico:
+    """
+    Trie por unidades sobre el léxico en minúsculas. Cada nodo terminal guarda
+    la forma canónica ya partida en unidades, para calle y/o entidad.
+    Calles y entidades se resuelven por separado (la más larga a la izquierda,
+    sin solapes dentro de cada tipo) y la entidad prevalece sobre la calle,
+    igual que aplicar primero el patrón de calles y luego el de entidades.
+    """
+    CALLE, ENTIDAD = 0, 1
+    MAX_MEMORIA_PALABRAS = 65536
+
+    def __init__(self, calles=(), entidades=(), mapa: dict = None, siglas=()):
+        self.raiz = {}
+        self.mapa = mapa or {}
+        self.siglas = set(siglas)
+        self._palabras = {}
+        self._agregar(((c, c) for c in calles), self.CALLE)
+        pares = entidades.items() if isinstance(entidades, dict) else ((e, e) for e in entidades)
+        self._agregar(pares, self.ENTIDAD)
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        estado["_palabras"] = {}  # La memoria de palabras no viaja en la caché serializada
+        return estado
+
+    def _agregar(self, pares, tipo: int):
+        for frase, canonica in sorted(pares):
+            unidades = _UNIDADES.findall(frase)
+            if not unidades:
+                continue
+            formas = _UNIDADES.findall(canonica)
+            if len(formas) != len(unidades):
+                # Forma canónica con otra estructura ("chaco" -> "Gran Chaco"): va entera en la primera unidad
+                formas = [formas] + [""] * (len(unidades) - 1)
+            nodo = self.raiz
+            for unidad in unidades:
+                nodo = nodo.setdefault(unidad.lower(), {})
+            fin = nodo.setdefault(_FIN, [None, None])
+            if fin[tipo] is None:
+                fin[tipo] = formas
+
+    def _emparejar(self, bajas: list, j: int, libre: list, canon: tuple):
+        """Recorre el trie desde la unidad j y marca la frase más larga de cada tipo."""
+        # \b antes de una frase que empieza con signo exige una letra previa
+        if not _ES_PALABRA(bajas[j]) and (j == 0 or not _ES_PALABRA(bajas[j - 1])):
+            return
+        n = len(bajas)
+        nodo = self.raiz
+        mejor = [None, None]
+        k = j
+        while k < n:
+            nodo = nodo.get(bajas[k])
+            if nodo is None:
+                break
+            k += 1
+            fin = nodo.get(_FIN)
+            if fin is None:
+                continue
+            # \b después de una frase que termina en signo exige una letra a continuación
+            if not _ES_PALABRA(bajas[k - 1]) and (k == n or not _ES_PALABRA(bajas[k])):
+                continue
+            for tipo in (self.CALLE, self.ENTIDAD):
+                if fin[tipo] and j >= libre[tipo]:
+                    mejor[tipo] = (k, fin[tipo])
+
+        for tipo, encontrado in enumerate(mejor):
+            if encontrado:
+                k, formas = encontrado
+                canon[tipo][j:k] = formas
+                libre[tipo] = k
+
+    def _palabra(self, palabra: str, no_inicial: bool) -> str:
+        """Regla por palabra (siglas, léxico global, stop words). Memorizada: el vocabulario se repite mucho."""
+        clave = (palabra, no_inicial)
+        resultado = self._palabras.get(clave)
+        if resultado is None:
+            if len(self._palabras) >= self.MAX_MEMORIA_PALABRAS:
+                self._palabras.clear()
+            resultado = self._palabras[clave] = _capitalizar_palabra(palabra, no_inicial, self.mapa, self.siglas)
+        return resultado
+
+    def capitalizar(self, texto: str) -> str:
+        unidades = _UNIDADES.findall(texto)
+        baja = texto.lower()
+        # lower() casi nunca cambia la longitud; si lo hace, se baja unidad por unidad
+        bajas = _UNIDADES.findall(baja) if len(baja) == len(texto) else [u.lower() for u in unidades]
+        n = len(unidades)
+        canon = ([None] * n, [None] * n)  # Forma canónica por unidad: (calle, entidad)
+        calles, entidades = canon
+        libre = [0, 0]                    # Primera unidad libre para cada tipo (sin solapes)
+        raiz = self.raiz
+
+        palabras = []
+        partes = []
+        for j in range(n):
+            if (j >= libre[0] or j >= libre[1]) and bajas[j] in raiz:
+                self._emparejar(bajas, j, libre, canon)
+
+            salida = entidades[j]
+            if salida is None:
+                salida = calles[j]
+                if salida is None:
+                    salida = unidades[j]
+            for pieza in (salida if salida.__class__ is list else (salida,)):
+                if not pieza:
+                    continue
+                if pieza.isspace():
+                    if partes:
+                        palabras.append(self._palabra("".join(partes), bool(palabras)))
+                        partes = []
+                else:
+                    partes.append(pieza)
+
+        if partes:
+            palabras.append(self._palabra("".join(partes), bool(palabras)))
+        return " ".join(palabras)
 
 # --- 7. LÉXICO GLOBAL (Consolidado como Diccionario de Búsqueda Rápida) ---
 # Mapeamos {palabra_en_minusculas: PalabraCorrectamenteCapitalizada}
 LEXICO_GLOBAL_MAP = {}
 
-def _cargar_lexico():
-    global LEXICO_GLOBAL_MAP
+def _mapa_lexico(siglas, entidades, nombres, titulos) -> dict:
+    mapa = {}
     # Unimos todos los sets en uno solo para procesar
-    union_lexico = SIGLAS_INSTITUCIONALES.union(ENTIDADES_PROPIAS_BASE).union(NOMBRES_REFERENCIA).union(TITULOS_CARGOS)
-    
+    union_lexico = set(siglas).union(entidades).union(nombres).union(titulos)
+
     # Construimos el mapa de búsqueda rápida
     for item in union_lexico:
         # Si el item ya existe (ej: "Dra" y "DRA"), priorizamos la versión con minúsculas si no es sigla
         low = item.lower()
-        if low not in LEXICO_GLOBAL_MAP or item.isupper():
-            LEXICO_GLOBAL_MAP[low] = item
-
-_cargar_lexico()
+        if low not in mapa or item.isupper():
+            mapa[low] = item
+    return mapa
 
 # --- 8. MAPEO DE CORRECCIONES QUIRÚRGICAS (Pre-compiladas V1.0) ---
 CORRECCIONES_FONETICAS_RAW = {
@@ -120,10 +223,114 @@ CORRECCIONES_FONETICAS_RAW = {
     r"\beh\b": ""
 }
 
-# Compilación única para máxima velocidad
-CORRECCIONES_COMPILADAS = [
-    (re.compile(p, re.IGNORECASE), r) for p, r in CORRECCIONES_FONETICAS_RAW.items()
-]
+def _clave_literal(patron: str) -> str:
+    """
+    Fragmento literal más largo que TODA coincidencia del patrón debe contener
+    (en casefold). Cadena vacía si no hay ninguno garantizado.
+    Lanza re.error si el patrón es inválido.
+    """
+    datos = sre_parse.parse(patron, re.IGNORECASE)
+    mejor = actual = ""
+    for op, arg in datos:
+        if op is sre_parse.LITERAL:
+            actual += chr(arg)
+            continue
+        if op is sre_parse.AT:
+            continue  # \b, ^, $ no consumen caracteres: el literal sigue siendo contiguo
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            minimo, _, cuerpo = arg
+            if minimo >= 1 and len(cuerpo) == 1 and cuerpo[0][0] is sre_parse.LITERAL:
+                actual += chr(cuerpo[0][1])
+        mejor = max(mejor, actual, key=len)
+        actual = ""
+    return max(mejor, actual, key=len).casefold()
+
+def _patron_trie(claves) -> str:
+    """Alternación con forma de trie: el motor de re la recorre carácter a carácter, sin probar cada rama."""
+    trie = {}
+    for clave in claves:
+        nodo = trie
+        for ch in clave:
+            nodo = nodo.setdefault(ch, {})
+        nodo[""] = True
+
+    def construir(nodo):
+        ramas = [re.escape(ch) + construir(hijo) for ch, hijo in sorted(nodo.items()) if ch]
+        if not ramas:
+            return ""
+        cuerpo = ramas[0] if len(ramas) == 1 else "(?:" + "|".join(ramas) + ")"
+        # Rama opcional codiciosa: en cada posición se reporta la clave más larga
+        return f"(?:{cuerpo})?" if "" in nodo else cuerpo
+
+    return construir(trie)
+
+class CorrectorFonetico:
+    """
+    Tabla de correcciones compilada en un único escáner. Cada regla aporta un
+    literal obligatorio; una sola pasada del escáner (trie de literales) dice
+    qué reglas pueden coincidir y solo esas se aplican, en el orden original.
+    Si una regla modifica el texto se vuelve a escanear para las siguientes,
+    de modo que el resultado es idéntico a aplicar la lista completa en orden.
+    Las expresiones se compilan recién cuando hacen falta (la mayoría nunca).
+    """
+    def __init__(self, reglas):
+        self.reglas = []
+        claves = []
+        for patron, reemplazo in reglas:
+            patron = getattr(patron, "pattern", patron)
+            try:
+                clave = _clave_literal(patron)
+            except re.error:
+                continue  # Regla inválida de un paquete de usuario: se ignora
+            self.reglas.append((patron, reemplazo))
+            claves.append(clave)
+        self.siempre = [i for i, clave in enumerate(claves) if not clave]
+
+        # Despacho: clave encontrada -> reglas cuya clave es prefijo suyo (el escáner
+        # solo reporta la clave más larga que empieza en cada posición)
+        por_clave = {}
+        for i, clave in enumerate(claves):
+            if clave:
+                por_clave.setdefault(clave, []).append(i)
+        unicas = set(por_clave)
+        self.despacho = {
+            encontrada: sorted(i for n in range(1, len(encontrada) + 1) for i in por_clave.get(encontrada[:n], ()))
+            for encontrada in unicas
+        }
+        self.patron_escaner = f"(?=({_patron_trie(unicas)}))" if unicas else None
+        self._escaner = None
+        self._compiladas = {}
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        estado["_escaner"] = None
+        estado["_compiladas"] = {}
+        return estado
+
+    def _regla(self, i: int):
+        compilada = self._compiladas.get(i)
+        if compilada is None:
+            compilada = self._compiladas[i] = re.compile(self.reglas[i][0], re.IGNORECASE)
+        return compilada
+
+    def _candidatas(self, texto: str, desde: int) -> list:
+        indices = set(self.siempre)
+        if self.patron_escaner:
+            if self._escaner is None:
+                self._escaner = re.compile(self.patron_escaner)
+            for clave in set(self._escaner.findall(texto.casefold())):
+                indices.update(self.despacho[clave])
+        return sorted(i for i in indices if i >= desde)
+
+    def aplicar(self, texto: str) -> str:
+        pendientes = self._candidatas(texto, 0)
+        while pendientes:
+            i = pendientes.pop(0)
+            nuevo = self._regla(i).sub(self.reglas[i][1], texto)
+            if nuevo != texto:
+                texto = nuevo
+                pendientes = self._candidatas(texto, i + 1)
+        return texto
 
 STOP_WORDS_ES = {
     "el", "la", "los", "las", "un", "una", "unos", "unas", "yo", "tú", "él", "ella", 
@@ -135,66 +342,71 @@ STOP_WORDS_ES = {
     "me", "te", "se", "nos", "os", "le", "les", "lo"
 }
 
-def capitalizacion_inteligente(texto: str) -> str:
-    # 1. Primero corregimos frases completas de calles (multi-palabra)
-    if STREET_PATTERN:
-        def replace_street(match):
-            found = match.group(0).lower()
-            for original in CALLES_TARIJA:
-                if original.lower() == found:
-                    return original
-            return match.group(0)
-        texto = STREET_PATTERN.sub(replace_street, texto)
-
-    # 2. Corregimos entidades multi-palabra (NUEVO)
-    if ENTITY_PATTERN:
-        def replace_entity(match):
-            found = match.group(0).lower()
-            for original in ENTIDADES_PROPIAS_BASE:
-                if original.lower() == found:
-                    return original
-            return match.group(0)
-        texto = ENTITY_PATTERN.sub(replace_entity, texto)
-
-    palabras = texto.split()
-    if not palabras: return ""
-    resultado = []
-    
-    for i, palabra in enumerate(palabras):
-        # Capturamos prefijos (¿, ¡, (, etc.) y sufijos (., ,, ?, !, etc.)
-        match = re.match(r"^([^\wáéíóúñü]*)([\wáéíóúñü]*)([^\wáéíóúñü]*)$", palabra, re.IGNORECASE)
-        if not match:
-            resultado.append(palabra)
-            continue
+_PARTES_PALABRA = re.compile(r"^([^\wáéíóúñü]*)([\wáéíóúñü]*)([^\wáéíóúñü]*)$", re.IGNORECASE)
 
-        prefijo, limpia_orig, sufijo = match.groups()
-        limpia = limpia_orig.lower()
+def _capitalizar_palabra(palabra: str, no_inicial: bool, mapa: dict, siglas: set) -> str:
+    # Capturamos prefijos (¿, ¡, (, etc.) y sufijos (., ,, ?, !, etc.)
+    match = _PARTES_PALABRA.match(palabra)
+    if not match:
+        return palabra
 
-        # 1. Prioridad: Siglas Institucionales (Siempre MAYÚSCULAS)
-        if limpia.upper() in SIGLAS_INSTITUCIONALES:
-            resultado.append(prefijo + limpia.upper() + sufijo)
-            continue
+    prefijo, limpia_orig, sufijo = match.groups()
+    limpia = limpia_orig.lower()
 
-        # 2. Búsqueda rápida en el léxico global consolidado
-        if limpia in LEXICO_GLOBAL_MAP:
-            resultado.append(prefijo + LEXICO_GLOBAL_MAP[limpia] + sufijo)
-            continue
+    # 1. Prioridad: Siglas Institucionales (Siempre MAYÚSCULAS)
+    if limpia.upper() in siglas:
+        return prefijo + limpia.upper() + sufijo
+
+    # 2. Búsqueda rápida en el léxico global consolidado
+    if limpia in mapa:
+        return prefijo + mapa[limpia] + sufijo
+
+    # 3. Fallback: Mantener capitalización original o corrección de Stop Words
+    if limpia_orig and limpia_orig[0].isupper() and limpia in STOP_WORDS_ES and no_inicial:
+        return prefijo + limpia_orig.lower() + sufijo
+    return palabra
 
-        # 3. Fallback: Mantener capitalización original o corrección de Stop Words
-        if limpia_orig and limpia_orig[0].isupper():
-            if limpia in STOP_WORDS_ES and i > 0:
-                resultado.append(prefijo + limpia_orig.lower() + sufijo)
-            else:
-                resultado.append(prefijo + limpia_orig + sufijo)
-        else:
-            resultado.append(prefijo + limpia_orig + sufijo)
+# --- 9. LÉXICO COMPILADO (caché serializada + recarga en caliente) ---
+# Súbela si cambia la estructura de MotorLexico/CorrectorFonetico (invalida la caché)
+VERSION_LEXICO = 2
+
+def _construir_lexico(datos: dict) -> dict:
+    mapa = _mapa_lexico(datos["siglas"], set(datos["entidades"].values()), datos["nombres"], datos["titulos"])
+    return {
+        "motor": MotorLexico(datos["calles"], datos["entidades"], mapa, datos["siglas"]),
+        "corrector": CorrectorFonetico(datos["correcciones"].items()),
+        "nombres": datos["nombres"],
+        "calles": datos["calles"],
+        "mapa": mapa,
+    }
+
+def _al_recargar(lexico: dict):
+    global NOMBRES_REFERENCIA, CALLES_TARIJA, LEXICO_GLOBAL_MAP
+    NOMBRES_REFERENCIA = lexico["nombres"]
+    CALLES_TARIJA = lexico["calles"]
+    LEXICO_GLOBAL_MAP = lexico["mapa"]
+
+CARGADOR_LEXICO = CargadorLexico(
+    base={
+        "calles": EXTRA_CALLES,
+        "entidades": ENTIDADES_PROPIAS_BASE,
+        "siglas": SIGLAS_INSTITUCIONALES,
+        "titulos": TITULOS_CARGOS,
+        "correcciones": CORRECCIONES_FONETICAS_RAW,
+    },
+    construir=_construir_lexico,
+    version=VERSION_LEXICO
+)
+CARGADOR_LEXICO.al_recargar = _al_recargar
+CARGADOR_LEXICO.obtener()
+
+def capitalizacion_inteligente(texto: str) -> str:
+    """Calles, entidades multi-palabra y capitalización por palabra en una sola pasada."""
+    return CARGADOR_LEXICO.obtener()["motor"].capitalizar(texto)
 
-    return " ".join(resultado)
 def corregir_texto(t: str) -> str:
-    """Aplica correcciones fonéticas usando patrones pre-compilados."""
-    for pattern, replacement in CORRECCIONES_COMPILADAS:
-        t = pattern.sub(replacement, t)
-    return t
+    """Aplica correcciones fonéticas usando patrones pre-compilados (una pasada del escáner combinado)."""
+    return CARGADOR_LEXICO.obtener()["corrector"].aplicar(t)
 
 def normalizar_texto(t: str) -> str:
     """
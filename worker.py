@@ -1,5 +1,8 @@
 import os
 import sys
+import json
+import time
+import importlib
 import traceback
 import argparse
 import subprocess
@@ -67,19 +70,99 @@ import io
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
+# Subsistemas livianos, en orden de dependencia. torch/whisperx NO están aquí:
+# se importan recién cuando una etapa de modelos los necesita (core.models).
+SUBSISTEMAS = (
+    ("texto", "utils.text"),
+    ("postproceso", "core.postprocess"),
+    ("exportador", "exporters.docx_exporter"),
+    ("orquestador", "core.orchestrator"),
+)
+
+def importar_subsistemas() -> dict:
+    """Importa cada subsistema por separado midiendo su tiempo de arranque."""
+    tiempos = {}
+    for etiqueta, modulo in SUBSISTEMAS:
+        inicio = time.perf_counter()
+        importlib.import_module(modulo)
+        tiempos[etiqueta] = time.perf_counter() - inicio
+    return tiempos
+
+def reportar_importaciones(tiempos: dict, queue_proxy):
+    """Una línea LOG legible y una METRIC por subsistema (van al resumen de la corrida)."""
+    if not tiempos:
+        return
+    detalle = " | ".join(f"{nombre} {segundos:.2f} s" for nombre, segundos in tiempos.items())
+    queue_proxy(('log', f"⏱ Importación: {detalle}"))
+    for nombre, segundos in tiempos.items():
+        queue_proxy(('metric', json.dumps({"etapa": f"importacion_{nombre}", "archivo": None, "ok": True, "segundos": round(segundos, 3)})))
+
 def run_transcription_standalone():
     parser = argparse.ArgumentParser(description="Worker de TranscripciÃ³n Ã‰lite")
-    parser.add_argument("--folder", required=True)
+    parser.add_argument("--folder")
     parser.add_argument("--template", default="")
     parser.add_argument("--model", default="large-v3")
     parser.add_argument("--gender", default="PsicÃ³loga")
+    parser.add_argument("--modo", default=None, choices=["lotes", "flujo"],
+                        help="lotes: etapa por etapa | flujo: cada audio avanza solo por las etapas")
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="Procesos en paralelo cuando no hay GPU (0 = automático)")
+    parser.add_argument("--politica", default=None, choices=["auto", "sjf", "lpt", "original"],
+                        help="Orden del lote según la duración: sjf = cortos primero | lpt = largos primero")
+    parser.add_argument("--servicio", action="store_true",
+                        help="Servicio residente: mantiene los modelos cargados entre corridas de la GUI")
+    parser.add_argument("--vigilar", nargs="+", metavar="CARPETA",
+                        help="Vigila carpetas (y subcarpetas) y transcribe cada audio nuevo cuando termina de copiarse, con los modelos ya cargados")
+    parser.add_argument("--reexportar", action="store_true",
+                        help="Regenera los .docx desde los resultados guardados, sin transcribir (plantilla o correcciones nuevas)")
+    parser.add_argument("--encolar", nargs="+", metavar="RUTA",
+                        help="Agrega carpetas (o audios sueltos) a la cola persistente de trabajos, con las opciones dadas")
+    parser.add_argument("--prioridad", type=int, default=0,
+                        help="Prioridad de los trabajos encolados (mayor = antes)")
+    parser.add_argument("--cola", action="store_true",
+                        help="Atiende la cola de trabajos por prioridad con los modelos residentes")
+    parser.add_argument("--listar-cola", action="store_true",
+                        help="Muestra los trabajos de la cola y su estado")
     
     args = parser.parse_args()
+    if not (args.servicio or args.folder or args.vigilar or args.encolar or args.cola or args.listar_cola):
+        parser.error("--folder es obligatorio (salvo en modo --servicio, --vigilar, --encolar, --cola o --listar-cola)")
 
     try:
+        if args.servicio:
+            from core.service import ejecutar_servicio
+            ejecutar_servicio(log=lambda linea: (sys.stdout.write(linea + "\n"), sys.stdout.flush()))
+            return
+
+        if args.encolar or args.listar_cola:
+            # Solo SQLite: sin importar los subsistemas pesados
+            from core.cola_trabajos import ColaTrabajos, describir
+            cola = ColaTrabajos()
+            opciones = {"template": args.template, "model": args.model, "gender": args.gender,
+                        "modo": args.modo, "procesos": args.procesos, "politica": args.politica}
+            for ruta in args.encolar or []:
+                if os.path.isdir(ruta):
+                    id_trabajo = cola.encolar(ruta, opciones=opciones, prioridad=args.prioridad)
+                elif os.path.isfile(ruta):
+                    id_trabajo = cola.encolar(os.path.dirname(os.path.abspath(ruta)), [os.path.basename(ruta)],
+                                              opciones=opciones, prioridad=args.prioridad)
+                else:
+                    sys.stdout.write(f"ERROR:No existe: {ruta}\n")
+                    continue
+                sys.stdout.write(f"LOG:📥 Encolado #{id_trabajo}: {os.path.abspath(ruta)}\n")
+            if args.listar_cola:
+                for trabajo in cola.listar():
+                    detalle = f" — {trabajo['error']}" if trabajo["error"] else ""
+                    sys.stdout.write(f"LOG:[{trabajo['estado']}] {describir(trabajo)}{detalle}\n")
+            sys.stdout.flush()
+            if not args.cola:
+                return
+
         # Debugging de rutas en caso de error (Solo se verÃ¡ si falla la importaciÃ³n)
         try:
+            tiempos_importacion = importar_subsistemas()
             from core.orchestrator import TranscriptorOrchestrator
+            from core import metrics, models
             from config import persistence
         except ImportError as ie:
             sys.stdout.write(f"ERROR:Fallo de importaciÃ³n: {str(ie)}\n")
@@ -88,17 +171,16 @@ def run_transcription_standalone():
             sys.stdout.flush()
             return
 
-        hf_token = persistence.get_hf_token()
-        if not hf_token:
-            sys.stdout.write("ERROR: No se ha configurado el Token de Hugging Face.\n")
-            sys.stdout.flush()
-            return
+        inicio = time.time()
+        metricas = []
 
         def queue_proxy(message):
             """Proxy para convertir mensajes de cola en salida de consola con blindaje de codificación."""
             try:
                 if isinstance(message, tuple):
                     command, data = message
+                    if command == 'metric':
+                        metricas.append(json.loads(data))
                     # Aseguramos que data sea string y manejamos posibles errores de codificación
                     safe_data = str(data).encode('utf-8', 'replace').decode('utf-8')
                     sys.stdout.write(f"{command.upper()}:{safe_data}\n")
@@ -109,17 +191,90 @@ def run_transcription_standalone():
             except:
                 pass # El pipeline no debe morir si falla un log
 
+        def escribir_resumen(carpeta=None, desde=None):
+            resumen = metrics.escribir_resumen(carpeta or args.folder, metricas, desde or inicio)
+            if resumen:
+                sys.stdout.write(f"LOG:📊 Resumen de métricas: {os.path.basename(resumen)}\n")
+                sys.stdout.flush()
+
+        if args.reexportar:
+            # Sin modelos ni token: solo post-proceso y exportación desde .transcriptor
+            from core.reexport import reexportar_carpeta
+            reportar_importaciones(tiempos_importacion, queue_proxy)
+            reexportar_carpeta(args.folder, args.template, args.gender, procesos=args.procesos, queue_callback=queue_proxy)
+            escribir_resumen()
+            return
+
+        hf_token = persistence.get_hf_token()
+        if not hf_token:
+            sys.stdout.write("ERROR: No se ha configurado el Token de Hugging Face.\n")
+            sys.stdout.flush()
+            return
+
         orchestrator = TranscriptorOrchestrator(queue_callback=queue_proxy)
         sys.stdout.write(f"LOG:Proceso de trabajo iniciado (PID: {os.getpid()})\n")
         sys.stdout.flush()
+        reportar_importaciones(tiempos_importacion, queue_proxy)
+
+        if args.vigilar:
+            # Un solo proceso con los modelos residentes: cada tanda nueva usa el pipeline ya cargado
+            from core.model_manager import GestorModelos
+            from core.orchestrator import EXTENSIONES_AUDIO
+            from core.vigilancia import Vigilante, agrupar_por_carpeta
+            orchestrator.gestor = GestorModelos()
+
+            def al_llegar(rutas):
+                for carpeta, nombres in agrupar_por_carpeta(rutas).items():
+                    desde = time.time()
+                    metricas.clear()
+                    try:
+                        orchestrator.process_all(
+                            folder=carpeta,
+                            template=args.template,
+                            model_name=args.model,
+                            hf_token=hf_token,
+                            prof_gender=args.gender,
+                            modo=args.modo,
+                            procesos=args.procesos or 1,
+                            politica=args.politica,
+                            archivos=nombres
+                        )
+                    except Exception as e:
+                        # Una tanda fallida no detiene la vigilancia
+                        queue_proxy(('log', f"✖ Error al procesar {carpeta}: {str(e)}"))
+                    escribir_resumen(carpeta, desde)
+
+            Vigilante(args.vigilar, EXTENSIONES_AUDIO, log=lambda msg: queue_proxy(('log', msg))).ejecutar(al_llegar)
+            return
+
+        if args.cola:
+            # Consumidor de la cola: las carpetas encoladas comparten los modelos cargados
+            from core.model_manager import GestorModelos
+            from core.cola_trabajos import ColaTrabajos, atender
+            orchestrator.gestor = GestorModelos()
+
+            def al_terminar(trabajo):
+                escribir_resumen(trabajo["carpeta"], trabajo["iniciado"])
+                metricas.clear()
+
+            atender(ColaTrabajos(), orchestrator, hf_token, log=lambda msg: queue_proxy(('log', msg)),
+                    al_terminar=al_terminar)
+            return
         
         orchestrator.process_all(
             folder=args.folder,
             template=args.template,
             model_name=args.model,
             hf_token=hf_token,
-            prof_gender=args.gender
+            prof_gender=args.gender,
+            modo=args.modo,
+            procesos=args.procesos,
+            politica=args.politica
         )
+        # torch/whisperx solo figuran si alguna etapa de modelos llegó a ejecutarse
+        reportar_importaciones(dict(models.TIEMPOS_IMPORTACION), queue_proxy)
+
+        escribir_resumen()
     except Exception as e:
         # Error crítico con trazado completo, blindado contra fallos de print
         try: